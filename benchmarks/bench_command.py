@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Measures how many times per second the arguments of a typical command
+can be generated.
+
+    python benchmarks/bench_command.py
+
+"uncached" builds the argument list from scratch on each call, like
+`FfmpegCommand.__iter__` did before the arguments were memoized.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vtcff import FfmpegCommand, Crop, Scale, Transpose, Hevc  # noqa: E402
+from vtcff._command import desynonimize  # noqa: E402
+
+
+def create_command() -> FfmpegCommand:
+    cmd = FfmpegCommand()
+    cmd.src_file = "/tmp/src.mov"
+    cmd.dst_file = "/tmp/dst.mov"
+    cmd.crop = Crop(10, 20, 1900, 1000)
+    cmd.scale = Scale(1280, -2)
+    cmd.transpose = Transpose.CLOCKWISE
+    cmd.src_color_space = "smpte170m"
+    cmd.dst_color_space = "bt709"
+    cmd.dst_time_range.begin = 1.5
+    cmd.dst_time_range.duration = 10
+    cmd.dst_codec_video = Hevc(mbps=20)
+    cmd.dst_pixfmt = 'yuv422p10le'
+    cmd.custom.video.string = "-tune grain -g 25"
+    cmd.custom.after_i.string = "-map_metadata 0"
+    return cmd
+
+
+def uncached_args(cmd: FfmpegCommand) -> list:
+    input_args = ['-i', str(cmd.src_file)]
+    args = list(desynonimize(a) for a in cmd._iter_almost_final(input_args))
+    assert any(s in args for s in ("-codec:v", "-vn"))
+    assert any(s in args for s in ("-codec:a", "-an"))
+    return args
+
+
+def commands_per_second(func, number: int) -> float:
+    return number / min(timeit.repeat(func, number=number, repeat=5))
+
+
+def main():
+    number = 2000
+    cmd = create_command()
+    assert uncached_args(cmd) == list(cmd)
+
+    results = {
+        "uncached": commands_per_second(lambda: uncached_args(cmd), number),
+        "compiled, same command": commands_per_second(
+            lambda: list(cmd), number),
+        "compiled, modified each time": commands_per_second(
+            lambda: (setattr(cmd, 'src_fps', cmd.src_fps == 25 and 24 or 25),
+                     list(cmd)), number),
+    }
+    for name, value in results.items():
+        print(f"{name:>30}: {value:10.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Measures the encoding speed of each tier on synthetic sources.
+Unlike the suite, this runs ffmpeg (with libx264, libx265 and zscale).
+
+    python benchmarks/bench_tiers.py
+    python benchmarks/bench_tiers.py --frames 240 --codec hevc
+
+Each source is generated by the lavfi `testsrc2` filter, converted to the
+source pixel format before the command sees the frames. The frames are
+downscaled and encoded to 8-bit 4:2:0, as for dailies and proxies.
+The time includes generating the frames, which is the same for all tiers.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vtcff import FfmpegCommand, Scale, Tier, Avc, Hevc, \
+    NoAudio  # noqa: E402
+
+# (width, height, pixel format) of the sources
+_SOURCES = [(1920, 1080, 'yuv422p10le'),
+            (3840, 2160, 'yuv422p10le')]
+
+
+def create_command(src: Tuple[int, int, str], frames: int, tier: Tier,
+                   codec: str, dst_file: Path) -> FfmpegCommand:
+    width, height, pixfmt = src
+    cmd = FfmpegCommand()
+    cmd.custom.before_i.string = '-f lavfi'
+    cmd.src_file = (f'testsrc2=size={width}x{height}:rate=25:'
+                    f'duration={frames / 25},format={pixfmt}')
+    cmd.src_width, cmd.src_height = width, height
+    cmd.src_pixfmt = pixfmt
+    cmd.scale = Scale(-2, 720)
+    cmd.dst_pixfmt = 'yuv420p'
+    cmd.dst_codec_video = Hevc(mbps=5) if codec == 'hevc' else Avc(mbps=5)
+    cmd.dst_codec_audio = NoAudio()
+    cmd.dst_file = dst_file
+    cmd.tier = tier
+    return cmd
+
+
+def frames_per_second(cmd: FfmpegCommand, frames: int) -> float:
+    started = time.monotonic()
+    subprocess.run(list(cmd) + ['-y'], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return frames / (time.monotonic() - started)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="vtcff tier benchmark")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--codec", choices=["avc", "hevc"], default="avc")
+    args = parser.parse_args(argv)
+
+    with TemporaryDirectory() as tds:
+        dst_file = Path(tds) / 'out.mp4'
+        for src in _SOURCES:
+            for tier in Tier:
+                cmd = create_command(src, args.frames, tier, args.codec,
+                                     dst_file)
+                fps = frames_per_second(cmd, args.frames)
+                name = f"{src[0]}x{src[1]} {src[2]} {tier.value}"
+                print(f"{name:>32}: {fps:8.1f} frames/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks of the pure-Python code paths. They do not run ffmpeg,
+so they work offline and without ffmpeg installed.
+
+Saving the results of the current commit:
+
+    python benchmarks/suite.py --output before.json
+
+Comparing another commit with the saved results:
+
+    python benchmarks/suite.py --compare before.json --threshold 0.15
+
+With --compare, the exit code is 1 if any case became slower than
+the baseline by more than the threshold (a fraction).
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# pylint: disable=wrong-import-position
+from vtcff import FfmpegCommand, Crop, Scale, Transpose, Hevc, \
+    crop_and_scale, crop_and_scale_many  # noqa: E402
+from vtcff._args_subset import ArgsSubset  # noqa: E402
+from vtcff._math_cropping import crop_size  # noqa: E402
+from vtcff._math_padding import LetterboxSizes  # noqa: E402
+from vtcff._pf_10_pixfmts_stdout_parser import \
+    _parse_pix_fmts_stdout  # noqa: E402
+
+_FIXTURE = Path(__file__).parent.parent / "tests" / "data" / \
+           "ffmpeg_pix_fmts.txt"
+
+_SRC_SIZES = [(720, 576), (1280, 720), (1440, 1080), (1920, 1080),
+              (2048, 1080), (3840, 2160), (4096, 2160), (5472, 3076),
+              (6144, 3240), (8192, 4320)]
+
+_DST_SIZES = [(640, 360), (1280, 720), (1920, 1080), (1998, 1080),
+              (2048, 858), (3840, 2160), (4096, 2160), (1080, 1920),
+              (1080, 1080)]
+
+_SIZE_PAIRS = [(s, d) for s in _SRC_SIZES for d in _DST_SIZES]
+
+
+def _rich_command() -> FfmpegCommand:
+    cmd = FfmpegCommand()
+    cmd.src_file = "/tmp/src.mov"
+    cmd.dst_file = "/tmp/dst.mov"
+    cmd.crop = Crop(10, 20, 1900, 1000)
+    cmd.scale = Scale(1280, -2)
+    cmd.transpose = Transpose.CLOCKWISE
+    cmd.src_color_space = "smpte170m"
+    cmd.dst_color_space = "bt709"
+    cmd.src_range_full = True
+    cmd.dst_range_full = False
+    cmd.dst_time_range.begin = 1.5
+    cmd.dst_time_range.duration = 10
+    cmd.dst_codec_video = Hevc(mbps=20)
+    cmd.dst_pixfmt = 'yuv422p10le'
+    cmd.custom.before_i.string = "-hwaccel auto"
+    cmd.custom.after_i.string = "-map_metadata 0 -metadata title=bench"
+    cmd.custom.video.string = "-tune grain -g 25 -bf 3"
+    cmd.custom.audio.string = "-ar 48000"
+    return cmd
+
+
+def _command_args_uncached() -> Callable[[], object]:
+    cmd = _rich_command()
+
+    def run():
+        # forces the arguments to be computed again
+        cmd._touch()  # pylint: disable=protected-access
+        return list(cmd)
+
+    return run
+
+
+def _command_args_cached() -> Callable[[], object]:
+    cmd = _rich_command()
+    return lambda: list(cmd)
+
+
+def _commands_interleaved() -> Callable[[], object]:
+    # a batch being prepared: the commands are edited and compiled in turns,
+    # so each edit must not outdate the other commands
+    commands = [_rich_command() for _ in range(8)]
+
+    def run():
+        for idx, cmd in enumerate(commands):
+            cmd.dst_file = f"/tmp/dst_{idx}.mov"
+            FfmpegCommand()
+            for other in commands:
+                list(other)
+
+    return run
+
+
+def _command_create_and_compile() -> Callable[[], object]:
+    return lambda: str(_rich_command())
+
+
+def _crop_and_scale() -> Callable[[], object]:
+    def run():
+        cmd = FfmpegCommand()
+        for (sw, sh), (dw, dh) in _SIZE_PAIRS[::9]:
+            crop_and_scale(cmd, sw, sh, dw, dh)
+
+    return run
+
+
+def _crop_and_scale_many() -> Callable[[], object]:
+    # a library of clips: few distinct resolutions, many clips
+    src = [s for s, _ in _SIZE_PAIRS] * 50
+    dst = [d for _, d in _SIZE_PAIRS] * 50
+    return lambda: crop_and_scale_many(src, dst)
+
+
+def _crop_size() -> Callable[[], object]:
+    def run():
+        for src, dst in _SIZE_PAIRS:
+            crop_size(src, dst, div=2)
+
+    return run
+
+
+def _letterbox_sizes() -> Callable[[], object]:
+    def run():
+        for (sw, sh), (dw, dh) in _SIZE_PAIRS:
+            LetterboxSizes(sw, sh, dw, dh)
+
+    return run
+
+
+def _args_subset_pairs() -> Callable[[], object]:
+    subset = ArgsSubset()
+    subset.string = ' '.join(f'-opt{i} value{i} -flag{i}'
+                             for i in range(1000))
+    return lambda: list(subset.pairs())
+
+
+def _pix_fmts_parsing() -> Callable[[], object]:
+    txt = _FIXTURE.read_text(encoding='utf-8')
+    return lambda: _parse_pix_fmts_stdout(txt)
+
+
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {
+    "command_args_uncached": _command_args_uncached,
+    "command_args_cached": _command_args_cached,
+    "command_create_and_compile": _command_create_and_compile,
+    "commands_interleaved": _commands_interleaved,
+    "crop_and_scale": _crop_and_scale,
+    "crop_and_scale_many": _crop_and_scale_many,
+    "crop_size": _crop_size,
+    "letterbox_sizes": _letterbox_sizes,
+    "args_subset_pairs": _args_subset_pairs,
+    "pix_fmts_parsing": _pix_fmts_parsing,
+}
+
+
+def measure(func: Callable[[], object], repeat: int = 5,
+            min_time: float = 0.2) -> float:
+    """Returns the best time of a single call, in seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    # autorange targets 0.2 s per repetition
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_suite(names: List[str], repeat: int = 5,
+              min_time: float = 0.2) -> dict:
+    results = dict()
+    for name in names:
+        seconds = measure(CASES[name](), repeat=repeat, min_time=min_time)
+        results[name] = {"seconds_per_call": seconds,
+                         "calls_per_second": 1.0 / seconds}
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float) \
+        -> List[Tuple[str, float, bool]]:
+    """Returns (name, relative change of the time, is regression) for each
+    case present in both results. Positive change means slower."""
+    result = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = cur["seconds_per_call"] / base["seconds_per_call"] - 1.0
+        result.append((name, change, change > threshold))
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="vtcff benchmarks")
+    parser.add_argument("--output", type=Path,
+                        help="save the results as JSON to this file")
+    parser.add_argument("--compare", type=Path,
+                        help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown as a fraction "
+                             "(default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds per repetition")
+    parser.add_argument("cases", nargs="*",
+                        help="cases to run (default: all)")
+    args = parser.parse_args(argv)
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    current = run_suite(args.cases or list(CASES), repeat=args.repeat,
+                        min_time=args.min_time)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2),
+                               encoding='utf-8')
+
+    if not args.compare:
+        for name, r in current["results"].items():
+            print(f"{name:>28}: {r['calls_per_second']:12.1f} calls/s")
+        return 0
+
+    baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+    regressions = 0
+    for name, change, regression in compare(baseline, current,
+                                            args.threshold):
+        mark = "REGRESSION" if regression else ""
+        print(f"{name:>28}: {change:+8.1%} {mark}")
+        regressions += regression
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
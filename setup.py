@@ -18,6 +18,7 @@ setup(
 
     python_requires='>=3.8',
     install_requires=['framefile'],
+    extras_require={'numpy': ['numpy']},
 
     description="Ffmpeg wrapper for transcoding between video formats with "
                 "an emphasis on maintaining quality and color depth "
@@ -0,0 +1,13 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# the tests must not fill the cache of the user: the frame directories
+# and the sources they create are new on each run
+_cache_dir = tempfile.mkdtemp(prefix='vtcff_test_cache_')
+os.environ['VTCFF_CACHE_DIR'] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
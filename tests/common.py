@@ -1,7 +1,10 @@
 # SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 
-from typing import Iterable
+import stat
+import sys
+from pathlib import Path
+from typing import Iterable, Dict, List
 
 from vtcff import FfmpegCommand, AudioCopy, VideoCopy
 
@@ -42,3 +45,28 @@ def create_test_cmd(zscale=None) -> FfmpegCommand:
     return cmd
 
 
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def create_fake_ffmpeg(directory: Path, outputs: Dict[str, str]) -> Path:
+    """Creates an executable script that prints `outputs[arg]` for the last
+    argument and appends the argument to "calls.log" in the same directory.
+    Works on POSIX only."""
+    script = directory / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        f"import sys, pathlib\n"
+        f"outputs = {outputs!r}\n"
+        f"log = pathlib.Path(__file__).parent / 'calls.log'\n"
+        f"with log.open('a') as f: f.write(sys.argv[-1] + '\\n')\n"
+        f"sys.stdout.write(outputs.get(sys.argv[-1], ''))\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script
+
+
+def fake_ffmpeg_calls(fake_ffmpeg: Path) -> List[str]:
+    log = fake_ffmpeg.parent / 'calls.log'
+    if not log.exists():
+        return []
+    return log.read_text().splitlines()
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import sys
+import unittest
+
+from tests.common import create_test_cmd, unique_item_after
+from vtcff import Hevc, Avc, Prores, VcPreset, Rendition, plan_batch, \
+    run_batch
+from vtcff._batch import estimated_cost
+
+
+class TestCodecThreads(unittest.TestCase):
+    def test_hevc(self):
+        self.assertIn('pools=6',
+                      dict(Hevc(mbps=10, threads=6).args())['-x265-params'])
+
+    def test_avc(self):
+        self.assertEqual(dict(Avc(threads=3).args())['-threads:v'], '3')
+
+    def test_prores(self):
+        self.assertEqual(dict(Prores(threads=2).args())['-threads:v'], '2')
+
+    def test_no_threads_by_default(self):
+        self.assertNotIn('-threads:v', dict(Avc().args()))
+        self.assertNotIn('pools', dict(Hevc(mbps=10).args())['-x265-params'])
+
+
+def hevc_cmd(preset: VcPreset):
+    cmd = create_test_cmd()
+    cmd.dst_codec_video = Hevc(mbps=10, preset=preset)
+    return cmd
+
+
+class TestPlan(unittest.TestCase):
+    def test_longest_first(self):
+        fast = hevc_cmd(VcPreset.N1_ULTRAFAST)
+        slow = hevc_cmd(VcPreset.N9_VERYSLOW)
+        prores = create_test_cmd()
+        prores.dst_codec_video = Prores()
+        self.assertGreater(estimated_cost(slow), estimated_cost(fast))
+
+        plan = plan_batch([fast, prores, slow], cores=8)
+        self.assertEqual(
+            [c.dst_codec_video.preset if isinstance(c.dst_codec_video, Hevc)
+             else None for c in plan.commands],
+            [VcPreset.N9_VERYSLOW, VcPreset.N1_ULTRAFAST, None])
+
+    def test_core_budget(self):
+        cmds = [hevc_cmd(VcPreset.N5_FAST) for _ in range(100)]
+        plan = plan_batch(cmds, cores=64)
+        self.assertEqual(plan.concurrency, 16)
+        self.assertEqual(plan.threads_per_job, 4)
+        self.assertLessEqual(plan.concurrency * plan.threads_per_job, 64)
+
+    def test_few_jobs_get_more_threads(self):
+        cmds = [hevc_cmd(VcPreset.N5_FAST) for _ in range(3)]
+        plan = plan_batch(cmds, cores=64)
+        self.assertEqual(plan.concurrency, 3)
+        self.assertEqual(plan.threads_per_job, 21)
+
+    def test_threads_injected_into_copies(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Avc()
+        plan = plan_batch([cmd], cores=4, threads_per_job=2)
+        self.assertEqual(unique_item_after(plan.commands[0], '-threads:v'),
+                         '2')
+        self.assertIsNone(cmd.dst_codec_video.threads)
+
+    def test_threads_shared_by_renditions(self):
+        cmd = create_test_cmd()
+        cmd.add_rendition(Rendition('/tmp/a.mp4', Avc()))
+        cmd.add_rendition(Rendition('/tmp/b.mp4', Hevc(mbps=5)))
+        cmd.add_rendition(Rendition('/tmp/c.mp4', Avc(threads=1)))
+        [planned] = plan_batch([cmd], cores=16, threads_per_job=6).commands
+        self.assertEqual([r.dst_codec_video.threads
+                          for r in planned.renditions], [2, 2, 1])
+        self.assertIsNone(cmd.renditions[0].dst_codec_video.threads)
+
+    def test_cost_of_default_preset(self):
+        lossless = create_test_cmd()
+        lossless.dst_codec_video = Hevc(lossless=True)
+        near_lossless = create_test_cmd()
+        near_lossless.dst_codec_video = Hevc(mbps=10, near_lossless=True)
+        self.assertLess(estimated_cost(lossless),
+                        estimated_cost(hevc_cmd(VcPreset.N6_MEDIUM)))
+        self.assertGreater(estimated_cost(near_lossless),
+                           estimated_cost(hevc_cmd(VcPreset.N6_MEDIUM)))
+
+    def test_explicit_threads_kept(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Avc(threads=1)
+        plan = plan_batch([cmd], cores=16)
+        self.assertIs(plan.commands[0], cmd)
+
+
+class TestRun(unittest.TestCase):
+    def test_failures_are_reported(self):
+        cmd = create_test_cmd()
+        # python does not understand ffmpeg arguments and exits with error
+        cmd.ffmpeg_exe = sys.executable
+        report = run_batch([cmd, cmd], cores=2)
+        self.assertEqual(len(report.jobs), 2)
+        self.assertEqual(len(report.failed), 2)
+        self.assertEqual(report.frames, 0)
@@ -3,7 +3,7 @@
 
 import unittest
 
-from vtcff._time_span import BeginEndDuration
+from vtcff._time_span import BeginEndDuration, Seek
 
 
 class TestBed(unittest.TestCase):
@@ -27,3 +27,24 @@ class TestBed(unittest.TestCase):
         self.assertEqual(bed.begin, 0)
         self.assertEqual(bed.end, 5)
         self.assertEqual(bed.duration, 5)
+
+    def test_split_begin_accurate(self):
+        bed = BeginEndDuration()
+        bed.begin = 10.5
+        self.assertEqual(bed.split_begin(), (0, 10.5))
+
+    def test_split_begin_fast(self):
+        bed = BeginEndDuration()
+        bed.seek = Seek.FAST
+        bed.begin = 10800.1
+        self.assertEqual(bed.split_begin(), (10799.1, 1.0))
+        bed.begin = 0.5
+        self.assertEqual(bed.split_begin(), (0, 0.5))
+        bed.begin = 0
+        self.assertEqual(bed.split_begin(), (0, 0))
+
+    def test_split_begin_keyframe(self):
+        bed = BeginEndDuration()
+        bed.seek = Seek.KEYFRAME
+        bed.begin = 10800.1
+        self.assertEqual(bed.split_begin(), (10800.1, 0))
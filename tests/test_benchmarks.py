@@ -0,0 +1,36 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from benchmarks.suite import CASES, compare, run_suite
+
+
+def _results(**seconds):
+    return {"results": {k: {"seconds_per_call": v} for k, v in
+                        seconds.items()}}
+
+
+class TestSuite(unittest.TestCase):
+    def test_all_cases_run(self):
+        # the cases must run offline and without ffmpeg
+        for setup in CASES.values():
+            setup()()
+
+    def test_run_suite(self):
+        results = run_suite(["crop_size"], repeat=1, min_time=0.001)
+        self.assertGreater(
+            results["results"]["crop_size"]["calls_per_second"], 0)
+
+    def test_compare(self):
+        changes = compare(_results(a=1.0, b=1.0, c=1.0),
+                          _results(a=1.05, b=1.5, d=9.0),
+                          threshold=0.1)
+        self.assertEqual([(name, regression)
+                          for name, _, regression in changes],
+                         [("a", False), ("b", True)])
+        self.assertAlmostEqual(changes[1][1], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
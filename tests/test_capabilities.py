@@ -0,0 +1,210 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from tests.common import create_fake_ffmpeg, fake_ffmpeg_calls, DATA_DIR, \
+    create_test_cmd, unique_item_after
+from vtcff import Avc, Prores, EncoderNotAvailableError, Scale, Hevc, \
+    PixfmtNotSupportedError
+from vtcff._capabilities import capabilities, _forget_all, _parse_encoders, \
+    _parse_filters, _parse_encoder_pixfmts
+from vtcff._pf_10_pixfmts_stdout_parser import pixfmt_to_spec, \
+    _parse_pix_fmts_stdout
+
+ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC (codec h264)
+ VFS... prores_ks            Apple ProRes (iCodec Pro) (codec prores)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+FILTERS = """Filters:
+  T.. = Timeline support
+  | = Source or sink filter
+ TSC scale             V->V       Scale the input video size.
+ ..C zscale            V->V       Apply resizing, colorspace and bit depth.
+ ... split             V->N       Pass on the input to N video outputs.
+"""
+
+PRORES_HELP = """Encoder prores_ks [Apple ProRes (iCodec Pro)]:
+    General capabilities: threads
+    Threading capabilities: frame and slice
+    Supported pixel formats: yuv422p10le yuv444p10le yuva444p10le
+ProRes encoder AVOptions:
+  -mbs_per_slice     <int>        E..V....... macroblocks per slice
+"""
+
+BUILDCONF = """  configuration:
+    --prefix=/usr
+    --enable-libzimg
+"""
+
+
+class TestParsers(unittest.TestCase):
+    def test_encoders(self):
+        self.assertEqual(_parse_encoders(ENCODERS),
+                         {'libx264', 'prores_ks', 'aac'})
+
+    def test_filters(self):
+        self.assertEqual(_parse_filters(FILTERS), {'scale', 'zscale', 'split'})
+
+    def test_encoder_pixfmts(self):
+        self.assertEqual(_parse_encoder_pixfmts(PRORES_HELP),
+                         ('yuv422p10le', 'yuv444p10le', 'yuva444p10le'))
+        self.assertIsNone(_parse_encoder_pixfmts(
+            "Codec 'abc' is not recognized by FFmpeg.\n"))
+
+    def test_pix_fmts_fixture(self):
+        specs = _parse_pix_fmts_stdout(
+            (DATA_DIR / 'ffmpeg_pix_fmts.txt').read_text())
+        z = next(x for x in specs if x.name == "yuv422p10le")
+        self.assertEqual(z.bits_per_pixel, 20)
+        self.assertEqual(z.nb_components, 3)
+
+
+@unittest.skipIf(sys.platform == 'win32', "fake ffmpeg is a POSIX script")
+class FakeFfmpegTest(unittest.TestCase):
+    def setUp(self):
+        self._td = TemporaryDirectory()
+        self.td = Path(self._td.name)
+        self._env = mock.patch.dict(
+            os.environ, {'VTCFF_CACHE_DIR': str(self.td / 'cache')})
+        self._env.start()
+        _forget_all()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+        _forget_all()
+
+    def create_ffmpeg(self, subdir: str) -> Path:
+        d = self.td / subdir
+        d.mkdir()
+        return create_fake_ffmpeg(d, {
+            '-version': f'ffmpeg version {subdir}\n',
+            '-encoders': ENCODERS,
+            '-filters': FILTERS,
+            '-buildconf': BUILDCONF,
+            'encoder=prores_ks': PRORES_HELP,
+            '-pix_fmts': (DATA_DIR / 'ffmpeg_pix_fmts.txt').read_text()})
+
+
+class TestCache(FakeFfmpegTest):
+    def test_queries(self):
+        exe = self.create_ffmpeg('a')
+        caps = capabilities(exe)
+        self.assertEqual(caps.version, 'ffmpeg version a')
+        self.assertIn('zscale', caps.filters)
+        self.assertIn('libx264', caps.encoders)
+        self.assertEqual(caps.buildconf, ['--prefix=/usr', '--enable-libzimg'])
+
+    def test_each_query_runs_once(self):
+        exe = self.create_ffmpeg('a')
+        capabilities(exe).filters
+        capabilities(exe).filters
+        self.assertEqual(fake_ffmpeg_calls(exe), ['-version', '-filters'])
+
+    def test_persisted(self):
+        exe = self.create_ffmpeg('a')
+        capabilities(exe).encoders
+        _forget_all()  # as if it was another process
+        self.assertIn('libx264', capabilities(exe).encoders)
+        self.assertEqual(fake_ffmpeg_calls(exe), ['-version', '-encoders'])
+
+    def test_executables_do_not_share_results(self):
+        a = capabilities(self.create_ffmpeg('a'))
+        b = capabilities(self.create_ffmpeg('b'))
+        self.assertIsNot(a, b)
+        self.assertEqual(b.version, 'ffmpeg version b')
+
+    def test_encoder_pixfmts_persisted(self):
+        exe = self.create_ffmpeg('a')
+        self.assertEqual(capabilities(exe).encoder_pixfmts('prores_ks'),
+                         ('yuv422p10le', 'yuv444p10le', 'yuva444p10le'))
+        _forget_all()
+        self.assertIn('yuv444p10le',
+                      capabilities(exe).encoder_pixfmts('prores_ks'))
+        self.assertIsNone(capabilities(exe).encoder_pixfmts('libx264'))
+        self.assertEqual(fake_ffmpeg_calls(exe),
+                         ['-version', 'encoder=prores_ks', 'encoder=libx264'])
+
+    def test_pixfmt_to_spec(self):
+        exe = self.create_ffmpeg('a')
+        self.assertEqual(pixfmt_to_spec('yuva444p10le', str(exe))
+                         .bits_per_pixel, 40)
+        with self.assertRaises(KeyError):
+            pixfmt_to_spec('abcd', ffmpeg_exe=str(exe))
+
+    def test_missing_executable(self):
+        with self.assertRaises(FileNotFoundError):
+            capabilities(self.td / 'nonexistent')
+
+
+class TestAdaptToFfmpeg(FakeFfmpegTest):
+    def create_cmd(self):
+        cmd = create_test_cmd()
+        cmd.ffmpeg_exe = self.create_ffmpeg('a')
+        return cmd
+
+    def test_zscale_kept_when_available(self):
+        cmd = self.create_cmd()
+        cmd.scale = Scale(1920, 1080)
+        cmd.adapt_to_ffmpeg()
+        self.assertTrue(cmd.use_zscale)
+
+    def test_zscale_replaced_when_not_available(self):
+        cmd = self.create_cmd()
+        create_fake_ffmpeg(Path(cmd.ffmpeg_exe).parent, {
+            '-filters': FILTERS.replace('zscale', 'xscale'),
+            '-encoders': ENCODERS})
+        cmd.scale = Scale(1920, 1080)
+        cmd.dst_range_full = False
+        cmd.adapt_to_ffmpeg()
+        self.assertFalse(cmd.use_zscale)
+        self.assertEqual(cmd.scale, Scale(1920, 1080))
+        self.assertEqual(cmd.dst_range_full, False)
+        self.assertIn('-vf scale=', str(cmd))
+
+    def test_encoder_available(self):
+        cmd = self.create_cmd()
+        cmd.dst_codec_video = Prores()
+        cmd.adapt_to_ffmpeg()  # no exception
+
+        cmd.custom.video.string = '-codec:v libx264'
+        cmd.adapt_to_ffmpeg()  # no exception
+
+    def test_encoder_not_available(self):
+        cmd = self.create_cmd()
+        cmd.dst_codec_video = Hevc(mbps=10)
+        with self.assertRaises(EncoderNotAvailableError):
+            cmd.adapt_to_ffmpeg()
+
+    def test_encoder_pixfmts_in_graph(self):
+        cmd = self.create_cmd()
+        cmd.dst_codec_video = Prores()
+        cmd.scale = Scale(1920, 1080)
+        cmd.adapt_to_ffmpeg()
+        self.assertTrue(unique_item_after(cmd, '-vf').endswith(
+            ',format=yuv422p10le|yuv444p10le|yuva444p10le'))
+
+    def test_pixfmt_not_supported(self):
+        cmd = self.create_cmd()
+        cmd.dst_codec_video = Prores()
+        cmd.dst_pixfmt = 'yuv420p'
+        with self.assertRaises(PixfmtNotSupportedError):
+            cmd.adapt_to_ffmpeg()
+
+    def test_audio_encoder_not_available(self):
+        cmd = self.create_cmd()
+        cmd.dst_codec_video = Avc()
+        cmd.custom.audio.string = '-codec:a libopus'
+        with self.assertRaises(EncoderNotAvailableError):
+            cmd.adapt_to_ffmpeg()
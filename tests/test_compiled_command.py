@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import copy
+import pickle
+import threading
+import unittest
+
+from tests.common import create_test_cmd
+from vtcff import CompiledCommand, Crop, Hevc, FilterGraph, Scale
+from vtcff._filter_zscale import ZscaleFilter
+
+
+class TestCompiledCommand(unittest.TestCase):
+    def test_contains(self):
+        compiled = CompiledCommand(['ffmpeg', '-i', 'a.mov'])
+        self.assertIn('-i', compiled)
+        self.assertNotIn('-vf', compiled)
+        self.assertEqual(list(compiled), ['ffmpeg', '-i', 'a.mov'])
+        self.assertEqual(str(compiled), 'ffmpeg -i a.mov')
+        self.assertEqual(len(compiled), 3)
+
+    def test_same_args_equal(self):
+        self.assertEqual(CompiledCommand(['a', 'b']),
+                         CompiledCommand(('a', 'b')))
+        self.assertEqual(hash(CompiledCommand(['a', 'b'])),
+                         hash(CompiledCommand(('a', 'b'))))
+
+
+class TestMemoization(unittest.TestCase):
+    def test_unchanged_command_is_not_recompiled(self):
+        cmd = create_test_cmd()
+        self.assertIs(cmd.compile(), cmd.compile())
+
+    def test_field(self):
+        cmd = create_test_cmd()
+        first = cmd.compile()
+        cmd.dst_pixfmt = 'yuv444p10le'
+        self.assertIsNot(cmd.compile(), first)
+        self.assertIn('yuv444p10le', cmd.compile())
+
+    def test_nested_field(self):
+        cmd = create_test_cmd()
+        self.assertNotIn('-ss', list(cmd))
+        cmd.dst_time_range.begin = 5
+        self.assertIn('-ss', list(cmd))
+
+    def test_custom_list_append(self):
+        cmd = create_test_cmd()
+        self.assertNotIn('-tune', list(cmd))
+        cmd.custom.video.list.append('-tune')
+        cmd.custom.video.list.append('grain')
+        self.assertIn('-tune', list(cmd))
+
+    def test_codec_field(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Hevc(mbps=10)
+        self.assertNotIn('pools=2', str(cmd))
+        cmd.dst_codec_video.threads = 2
+        self.assertIn('pools=2', str(cmd))
+
+    def test_filter_chain(self):
+        cmd = create_test_cmd()
+        cmd.crop = Crop(1, 2, 3, 4)
+        self.assertIn('crop=3:4:1:2', str(cmd))
+        cmd.crop = Crop(1, 2, 3, 5)
+        self.assertIn('crop=3:5:1:2', str(cmd))
+
+    def test_filter_pairs(self):
+        cmd = create_test_cmd(zscale=False)
+        cmd.dst_range_full = True
+        self.assertIn('out_range=full', str(cmd))
+        cmd.dst_range_full = False
+        self.assertIn('out_range=limited', str(cmd))
+
+    def test_switching_scaler(self):
+        cmd = create_test_cmd()
+        cmd.dst_range_full = True
+        self.assertIn('zscale', str(cmd))
+        cmd.use_zscale = False
+        self.assertNotIn('zscale', str(cmd))
+
+    def test_copies(self):
+        cmd = create_test_cmd()
+        original = cmd.compile()
+        for other in (copy.deepcopy(cmd), pickle.loads(pickle.dumps(cmd))):
+            self.assertEqual(other.compile(), original)
+            other.dst_file = "/tmp/other.mov"
+            self.assertIn("/tmp/other.mov", other.compile())
+        self.assertEqual(cmd.compile(), original)
+
+    def test_other_commands_do_not_outdate(self):
+        cmd = create_test_cmd()
+        compiled = cmd.compile()
+        other = create_test_cmd()
+        other.dst_codec_video = Hevc(mbps=10)
+        other.dst_codec_video.threads = 2
+        other.crop = Crop(1, 2, 3, 4)
+        self.assertIs(cmd.compile(), compiled)
+
+    def test_shared_codec(self):
+        codec = Hevc(mbps=10)
+        a, b = create_test_cmd(), create_test_cmd()
+        a.dst_codec_video = codec
+        b.dst_codec_video = codec
+        self.assertNotIn('pools=2', str(a) + str(b))
+        codec.threads = 2
+        self.assertIn('pools=2', str(a))
+        self.assertIn('pools=2', str(b))
+
+    def test_shallow_copy(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Hevc(mbps=10)
+        other = copy.copy(cmd)
+        self.assertEqual(other.compile(), cmd.compile())
+        other.dst_codec_video.threads = 2
+        self.assertIn('pools=2', str(cmd))
+        self.assertIn('pools=2', str(other))
+
+    def test_filter_in_graph(self):
+        zscale = ZscaleFilter()
+        graph = FilterGraph()
+        graph.add('0:v', [zscale], 'out')
+        cmd = create_test_cmd()
+        cmd.filter_graph = graph
+        self.assertNotIn('w=320', str(cmd))
+        zscale.scaling = Scale(320, 240)
+        self.assertIn('w=320', str(cmd))
+
+    def test_threads(self):
+        errors = []
+
+        def edit_and_compile(idx: int):
+            cmd = create_test_cmd()
+            cmd.dst_codec_video = Hevc(mbps=10)
+            for threads in range(1, 200):
+                cmd.dst_codec_video.threads = threads
+                cmd.dst_file = f"/tmp/{idx}_{threads}.mov"
+                args = str(cmd)
+                if f'pools={threads}' not in args \
+                        or f'/tmp/{idx}_{threads}.mov' not in args:
+                    errors.append(args)
+
+        threads = [threading.Thread(target=edit_and_compile, args=(idx,))
+                   for idx in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import create_test_cmd, unique_item_after, find_item_after
+from vtcff import Dither, Scale, FfmpegCommand, Rendition, Avc
+from vtcff._dither import auto_dither
+
+
+class TestAutoDither(unittest.TestCase):
+    def test_reduced(self):
+        self.assertEqual(auto_dither('yuv422p10le', ['yuv420p']),
+                         Dither.ERROR_DIFFUSION)
+
+    def test_preserved_or_increased(self):
+        self.assertEqual(auto_dither('yuv420p', ['yuv444p']), Dither.NONE)
+        self.assertEqual(auto_dither('yuv420p', ['yuv422p10le']),
+                         Dither.NONE)
+
+    def test_unknown(self):
+        self.assertEqual(auto_dither(None, ['yuv420p']),
+                         Dither.ERROR_DIFFUSION)
+        self.assertEqual(auto_dither('yuv420p', [None]),
+                         Dither.ERROR_DIFFUSION)
+        self.assertEqual(auto_dither('yuv420p', ['abcd']),
+                         Dither.ERROR_DIFFUSION)
+
+    def test_any_output_reduced(self):
+        self.assertEqual(auto_dither('yuv422p10le',
+                                     ['yuv422p10le', 'yuv420p']),
+                         Dither.ERROR_DIFFUSION)
+
+
+class TestCommandDither(unittest.TestCase):
+    def create_cmd(self):
+        cmd = create_test_cmd(zscale=True)
+        cmd.scale = Scale(1920, 1080)
+        cmd.src_pixfmt = 'yuv422p10le'
+        return cmd
+
+    def test_default_unknown_source(self):
+        cmd = self.create_cmd()
+        cmd.src_pixfmt = None
+        cmd.dst_pixfmt = 'yuv422p10le'
+        self.assertIn('dither=error_diffusion', unique_item_after(cmd, '-vf'))
+
+    def test_depth_preserved(self):
+        cmd = self.create_cmd()
+        cmd.dst_pixfmt = 'yuv444p10le'
+        self.assertIn('dither=none', unique_item_after(cmd, '-vf'))
+
+    def test_depth_reduced(self):
+        cmd = self.create_cmd()
+        cmd.dst_pixfmt = 'yuv420p'
+        self.assertIn('dither=error_diffusion', unique_item_after(cmd, '-vf'))
+
+    def test_override(self):
+        cmd = self.create_cmd()
+        cmd.dst_pixfmt = 'yuv420p'
+        cmd.dither = Dither.ORDERED
+        self.assertIn('dither=ordered', unique_item_after(cmd, '-vf'))
+
+    def test_filter_not_modified(self):
+        cmd = self.create_cmd()
+        cmd.dst_pixfmt = 'yuv444p10le'
+        list(cmd)
+        self.assertIsNone(cmd._zscale().dither)
+
+    def test_renditions(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = '/tmp/src.mov'
+        cmd.src_pixfmt = 'yuv422p10le'
+        cmd.dst_color_space = 'bt709'
+        cmd.add_rendition(Rendition('/tmp/a.mov', Avc(),
+                                    scale=Scale(-2, 1080),
+                                    dst_pixfmt='yuv422p10le'))
+        cmd.add_rendition(Rendition('/tmp/b.mp4', Avc(),
+                                    scale=Scale(-2, 360),
+                                    dst_pixfmt='yuv420p'))
+        chains = find_item_after(cmd, '-filter_complex').split(';')
+        # the common conversion feeds a rendition with fewer bits
+        self.assertIn('dither=error_diffusion', chains[0])
+        self.assertIn('dither=none', chains[1])
+        self.assertIn('dither=error_diffusion', chains[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
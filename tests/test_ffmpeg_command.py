@@ -16,7 +16,11 @@ from vtcff._codec_audio_none import NoAudio
 from vtcff._codec_avc_preset import VcPreset
 from vtcff._codec_prores_ks import Prores, ProresProfile
 from vtcff._common import Scale
-from vtcff._filter_transpose import Transpose
+from vtcff._filter_pad import Pad
+from vtcff._filter_swscale import SwscaleFilter
+from vtcff._filter_transpose import Transpose, TransposeFilter
+from vtcff._filter_zscale import ZscaleFilter
+from vtcff._time_span import Seek
 
 
 def last_index(alist: List, value) -> int:
@@ -379,6 +383,19 @@ class TestCommand(BaseTest):
         # убедимся, что оно после -i
         self.assertOrderIs(cmd, '-i', '-ss')
 
+    def test_time_range_fast_seek(self):
+        cmd = create_test_cmd()
+        cmd.dst_time_range.seek = Seek.FAST
+        cmd.dst_time_range.begin = 10000
+        cmd.dst_time_range.duration = 10
+        args = list(cmd)
+        # coarse seek before -i, residual seek after it
+        self.assertEqual(args[args.index('-ss') + 1], '9999.0')
+        self.assertEqual(args[last_index(args, '-ss') + 1], '1.0')
+        self.assertLess(args.index('-ss'), args.index('-i'))
+        self.assertGreater(last_index(args, '-ss'), args.index('-i'))
+        self.assertOrderIs(cmd, '-i', '-t')
+
     def test_time_range_duration(self):
         cmd = create_test_cmd()
         expected = '-t 10'
@@ -482,6 +499,23 @@ class TestCommand(BaseTest):
         self.assertNotIn('-vf scale=', str(cmd))
         self.assertIn('-vf zscale=', str(cmd))
 
+    def test_switch_zscale_to_swscale_keeps_order(self):
+        cmd = create_test_cmd(zscale=True)
+        cmd.crop = Crop(0, 0, 3840, 1600)
+        cmd.scale = Scale(1920, 800)
+        cmd.transpose = Transpose.CLOCKWISE
+        cmd._pad = Pad(0, 140, 800, 1920)
+        cmd.use_zscale = False
+        self.assertEqual(
+            [type(f) for f in cmd._filter_chain],
+            [Crop, SwscaleFilter, TransposeFilter, Pad])
+        self.assertEqual(cmd.scale, Scale(1920, 800))
+
+        cmd.use_zscale = True
+        self.assertEqual(
+            [type(f) for f in cmd._filter_chain],
+            [Crop, ZscaleFilter, TransposeFilter, Pad])
+
     def test_switch_zscale_to_swscale_random(self):
 
         def random_bool():
@@ -532,3 +566,20 @@ class TestCommand(BaseTest):
         cmd = create_test_cmd(zscale=True)
         cmd.dst_pixfmt = "yuvj420p"
         self.assertEqual(unique_item_after(cmd, "-pix_fmt"), "yuvj420p")
+
+    def test_pixfmt_converted_in_graph(self):
+        cmd = create_test_cmd(zscale=True)
+        cmd.dst_codec_video = Prores()
+        cmd.scale = Scale(1920, 1080)
+        cmd.dst_pixfmt = "yuv422p10le"
+        self.assertEqual(
+            unique_item_after(cmd, "-vf"),
+            "zscale=filter=spline36:w=1920:h=1080:dither=error_diffusion,"
+            "format=yuv422p10le")
+        self.assertEqual(unique_item_after(cmd, "-pix_fmt"), "yuv422p10le")
+
+    def test_pixfmt_not_converted_when_copying(self):
+        cmd = create_test_cmd(zscale=True)
+        cmd.dst_codec_video = VideoCopy()
+        cmd.dst_pixfmt = "yuv422p10le"
+        self.assertNotIn("-vf", list(cmd))
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from tests.common import create_test_cmd, find_item_after
+from vtcff import FilterGraph, GraphChain, Crop, Pad, Scale, Avc, NoAudio
+from vtcff._filter_transpose import TransposeFilter, Transpose
+from vtcff._filter_zscale import ZscaleFilter
+
+
+def create_graph() -> FilterGraph:
+    graph = FilterGraph()
+    graph.add('0:v', ['split=2'], ['a', 'b'])
+    graph.add('a', [Crop(0, 0, 160, 240)], 'left')
+    graph.add('b', [Crop(160, 0, 160, 240), 'hflip'], 'right')
+    graph.add(['left', 'right'], ['hstack'], 'out')
+    return graph
+
+
+class TestGraphChain(unittest.TestCase):
+    def test_str(self):
+        zscale = ZscaleFilter()
+        zscale.scaling = Scale(640, -2)
+        chain = GraphChain(('0:v',), (Crop(1, 2, 3, 4), zscale,
+                                      TransposeFilter(), Pad(0, 0, 10, 10)),
+                           ('out',))
+        self.assertEqual(
+            str(chain),
+            '[0:v]crop=3:4:1:2,'
+            'zscale=filter=spline36:w=640:h=-2:dither=error_diffusion,'
+            'transpose=1,pad=width=10:height=10:x=0:y=0:color=black[out]')
+
+    def test_empty_filters_skipped(self):
+        chain = GraphChain(('0:v',), (ZscaleFilter(), Crop(1, 2, 3, 4)))
+        self.assertEqual(chain.filters_string(), 'crop=3:4:1:2')
+        self.assertEqual(str(GraphChain(('a',), (ZscaleFilter(),), ('b',))),
+                         '[a]null[b]')
+
+
+class TestFilterGraph(unittest.TestCase):
+    def test_str(self):
+        self.assertEqual(
+            str(create_graph()),
+            '[0:v]split=2[a][b];[a]crop=160:240:0:0[left];'
+            '[b]crop=160:240:160:0,hflip[right];[left][right]hstack[out]')
+
+    def test_outputs(self):
+        self.assertEqual(create_graph().outputs(), ['out'])
+
+    def test_linear(self):
+        graph = FilterGraph()
+        graph.add('0:v', [Crop(1, 2, 3, 4)])
+        self.assertTrue(graph.is_linear())
+        self.assertFalse(create_graph().is_linear())
+
+    def test_validate(self):
+        create_graph().validate()
+        graph = create_graph()
+        graph.add('a', ['null'], 'c')
+        with self.assertRaises(ValueError):
+            graph.validate()
+        graph = create_graph()
+        graph.add('missing', ['null'], 'c')
+        with self.assertRaises(ValueError):
+            graph.validate()
+        graph = create_graph()
+        graph.add('0:v', ['null'], 'out')
+        with self.assertRaises(ValueError):
+            graph.validate()
+
+
+class TestCommandGraph(unittest.TestCase):
+    def test_chain_renders_as_vf(self):
+        cmd = create_test_cmd()
+        cmd.crop = Crop(1, 2, 3, 4)
+        cmd.transpose = Transpose.CLOCKWISE
+        self.assertEqual(find_item_after(cmd, '-vf'),
+                         'crop=3:4:1:2,transpose=1')
+        self.assertNotIn('-filter_complex', list(cmd))
+
+    def test_linear_graph_renders_as_vf(self):
+        cmd = create_test_cmd()
+        cmd.filter_graph = FilterGraph()
+        cmd.filter_graph.add('0:v', [Crop(1, 2, 3, 4), 'hflip'])
+        self.assertEqual(find_item_after(cmd, '-vf'), 'crop=3:4:1:2,hflip')
+
+    def test_complex(self):
+        cmd = create_test_cmd()
+        cmd.filter_graph = create_graph()
+        args = list(cmd)
+        self.assertEqual(find_item_after(args, '-filter_complex'),
+                         str(create_graph()))
+        maps = [args[i + 1] for i, a in enumerate(args) if a == '-map']
+        self.assertEqual(maps, ['[out]', '0:a?'])
+        self.assertNotIn('-vf', args)
+
+    def test_changes_are_compiled(self):
+        cmd = create_test_cmd()
+        cmd.filter_graph = create_graph()
+        before = str(cmd)
+        cmd.filter_graph.add('out', ['vflip'], 'flipped')
+        self.assertNotEqual(str(cmd), before)
+        self.assertIn('-map [flipped]', str(cmd))
+
+    def test_command_filters_conflict(self):
+        cmd = create_test_cmd()
+        cmd.crop = Crop(1, 2, 3, 4)
+        cmd.filter_graph = create_graph()
+        with self.assertRaises(ValueError):
+            list(cmd)
+
+    def test_run(self):
+        with TemporaryDirectory() as tds:
+            dst = Path(tds) / 'out.mp4'
+            cmd = create_test_cmd()
+            cmd.custom.before_i.string = '-f lavfi'
+            cmd.src_file = 'testsrc=size=320x240:rate=10:duration=1'
+            cmd.dst_file = dst
+            cmd.dst_codec_video = Avc()
+            cmd.dst_codec_audio = NoAudio()
+            cmd.dst_pixfmt = 'yuv420p'
+            cmd.filter_graph = create_graph()
+            subprocess.check_call(list(cmd),
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+            self.assertGreater(dst.stat().st_size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
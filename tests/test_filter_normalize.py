@@ -0,0 +1,159 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import create_test_cmd, find_item_after
+from vtcff import Crop, Hevc, Scale, crop_and_scale
+from vtcff._filter_normalize import normalized_filters, scaled_size
+from vtcff._filter_swscale import SwscaleFilter
+from vtcff._filter_transpose import TransposeFilter
+from vtcff._filter_zscale import ZscaleFilter
+
+
+def zscale(scaling=None, **pairs) -> ZscaleFilter:
+    z = ZscaleFilter()
+    z.scaling = scaling
+    for k, v in pairs.items():
+        z._set_or_remove(k, v)
+    return z
+
+
+class TestScaledSize(unittest.TestCase):
+    def test(self):
+        self.assertEqual(scaled_size(Scale(1280, 720), (1920, 1080)),
+                         (1280, 720))
+        self.assertEqual(scaled_size(Scale(-2, 720), (1920, 1080)),
+                         (1280, 720))
+        self.assertEqual(scaled_size(Scale(-2, 480), (1920, 1080)),
+                         (854, 480))
+        self.assertEqual(scaled_size(Scale(-1, 480), (1920, 1080)),
+                         (853, 480))
+        self.assertEqual(scaled_size(Scale(640, -2), (1920, 1080)),
+                         (640, 360))
+        self.assertEqual(scaled_size(Scale(3840, -2, downscale_only=True),
+                                     (1920, 1080)), (1920, 1080))
+        self.assertIsNone(scaled_size(Scale(-1, -1), (1920, 1080)))
+        self.assertIsNone(scaled_size(Scale(1280, 720), None))
+
+
+class TestNormalizedFilters(unittest.TestCase):
+    def test_empty_scaler(self):
+        crop = Crop(1, 2, 3, 4)
+        self.assertEqual(normalized_filters([zscale(), crop]), [crop])
+        self.assertEqual(normalized_filters([SwscaleFilter()]), [])
+
+    def test_same_matrix_and_range(self):
+        z = zscale(matrixin='709', matrix='709',
+                   rangein='full', range='full')
+        self.assertEqual(normalized_filters([z]), [])
+
+        z = zscale(matrixin='709', matrix='709',
+                   rangein='full', range='limited')
+        [result] = normalized_filters([z])
+        self.assertEqual(str(result),
+                         'zscale=rangein=full:range=limited:'
+                         'dither=error_diffusion')
+        # the original is not changed
+        self.assertIn('matrix=709', str(z))
+
+    def test_same_matrix_kept_for_rgb(self):
+        z = zscale(matrixin='709', matrix='709',
+                   rangein='limited', range='full')
+        self.assertEqual(normalized_filters([z], crosses_rgb=True), [z])
+
+    def test_matrix_without_source_is_kept(self):
+        z = zscale(matrix='709')
+        self.assertEqual(normalized_filters([z]), [z])
+
+    def test_full_frame_crop(self):
+        crop = Crop(0, 0, 1920, 1080)
+        self.assertEqual(normalized_filters([crop], (1920, 1080)), [])
+        self.assertEqual(normalized_filters([crop], (3840, 2160)), [crop])
+        self.assertEqual(normalized_filters([crop]), [crop])
+
+    def test_same_size_scale(self):
+        z = zscale(Scale(-2, 1080))
+        self.assertEqual(normalized_filters([z], (1920, 1080)), [])
+        self.assertEqual(normalized_filters([z], (3840, 2160)), [z])
+
+        z = zscale(Scale(1920, 1080), matrixin='709', matrix='2020_ncl')
+        [result] = normalized_filters([z], (1920, 1080))
+        self.assertIsNone(result.scaling)
+        self.assertIn('matrix=2020_ncl', str(result))
+
+        sw = SwscaleFilter()
+        sw.width, sw.height = 1920, -2
+        self.assertEqual(normalized_filters([sw], (1920, 1080)), [])
+
+    def test_swscale_width_only(self):
+        sw = SwscaleFilter()
+        sw.width = 1920
+        self.assertEqual(normalized_filters([sw], (1920, 1080)), [sw])
+
+    def test_size_is_tracked(self):
+        transpose = TransposeFilter()
+        z = zscale(Scale(1080, 1920))
+        self.assertEqual(
+            normalized_filters([Crop(0, 0, 1920, 1080), transpose, z],
+                               (1920, 1080)),
+            [transpose])
+
+    def test_adjacent_crops(self):
+        self.assertEqual(
+            normalized_filters([Crop(10, 20, 1000, 800),
+                                Crop(5, 5, 100, 200)]),
+            [Crop(15, 25, 100, 200)])
+
+
+class TestCommand(unittest.TestCase):
+    def test_no_stray_commas(self):
+        cmd = create_test_cmd()
+        cmd.src_color_space = None  # creates an empty zscale
+        cmd.crop = Crop(1, 2, 3, 4)
+        self.assertEqual(find_item_after(cmd, '-vf'), 'crop=3:4:1:2')
+
+    def test_src_size(self):
+        cmd = create_test_cmd()
+        cmd.crop = Crop(0, 0, 1920, 1080)
+        cmd.scale = Scale(-2, 1080)
+        self.assertIn('-vf', list(cmd))
+        cmd.src_width, cmd.src_height = 1920, 1080
+        self.assertNotIn('-vf', list(cmd))
+
+    def test_crop_and_scale_same_size(self):
+        cmd = create_test_cmd()
+        crop_and_scale(cmd, 1920, 1080, 1920, 1080)
+        self.assertNotIn('-vf', list(cmd))
+        crop_and_scale(cmd, 3840, 2160, 1920, 1080)
+        self.assertEqual(
+            find_item_after(cmd, '-vf'),
+            'zscale=filter=spline36:w=-2:h=1080:dither=error_diffusion')
+
+    def test_same_matrix_kept_for_rgb(self):
+        for zscale_on in (True, False):
+            with self.subTest(zscale=zscale_on):
+                cmd = create_test_cmd(zscale=zscale_on)
+                cmd.src_color_space = 'bt709'
+                cmd.dst_color_space = 'bt709'
+                cmd.src_range_full = False
+                cmd.dst_range_full = True
+                self.assertNotIn('matrix', find_item_after(cmd, '-vf'))
+                cmd.dst_pixfmt = 'gbrp10le'
+                self.assertIn('matrix', find_item_after(cmd, '-vf'))
+
+    def test_same_matrix_kept_for_rgb_encoder(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Hevc(mbps=5)
+        cmd.src_color_space = 'bt709'
+        cmd.dst_color_space = 'bt709'
+        cmd._encoder_pixfmts['libx265'] = ('gbrp', 'gbrp10le')
+        self.assertIn('matrix', find_item_after(cmd, '-vf'))
+        # the encoder accepts the YUV of the source too
+        cmd._encoder_pixfmts['libx265'] = ('yuv420p', 'gbrp')
+        cmd._touch()
+        self.assertEqual(find_item_after(cmd, '-vf'), 'format=yuv420p|gbrp')
+
+
+if __name__ == "__main__":
+    unittest.main()
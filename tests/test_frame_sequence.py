@@ -0,0 +1,160 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from tests.common import find_item_after
+from vtcff import FfmpegCommand
+from vtcff._frame_sequence import frame_sequence, _forget_all
+
+
+class FrameDirTest(unittest.TestCase):
+    def setUp(self):
+        self._td = TemporaryDirectory()
+        self.td = Path(self._td.name)
+        self.frames = self.td / 'frames'
+        self.frames.mkdir()
+        self._env = mock.patch.dict(
+            os.environ, {'VTCFF_CACHE_DIR': str(self.td / 'cache')})
+        self._env.start()
+        _forget_all()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+        _forget_all()
+
+    def create_frames(self, numbers, template='img_{:05d}.exr'):
+        for n in numbers:
+            (self.frames / template.format(n)).write_bytes(b'x' * 10)
+
+
+class TestFrameSequence(FrameDirTest):
+    def test_index(self):
+        self.create_frames([*range(1001, 1011), *range(1013, 1021)])
+        (self.frames / 'notes.txt').touch()
+        seq = frame_sequence(str(self.frames))
+        self.assertEqual(seq.pattern, str(self.frames / 'img_%05d.exr'))
+        self.assertEqual((seq.first, seq.last), (1001, 1020))
+        self.assertEqual(seq.padding, 5)
+        self.assertEqual(seq.frame_count, 18)
+        self.assertEqual(seq.gaps, ((1011, 1012),))
+        self.assertEqual(seq.total_bytes, 180)
+        self.assertEqual(seq.contiguous_count, 10)
+
+    def test_most_common_sequence(self):
+        self.create_frames(range(1, 4), template='a_{:02d}.png')
+        self.create_frames(range(1, 6), template='b_{:04d}.png')
+        self.assertEqual(frame_sequence(str(self.frames)).pattern,
+                         str(self.frames / 'b_%04d.png'))
+
+    def test_percent_escaped(self):
+        self.create_frames(range(3), template='100%_{:03d}.png')
+        self.assertEqual(frame_sequence(str(self.frames)).pattern,
+                         str(self.frames / '100%%_%03d.png'))
+
+    def test_not_a_directory(self):
+        self.assertIsNone(frame_sequence(str(self.td / 'nothing.mov')))
+
+    def test_listed_once(self):
+        self.create_frames(range(10))
+        self.assertEqual(frame_sequence(str(self.frames)).frame_count, 10)
+        with mock.patch('os.scandir', side_effect=AssertionError):
+            self.assertEqual(frame_sequence(str(self.frames)).frame_count, 10)
+            # a new process finds the result on disk
+            _forget_all()
+            self.assertEqual(frame_sequence(str(self.frames)).frame_count, 10)
+
+    def test_changed_directory(self):
+        self.create_frames(range(10))
+        self.assertEqual(frame_sequence(str(self.frames)).frame_count, 10)
+        self.create_frames([10])
+        # making sure the mtime differs even on coarse file systems
+        st = os.stat(self.frames)
+        os.utime(self.frames, ns=(st.st_atime_ns,
+                                  st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(frame_sequence(str(self.frames)).frame_count, 11)
+        # the outdated listing is replaced on disk
+        self.assertEqual(
+            len(list((self.td / 'cache' / 'frame_sequences').iterdir())), 1)
+
+    def test_disk_cache_limited(self):
+        for idx in range(5):
+            frames = self.td / f'frames{idx}'
+            frames.mkdir()
+            (frames / 'img_0001.exr').touch()
+            with mock.patch('vtcff._frame_sequence._MAX_DISK_ENTRIES', 3):
+                self.assertIsNotNone(frame_sequence(str(frames)))
+        self.assertEqual(
+            len(list((self.td / 'cache' / 'frame_sequences').iterdir())), 3)
+
+    def test_glob(self):
+        self.create_frames(range(5))
+        self.assertIsNotNone(frame_sequence(str(self.frames / '*.exr')))
+        self.create_frames([7])
+        os.utime(self.frames, ns=(0, os.stat(self.frames).st_mtime_ns + 1))
+        # the glob would include the file after the gap
+        self.assertIsNone(frame_sequence(str(self.frames / '*.exr')))
+
+
+class TestCommand(FrameDirTest):
+    def test_start_number_and_frames(self):
+        self.create_frames(range(90000, 90100))
+        cmd = FfmpegCommand()
+        cmd.src_file = self.frames
+        cmd.dst_file = '/tmp/out.mov'
+        self.assertEqual(find_item_after(cmd, '-start_number'), '90000')
+        self.assertEqual(find_item_after(cmd, '-i'),
+                         str(self.frames / 'img_%05d.exr'))
+        self.assertEqual(find_item_after(cmd, '-frames:v'), '100')
+
+    def test_trim(self):
+        self.create_frames(range(1, 10001))
+        cmd = FfmpegCommand()
+        cmd.src_file = self.frames
+        cmd.src_fps = 25
+        cmd.dst_file = '/tmp/out.mov'
+        cmd.dst_time_range.begin = 360
+        cmd.dst_time_range.duration = 20
+        args = list(cmd)
+        self.assertEqual(find_item_after(args, '-start_number'), '9001')
+        self.assertEqual(find_item_after(args, '-frames:v'), '500')
+        self.assertNotIn('-ss', args)
+        self.assertNotIn('-t', args)
+
+    def test_trim_to_the_end(self):
+        self.create_frames([*range(0, 100), *range(102, 200)])
+        cmd = FfmpegCommand()
+        cmd.src_file = self.frames
+        cmd.src_fps = 10
+        cmd.dst_file = '/tmp/out.mov'
+        cmd.dst_time_range.begin = 5
+        self.assertEqual(find_item_after(cmd, '-start_number'), '50')
+        # stops at the gap, as ffmpeg does
+        self.assertEqual(find_item_after(cmd, '-frames:v'), '50')
+        cmd.dst_time_range.begin = 10
+        with self.assertRaises(ValueError):
+            list(cmd)
+
+    def test_trim_without_fps(self):
+        self.create_frames(range(100))
+        cmd = FfmpegCommand()
+        cmd.src_file = self.frames
+        cmd.dst_file = '/tmp/out.mov'
+        cmd.dst_time_range.duration = 1
+        self.assertNotIn('-frames:v', list(cmd))
+
+    def test_video_file(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = self.td / 'src.mov'
+        cmd.dst_file = '/tmp/out.mov'
+        self.assertNotIn('-start_number', list(cmd))
+        self.assertNotIn('-frames:v', list(cmd))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from vtcff import FfmpegCommand, FramesWriter, VideoCopy, NoAudio, Scale, \
+    Transpose, iter_frames
+from vtcff._frames_reader import rawvideo_pixfmt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def create_test_source() -> FfmpegCommand:
+    cmd = FfmpegCommand()
+    cmd.custom.before_i.string = '-f lavfi'
+    cmd.src_file = 'testsrc=size=64x48:rate=10:duration=1'
+    return cmd
+
+
+class TestRawvideoPixfmt(unittest.TestCase):
+    def test(self):
+        self.assertEqual(rawvideo_pixfmt(8), 'rgb24')
+        self.assertEqual(rawvideo_pixfmt(10), 'rgb48le')
+        self.assertEqual(rawvideo_pixfmt(12, channels=4), 'rgba64le')
+        self.assertEqual(rawvideo_pixfmt(8, channels=1), 'gray')
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestIterFrames(unittest.TestCase):
+    def test_8bit(self):
+        frames = [f.copy() for f in iter_frames(create_test_source())]
+        self.assertEqual(len(frames), 10)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+        self.assertEqual(frames[0].dtype, np.uint8)
+
+    def test_filters_and_depth(self):
+        cmd = create_test_source()
+        cmd.scale = Scale(32, 24)
+        cmd.transpose = Transpose.CLOCKWISE
+        frames = list(iter_frames(cmd, src_pixfmt='yuv422p10le'))
+        self.assertEqual(frames[0].shape, (32, 24, 3))
+        self.assertEqual(frames[0].dtype, np.uint16)
+
+    def test_buffers_are_reused(self):
+        frames = list(iter_frames(create_test_source(), buffers=2))
+        self.assertIs(frames[0], frames[2])
+        self.assertIsNot(frames[0], frames[1])
+
+    def test_stop_early(self):
+        gen = iter_frames(create_test_source())
+        next(gen)
+        gen.close()
+
+    def test_wrong_size(self):
+        with self.assertRaises(ValueError):
+            list(iter_frames(create_test_source(), size=(63, 48)))
+
+    def test_fails(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = '/nonexistent/file.mov'
+        with self.assertRaises(subprocess.CalledProcessError):
+            list(iter_frames(cmd))
+
+    def test_roundtrip(self):
+        rnd = np.random.default_rng(1)
+        written = [rnd.integers(0, 65535, (48, 64, 3), dtype=np.uint16)
+                   for _ in range(3)]
+        with TemporaryDirectory() as tds:
+            dst = Path(tds) / 'raw.nut'
+            cmd = FfmpegCommand()
+            cmd.dst_file = dst
+            cmd.dst_codec_video = VideoCopy()
+            cmd.dst_codec_audio = NoAudio()
+            with FramesWriter(cmd, width=64, height=48,
+                              dtype='<u2') as writer:
+                for frame in written:
+                    writer.write(frame)
+
+            src = FfmpegCommand()
+            src.src_file = dst
+            read = [f.copy() for f in iter_frames(src, bpc=16)]
+        self.assertEqual(len(read), 3)
+        for a, b in zip(written, read):
+            self.assertTrue(np.array_equal(a, b))
+
+
+if __name__ == "__main__":
+    unittest.main()
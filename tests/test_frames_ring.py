@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import io
+import multiprocessing
+import unittest
+
+from vtcff import FfmpegCommand, FrameRing, Scale, decode_to_ring
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_SHAPE = (6, 8, 3)
+
+
+def _sum_frames(ring: FrameRing, results) -> None:
+    # top-level, so it works with the 'spawn' start method too
+    for number, frame in ring.frames():
+        results.put((number, int(frame.sum(dtype='uint64'))))
+    ring.close()
+
+
+def _consume(ring: FrameRing, workers: int, produce) -> dict:
+    ctx = multiprocessing.get_context()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_sum_frames, args=(ring, results))
+                 for _ in range(workers)]
+    for p in processes:
+        p.start()
+    count = produce()
+    sums = dict(results.get(timeout=30) for _ in range(count))
+    for p in processes:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+    return sums
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFrameRing(unittest.TestCase):
+    def test_fill_from_stream(self):
+        frames = [np.full(_SHAPE, i, dtype=np.uint16) for i in range(50)]
+        stream = io.BytesIO(b''.join(f.tobytes() for f in frames))
+        with FrameRing(_SHAPE, 'uint16', slots=3) as ring:
+            sums = _consume(ring, 3, lambda: ring.fill_from(stream))
+        self.assertEqual(sums, {i: int(f.sum()) for i, f in
+                                enumerate(frames)})
+
+    def test_in_process(self):
+        frames = [np.full(_SHAPE, i, dtype=np.uint8) for i in range(5)]
+        stream = io.BytesIO(b''.join(f.tobytes() for f in frames))
+        with FrameRing(_SHAPE, slots=8) as ring:
+            self.assertEqual(ring.fill_from(stream), 5)
+            numbers = [(n, int(f[0, 0, 0])) for n, f in ring.frames()]
+            self.assertEqual(numbers, [(i, i) for i in range(5)])
+            # the end mark stays for other readers
+            self.assertEqual(list(ring.frames()), [])
+
+    def test_close_with_referenced_frame(self):
+        stream = io.BytesIO(np.full(_SHAPE, 7, dtype=np.uint8).tobytes())
+        ring = FrameRing(_SHAPE, slots=2)
+        try:
+            ring.fill_from(stream)
+            for _, frame in ring.frames():
+                pass
+            ring.close()
+            # the memory is not unmapped under the array
+            self.assertEqual(int(frame[0, 0, 0]), 7)
+            self.assertIsNotNone(ring._shm.buf)
+            del frame
+            other = FrameRing(_SHAPE, slots=2)
+            other.close()
+            other.unlink()
+            self.assertIsNone(ring._shm.buf)
+        finally:
+            ring.unlink()
+
+    def test_partial_frame(self):
+        stream = io.BytesIO(b'\0' * (6 * 8 * 3 + 5))
+        with FrameRing(_SHAPE, slots=2) as ring:
+            with self.assertRaises(ValueError):
+                ring.fill_from(stream)
+            self.assertEqual(len(list(ring.frames())), 1)
+
+    def test_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            FrameRing((6, 8))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestDecodeToRing(unittest.TestCase):
+    def test_decode(self):
+        cmd = FfmpegCommand()
+        cmd.custom.before_i.string = '-f lavfi'
+        cmd.src_file = 'testsrc=size=64x48:rate=10:duration=2'
+        cmd.scale = Scale(8, 6)
+        with FrameRing(_SHAPE, slots=4) as ring:
+            sums = _consume(ring, 2, lambda: decode_to_ring(cmd, ring))
+        self.assertEqual(sorted(sums), list(range(20)))
+
+    def test_wrong_size(self):
+        cmd = FfmpegCommand()
+        cmd.custom.before_i.string = '-f lavfi'
+        cmd.src_file = 'testsrc=size=64x48:rate=10:duration=1'
+        with FrameRing(_SHAPE, slots=4) as ring:
+            with self.assertRaises(ValueError):
+                decode_to_ring(cmd, ring)
+            self.assertEqual(list(ring.frames()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from tests.common import find_item_after
+from vtcff import FfmpegCommand, Prores, NoAudio, FramesWriter
+from vtcff._pf_30_array_pixfmt import array_pixfmt, pixfmt_array_layout
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestArrayPixfmt(unittest.TestCase):
+    def test_uint8(self):
+        self.assertEqual(array_pixfmt(np.dtype('uint8'), 1), 'gray')
+        self.assertEqual(array_pixfmt(np.dtype('uint8'), 2), 'ya8')
+        self.assertEqual(array_pixfmt(np.dtype('uint8'), 3), 'rgb24')
+        self.assertEqual(array_pixfmt(np.dtype('uint8'), 4), 'rgba')
+
+    def test_uint16(self):
+        self.assertEqual(array_pixfmt(np.dtype('<u2'), 3), 'rgb48le')
+        self.assertEqual(array_pixfmt(np.dtype('>u2'), 4), 'rgba64be')
+        self.assertEqual(array_pixfmt(np.dtype('<u2'), 1), 'gray16le')
+
+    def test_float(self):
+        self.assertEqual(array_pixfmt(np.dtype('<f4'), 1), 'grayf32le')
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            array_pixfmt(np.dtype('int16'), 3)
+        with self.assertRaises(ValueError):
+            array_pixfmt(np.dtype('uint8'), 5)
+
+    def test_layout_roundtrip(self):
+        for dtype in ('|u1', '<u2', '>u2'):
+            for channels in (1, 2, 3, 4):
+                pixfmt = array_pixfmt(np.dtype(dtype), channels)
+                self.assertEqual(pixfmt_array_layout(pixfmt),
+                                 (dtype, channels))
+
+    def test_layout_of_planar(self):
+        with self.assertRaises(ValueError):
+            pixfmt_array_layout('yuv420p')
+
+
+def create_cmd(dst: Path) -> FfmpegCommand:
+    cmd = FfmpegCommand()
+    cmd.dst_file = dst
+    cmd.dst_codec_video = Prores()
+    cmd.dst_codec_audio = NoAudio()
+    return cmd
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFramesWriter(unittest.TestCase):
+    def test_args(self):
+        writer = FramesWriter(create_cmd(Path('out.mov')), width=64,
+                              height=48, dtype='uint16', fps=24)
+        self.assertEqual(find_item_after(writer.args, '-f'), 'rawvideo')
+        self.assertEqual(find_item_after(writer.args, '-pix_fmt'), 'rgb48le')
+        self.assertEqual(find_item_after(writer.args, '-s'), '64x48')
+        self.assertEqual(find_item_after(writer.args, '-i'), 'pipe:0')
+        self.assertLess(writer.args.index('-s'), writer.args.index('-i'))
+
+    def test_original_command_not_modified(self):
+        cmd = create_cmd(Path('out.mov'))
+        before = list(cmd)
+        FramesWriter(cmd, width=64, height=48)
+        self.assertEqual(list(cmd), before)
+
+    def test_write(self):
+        with TemporaryDirectory() as tds:
+            dst = Path(tds) / 'out.mov'
+            frame = np.zeros((48, 64, 3), dtype=np.uint16)
+            with FramesWriter(create_cmd(dst), width=64, height=48,
+                              dtype='uint16') as writer:
+                for i in range(5):
+                    frame[:, :, 0] = i * 1000
+                    writer.write(frame)
+                    # not C-contiguous
+                    writer.write(np.asfortranarray(frame))
+            self.assertEqual(writer.frames_written, 10)
+            self.assertGreater(dst.stat().st_size, 0)
+
+    def test_wrong_frame(self):
+        with TemporaryDirectory() as tds:
+            with FramesWriter(create_cmd(Path(tds) / 'out.mov'), width=64,
+                              height=48) as writer:
+                with self.assertRaises(ValueError):
+                    writer.write(np.zeros((48, 64, 4), dtype=np.uint8))
+                with self.assertRaises(ValueError):
+                    writer.write(np.zeros((48, 64, 3), dtype=np.uint16))
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    def test_ffmpeg_fails(self):
+        cmd = create_cmd(Path('/nonexistent/dir/out.mov'))
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        with self.assertRaises(subprocess.CalledProcessError):
+            with FramesWriter(cmd, width=64, height=48) as writer:
+                for _ in range(1000):
+                    writer.write(frame)
+
+
+if __name__ == "__main__":
+    unittest.main()
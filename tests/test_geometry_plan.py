@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import create_test_cmd, find_item_after
+from vtcff import Crop, Pad, Scale, FfmpegCommand, FilterGraph, \
+    iter_frames, plan_geometry, pixels_per_frame
+from vtcff._filter_transpose import TransposeFilter, Transpose
+from vtcff._filter_zscale import ZscaleFilter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def zscale(scaling: Scale, kernel: str = 'spline36') -> ZscaleFilter:
+    z = ZscaleFilter()
+    z.scaling = scaling
+    z.kernel = kernel
+    return z
+
+
+def transpose(kind: Transpose) -> TransposeFilter:
+    t = TransposeFilter()
+    t.kind = kind
+    return t
+
+
+def as_strings(filters):
+    return [str(f) for f in filters]
+
+
+class TestPixelsPerFrame(unittest.TestCase):
+    def test(self):
+        size = (3840, 2160)
+        self.assertEqual(pixels_per_frame([], size), 0)
+        self.assertEqual(pixels_per_frame([Crop(0, 0, 1920, 1080)], size), 0)
+        self.assertEqual(
+            pixels_per_frame([zscale(Scale(1920, 1080)),
+                              transpose(Transpose.CLOCKWISE)], size),
+            3840 * 2160 + 1920 * 1080)
+        self.assertIsNone(pixels_per_frame(['hflip'], size))
+
+
+class TestPlan(unittest.TestCase):
+    def test_downscale_before_transpose(self):
+        plan = plan_geometry([transpose(Transpose.CLOCKWISE),
+                              zscale(Scale(-2, 1080))], (3840, 2160))
+        self.assertEqual(as_strings(plan.filters),
+                         ['zscale=filter=spline36:w=1080:h=-2:'
+                          'dither=error_diffusion', 'transpose=1'])
+        self.assertLess(plan.pixels_per_frame,
+                        plan.unplanned_pixels_per_frame)
+
+    def test_upscale_after_transpose(self):
+        filters = [transpose(Transpose.CLOCKWISE), zscale(Scale(-2, 3840))]
+        plan = plan_geometry(filters, (1920, 1080))
+        self.assertEqual(list(plan.filters), filters)
+
+    def test_crop_before_scale(self):
+        plan = plan_geometry([zscale(Scale(1920, 1080), 'point'),
+                              Crop(100, 50, 1600, 900)], (3840, 2160))
+        self.assertEqual(as_strings(plan.filters),
+                         ['crop=3200:1800:200:100',
+                          'zscale=filter=point:w=1600:h=900:'
+                          'dither=error_diffusion'])
+
+    def test_crop_not_moved_across_resampling(self):
+        filters = [zscale(Scale(1920, 1080)), Crop(100, 50, 1600, 900)]
+        plan = plan_geometry(filters, (3840, 2160))
+        self.assertEqual(list(plan.filters), filters)
+
+    def test_inexact_crop_is_not_moved(self):
+        # 101 × 1.5 is not a whole pixel of the source
+        filters = [zscale(Scale(2560, 1440), 'point'),
+                   Crop(101, 50, 1600, 900)]
+        plan = plan_geometry(filters, (3840, 2160))
+        self.assertEqual(list(plan.filters), filters)
+
+    def test_odd_crop_is_not_moved(self):
+        # the crop would start at the pixel 101 of the source
+        filters = [zscale(Scale(1920, 1080), 'point'),
+                   Crop(100, 50, 1600, 900)]
+        plan = plan_geometry(filters, (3838, 2158))
+        self.assertEqual(list(plan.filters), filters)
+
+    def test_pad_after_downscale(self):
+        plan = plan_geometry([Pad(0, 140, 1920, 1360),
+                              zscale(Scale(960, 680), 'point')],
+                             (1920, 1080))
+        self.assertEqual(as_strings(plan.filters),
+                         ['zscale=filter=point:w=960:h=540:'
+                          'dither=error_diffusion',
+                          str(Pad(0, 70, 960, 680))])
+
+    def test_pad_not_moved_across_resampling(self):
+        filters = [Pad(0, 140, 1920, 1360), zscale(Scale(960, 680))]
+        self.assertEqual(list(plan_geometry(filters, (1920, 1080)).filters),
+                         filters)
+
+    def test_pad_not_moved_across_color_conversion(self):
+        z = zscale(Scale(960, 680), 'point')
+        z.dst_matrix = '709'
+        filters = [Pad(0, 140, 1920, 1360), z]
+        self.assertEqual(list(plan_geometry(filters, (1920, 1080)).filters),
+                         filters)
+
+    def test_crop_before_transpose(self):
+        plan = plan_geometry([transpose(Transpose.CLOCKWISE),
+                              zscale(Scale(540, 960), 'point'),
+                              Crop(0, 0, 540, 540)], (1920, 1080))
+        self.assertIsInstance(plan.filters[0], Crop)
+        self.assertLess(plan.pixels_per_frame,
+                        plan.unplanned_pixels_per_frame)
+
+
+class TestCommand(unittest.TestCase):
+    def test_reorder(self):
+        cmd = create_test_cmd()
+        cmd.transpose = Transpose.CLOCKWISE
+        cmd.scale = Scale(-2, 1080)
+        self.assertTrue(find_item_after(cmd, '-vf').startswith('transpose'))
+        cmd.src_width, cmd.src_height = 3840, 2160
+        self.assertTrue(find_item_after(cmd, '-vf').startswith('zscale'))
+        plan = cmd.geometry_plan()
+        self.assertLess(plan.pixels_per_frame,
+                        plan.unplanned_pixels_per_frame)
+
+        cmd.reorder_filters = False
+        self.assertTrue(find_item_after(cmd, '-vf').startswith('transpose'))
+        plan = cmd.geometry_plan()
+        self.assertEqual(plan.pixels_per_frame,
+                         plan.unplanned_pixels_per_frame)
+
+    def test_crop_before_point_scaler(self):
+        cmd = create_test_cmd()
+        cmd.src_width, cmd.src_height = 3840, 2160
+        cmd.scale = Scale(1920, 1080)
+        cmd.crop = Crop(100, 50, 1600, 900)
+        # the kernel of the tier resamples, so the crop stays after it
+        self.assertEqual([type(f) for f in cmd.geometry_plan().filters],
+                         [ZscaleFilter, Crop])
+        # the kernel set for the filter is kept by the tier
+        cmd._zscale().kernel = 'point'
+        self.assertEqual(find_item_after(cmd, '-vf'),
+                         'crop=3200:1800:200:100,'
+                         'zscale=filter=point:w=1600:h=900:'
+                         'dither=error_diffusion')
+
+    def test_unknown_size(self):
+        with self.assertRaises(ValueError):
+            create_test_cmd().geometry_plan()
+
+
+def _decode(filters):
+    cmd = FfmpegCommand()
+    cmd.custom.before_i.string = '-f lavfi'
+    cmd.src_file = 'testsrc=size=64x48:rate=1:duration=1'
+    cmd.filter_graph = FilterGraph()
+    cmd.filter_graph.add('0:v', filters)
+    return [f.copy() for f in iter_frames(cmd)]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestSameFrames(unittest.TestCase):
+    """Runs the filters in both orders and compares the frames."""
+
+    def assertSameFrames(self, filters, src_size=(64, 48)):
+        plan = plan_geometry(filters, src_size)
+        self.assertNotEqual(as_strings(plan.filters), as_strings(filters))
+        [expected] = _decode(filters)
+        [planned] = _decode(plan.filters)
+        self.assertTrue(np.array_equal(expected, planned))
+
+    def test_crop_across_transpose(self):
+        for kind in Transpose:
+            with self.subTest(kind):
+                self.assertSameFrames([transpose(kind),
+                                       Crop(4, 6, 20, 30)])
+
+    def test_pad_across_transpose(self):
+        for kind in Transpose:
+            with self.subTest(kind):
+                self.assertSameFrames([Pad(2, 10, 80, 60),
+                                       transpose(kind)])
+
+    def test_crop_across_scaler(self):
+        self.assertSameFrames([zscale(Scale(32, 24), 'point'),
+                               Crop(4, 2, 16, 12)])
+
+    def test_pad_across_scaler(self):
+        self.assertSameFrames([Pad(0, 16, 64, 80),
+                               zscale(Scale(32, 40), 'point')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import create_test_cmd, find_item_after
+from vtcff import FfmpegCommand, iter_frames, _letterbox
+from vtcff._math_padding import LetterboxSizes, _chroma_alignment
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def sizes_tuple(s: LetterboxSizes):
+    return (s.picture_width, s.picture_height,
+            s.pad_left, s.pad_right, s.pad_top, s.pad_bottom)
+
+
+class TestLetterboxSizes(unittest.TestCase):
+    def test_letterbox(self):
+        self.assertEqual(sizes_tuple(LetterboxSizes(8192, 4320, 1920, 1080)),
+                         (1920, 1012, 0, 0, 34, 34))
+
+    def test_pillarbox(self):
+        self.assertEqual(sizes_tuple(LetterboxSizes(1440, 1080, 1920, 1080)),
+                         (1440, 1080, 240, 240, 0, 0))
+
+    def test_same_aspect(self):
+        self.assertEqual(sizes_tuple(LetterboxSizes(3840, 2160, 1920, 1080)),
+                         (1920, 1080, 0, 0, 0, 0))
+
+    def test_alignment(self):
+        # 1920 * 1080 / 2048 = 1012.5
+        s = LetterboxSizes(2048, 1080, 1920, 1080, align_x=4, align_y=4)
+        self.assertEqual(s.picture_height % 4, 0)
+        self.assertEqual(s.pad_top % 4, 0)
+        self.assertEqual(s.pad_top + s.picture_height + s.pad_bottom, 1080)
+
+        s = LetterboxSizes(1000, 1000, 1921, 1080, align_x=4, align_y=1)
+        self.assertEqual(s.picture_width % 4, 0)
+        self.assertEqual(s.pad_left % 4, 0)
+        self.assertEqual(s.pad_left + s.picture_width + s.pad_right, 1921)
+
+    def test_chroma_alignment(self):
+        self.assertEqual(_chroma_alignment('yuv420p10le'), (2, 2))
+        self.assertEqual(_chroma_alignment('yuv422p10le'), (2, 1))
+        self.assertEqual(_chroma_alignment('yuv444p'), (1, 1))
+        self.assertEqual(_chroma_alignment(None), (2, 2))
+
+
+class TestLetterboxCommand(unittest.TestCase):
+    def test_pad_after_scale(self):
+        cmd = create_test_cmd()
+        cmd.dst_pixfmt = 'yuv422p10le'
+        _letterbox(cmd, 8192, 4320, 1920, 1080)
+        self.assertEqual(
+            find_item_after(cmd, '-vf'),
+            'zscale=filter=spline36:w=1920:h=1012:dither=error_diffusion,'
+            'pad=width=1920:height=1080:x=0:y=34:color=black')
+
+    def test_pad_after_scale_without_zscale(self):
+        # the fallback of adapt_to_ffmpeg for the builds without zimg
+        cmd = create_test_cmd()
+        _letterbox(cmd, 3840, 1600, 1920, 1080)
+        cmd.use_zscale = False
+        self.assertTrue(find_item_after(cmd, '-vf').startswith(
+            'scale=width=1920:height=800,pad=width=1920:height=1080'))
+
+    def test_same_aspect(self):
+        cmd = create_test_cmd()
+        _letterbox(cmd, 3840, 2160, 1920, 1080)
+        self.assertEqual(
+            find_item_after(cmd, '-vf'),
+            'zscale=filter=spline36:w=1920:h=1080:dither=error_diffusion')
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_frames(self):
+        cmd = FfmpegCommand()
+        cmd.custom.before_i.string = '-f lavfi'
+        cmd.src_file = 'testsrc=size=320x240:rate=1:duration=1'
+        _letterbox(cmd, 320, 240, 320, 180)
+        [frame] = [f.copy() for f in iter_frames(cmd)]
+        self.assertEqual(frame.shape, (180, 320, 3))
+        self.assertEqual(frame[:, :40].max(), 0)
+        self.assertEqual(frame[:, 280:].max(), 0)
+        self.assertGreater(frame[:, 40:280].max(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import random
+import unittest
+
+from vtcff import Crop, FfmpegCommand, crop_and_scale, crop_and_scale_many
+from vtcff._math_cropping import crop_height, crop_size
+
+
+def brute_force_crop_height(width, aspect, div=1):
+    # the original search, one pixel at a time
+    aspect_f = aspect[0] / aspect[1]
+    for w in range(width, 0, -1):
+        if w % div != 0:
+            continue
+        h = int(round(w / aspect_f))
+        if h % div != 0:
+            continue
+        if round(h * aspect_f) == w:
+            return w, h
+    return None, None
+
+
+class TestCropHeight(unittest.TestCase):
+    def test_example(self):
+        self.assertEqual(crop_height(5472, (4096, 2160)), (5471, 2885))
+
+    def test_same_as_brute_force(self):
+        rnd = random.Random(42)
+        aspects = [(16, 9), (4, 3), (1920, 1080), (4096, 2160), (1998, 1080),
+                   (2048, 858), (9, 16), (1, 1), (37, 20), (239, 100),
+                   (720, 576), (1, 7)]
+        for _ in range(3000):
+            width = rnd.randint(1, 9000)
+            aspect = rnd.choice(aspects)
+            div = rnd.choice([1, 2, 4, 8, 16, 3])
+            with self.subTest(width=width, aspect=aspect, div=div):
+                self.assertEqual(crop_height(width, aspect, div),
+                                 brute_force_crop_height(width, aspect, div))
+
+    def test_not_found(self):
+        self.assertEqual(crop_height(1, (16, 9), div=2), (None, None))
+
+    def test_crop_size(self):
+        self.assertEqual(crop_size((4096, 2160), (1920, 1080), div=2),
+                         (3840, 2160))
+
+
+class TestCropAndScaleMany(unittest.TestCase):
+    def test_same_as_single(self):
+        src = [(4096, 2160), (1920, 1080), (5472, 3076), (4096, 2160)]
+        dst = [(1920, 1080), (1080, 1920), (4096, 2160), (1080, 1080)]
+        expected = []
+        for (sw, sh), (dw, dh) in zip(src, dst):
+            cmd = FfmpegCommand()
+            crop_and_scale(cmd, sw, sh, dw, dh)
+            expected.append(cmd.crop)
+        self.assertEqual(crop_and_scale_many(src, dst), expected)
+        self.assertEqual(expected[0], Crop(128, 0, 3840, 2160))
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            crop_and_scale_many([(1920, 1080)], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import DATA_DIR
+from vtcff import find_pixfmts, pixfmt_info, pixfmt_bpc, pixfmt_alpha, \
+    pixfmt_subsampling
+from vtcff._pf_00_pixfmt_table import PIXFMTS
+from vtcff._pf_10_pixfmts_stdout_parser import _parse_pix_fmts_stdout
+
+
+class TestTable(unittest.TestCase):
+    def test_matches_ffmpeg_output(self):
+        specs = _parse_pix_fmts_stdout(
+            (DATA_DIR / 'ffmpeg_pix_fmts.txt').read_text())
+        self.assertEqual(len(specs), len(PIXFMTS))
+        for spec in specs:
+            info = PIXFMTS[spec.name]
+            self.assertEqual(info.components, spec.nb_components)
+            self.assertEqual(info.bits_per_pixel, spec.bits_per_pixel)
+
+    def test_values(self):
+        self.assertEqual(pixfmt_info('p010le').bpc, 10)
+        self.assertEqual(pixfmt_info('p010le').subsampling, '420')
+        self.assertEqual(pixfmt_info('nv12').bpc, 8)
+        self.assertTrue(pixfmt_info('nv12').planar)
+        self.assertFalse(pixfmt_info('rgb48be').planar)
+        self.assertEqual(pixfmt_info('rgb48be').endian, 'be')
+        self.assertIsNone(pixfmt_info('rgb24').endian)
+        self.assertTrue(pixfmt_info('ya16le').alpha)
+        self.assertIsNone(pixfmt_info('cuda').bpc)
+        self.assertIsNone(pixfmt_info('labuda'))
+
+
+class TestQuery(unittest.TestCase):
+    def test_find(self):
+        self.assertEqual(find_pixfmts(bpc=10, subsampling='422', alpha=True),
+                         ['yuva422p10be', 'yuva422p10le'])
+        self.assertEqual(
+            find_pixfmts(bpc=16, subsampling='444', alpha=True, planar=False,
+                         endian='le'),
+            ['rgba64le', 'bgra64le', 'ayuv64le'])
+
+    def test_no_criteria(self):
+        self.assertEqual(len(find_pixfmts()), len(PIXFMTS))
+
+    def test_nothing_found(self):
+        self.assertEqual(find_pixfmts(bpc=11), [])
+
+    def test_unknown_field(self):
+        with self.assertRaises(TypeError):
+            find_pixfmts(color='red')
+
+
+class TestNoFfmpegNeeded(unittest.TestCase):
+    # the executable does not exist, so any attempt to run it would fail
+
+    def test_bpc(self):
+        self.assertEqual(pixfmt_bpc('yuv422p10le', '/nonexistent/ffmpeg'), 10)
+        self.assertEqual(pixfmt_bpc('nv12', '/nonexistent/ffmpeg'), 8)
+
+    def test_alpha(self):
+        self.assertTrue(pixfmt_alpha('yuva444p10le', '/nonexistent/ffmpeg'))
+        self.assertIsNone(pixfmt_alpha('ya8', '/nonexistent/ffmpeg'))
+
+    def test_subsampling(self):
+        self.assertEqual(pixfmt_subsampling('nv16'), '422')
+        self.assertIsNone(pixfmt_subsampling('gray10le'))
+
+    def test_unknown_needs_ffmpeg(self):
+        with self.assertRaises(FileNotFoundError):
+            pixfmt_bpc('some_future_format', '/nonexistent/ffmpeg')
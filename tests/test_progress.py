@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import subprocess
+import sys
+import unittest
+
+from tests.common import create_test_cmd
+from vtcff import FfmpegProgress
+from vtcff._progress import ProgressParser, iter_progress, with_progress_args
+
+SAMPLE = """frame=120
+fps=24.50
+stream_0_0_q=28.0
+bitrate=1534.2kbits/s
+total_size=921600
+out_time_us=5000000
+out_time_ms=5000000
+out_time=00:00:05.000000
+dup_frames=0
+drop_frames=0
+speed=1.02x
+progress=continue
+frame=240
+fps=N/A
+bitrate=N/A
+total_size=N/A
+out_time_us=N/A
+speed=N/A
+progress=end
+"""
+
+
+def feed_all(text: str):
+    parser = ProgressParser()
+    return [e for e in (parser.feed(line) for line in text.splitlines())
+            if e is not None]
+
+
+class TestProgressParser(unittest.TestCase):
+    def test_blocks(self):
+        events = feed_all(SAMPLE)
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0],
+                         FfmpegProgress(frame=120, fps=24.5, out_time=5.0,
+                                        speed=1.02, bitrate=1534.2,
+                                        total_size=921600, done=False))
+
+    def test_not_available(self):
+        last = feed_all(SAMPLE)[-1]
+        self.assertEqual(last.frame, 240)
+        self.assertIsNone(last.fps)
+        self.assertIsNone(last.bitrate)
+        self.assertIsNone(last.total_size)
+        self.assertIsNone(last.out_time)
+        self.assertIsNone(last.speed)
+        self.assertTrue(last.done)
+
+    def test_garbage_ignored(self):
+        self.assertEqual(feed_all("hello\n\nprogress=end\n"),
+                         [FfmpegProgress(done=True)])
+
+
+class TestProgressArgs(unittest.TestCase):
+    def test_after_exe(self):
+        args = with_progress_args(list(create_test_cmd()))
+        self.assertEqual(args[:4], ['ffmpeg', '-progress', 'pipe:1',
+                                    '-nostats'])
+
+
+async def collect(args):
+    return [e async for e in iter_progress(args)]
+
+
+class TestIterProgress(unittest.TestCase):
+    def test_fake_process(self):
+        script = f"import sys; sys.stdout.write({SAMPLE!r})"
+        events = asyncio.run(collect([sys.executable, '-c', script]))
+        self.assertEqual([e.frame for e in events], [120, 240])
+
+    def test_failure(self):
+        script = "import sys; sys.stderr.write('boom'); sys.exit(3)"
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            asyncio.run(collect([sys.executable, '-c', script]))
+        self.assertEqual(cm.exception.returncode, 3)
+        self.assertEqual(cm.exception.stderr, b'boom')
@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from tests.common import find_item_after
+from vtcff import FfmpegCommand, Rendition, Prores, Hevc, Avc, Crop, Scale, \
+    NoAudio, add_ladder
+
+
+def create_cmd(use_zscale: bool = True) -> FfmpegCommand:
+    cmd = FfmpegCommand(use_zscale=use_zscale)
+    cmd.src_file = "/tmp/path/to/src.mov"
+    cmd.add_rendition(Rendition("/tmp/master.mov", Prores()))
+    cmd.add_rendition(Rendition("/tmp/proxy.mp4", Hevc(mbps=5),
+                                scale=Scale(1920, -2),
+                                dst_pixfmt='yuv420p10le'))
+    cmd.add_rendition(Rendition("/tmp/preview.mp4", Avc(),
+                                scale=Scale(640, -2),
+                                dst_pixfmt='yuv420p'))
+    return cmd
+
+
+class TestRenditionArgs(unittest.TestCase):
+    def test_single_decode(self):
+        args = list(create_cmd())
+        self.assertEqual(args.count('-i'), 1)
+        self.assertNotIn('-vf', args)
+        self.assertEqual(args[-1], "/tmp/preview.mp4")
+        self.assertEqual([a for a in args if a.startswith('/tmp/')
+                          and a != "/tmp/path/to/src.mov"],
+                         ["/tmp/master.mov", "/tmp/proxy.mp4",
+                          "/tmp/preview.mp4"])
+
+    def test_graph(self):
+        cmd = create_cmd()
+        cmd.crop = Crop(0, 0, 3840, 2000)
+        graph = find_item_after(cmd, '-filter_complex')
+        self.assertEqual(
+            graph,
+            '[0:v]crop=3840:2000:0:0,split=3[v0][s1][s2];'
+            '[s1]zscale=filter=spline36:w=1920:h=-2:'
+            'dither=error_diffusion,format=yuv420p10le[v1];'
+            '[s2]zscale=filter=spline36:w=640:h=-2:'
+            'dither=error_diffusion,format=yuv420p[v2]')
+
+    def test_graph_swscale(self):
+        graph = find_item_after(create_cmd(use_zscale=False),
+                                '-filter_complex')
+        self.assertIn('[s1]scale=width=1920:height=-2,format=yuv420p10le[v1]',
+                      graph)
+
+    def test_per_output_options(self):
+        cmd = create_cmd()
+        cmd.dst_time_range.duration = 5
+        args = list(cmd)
+        self.assertEqual(args.count('-t'), 3)
+        self.assertEqual(args.count('-codec:v'), 3)
+        proxy = args[args.index('[v1]'):args.index('/tmp/proxy.mp4')]
+        self.assertEqual(find_item_after(proxy, '-codec:v'), 'libx265')
+        self.assertEqual(find_item_after(proxy, '-pix_fmt'), 'yuv420p10le')
+
+    def test_no_audio(self):
+        cmd = create_cmd()
+        cmd.renditions[1].dst_codec_audio = NoAudio()
+        args = list(cmd)
+        self.assertEqual(args.count('0:a?'), 3)
+        self.assertEqual(args.count('-an'), 1)
+
+    def test_changes_are_compiled(self):
+        cmd = create_cmd()
+        before = str(cmd)
+        cmd.renditions[2].scale = Scale(320, -2)
+        self.assertNotEqual(str(cmd), before)
+        self.assertIn('w=320', str(cmd))
+
+    def test_dst_file_conflict(self):
+        cmd = create_cmd()
+        cmd.dst_file = "/tmp/dst.mov"
+        with self.assertRaises(ValueError):
+            list(cmd)
+
+    def test_rendition_without_file(self):
+        cmd = create_cmd()
+        cmd.add_rendition(Rendition(dst_codec_video=Avc()))
+        with self.assertRaises(ValueError):
+            list(cmd)
+
+
+class TestScaleFrom(unittest.TestCase):
+    def test_cascade(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        big = cmd.add_rendition(Rendition("/tmp/big.mp4", Avc(),
+                                          scale=Scale(-2, 1080)))
+        cmd.add_rendition(Rendition("/tmp/master.mov", Prores()))
+        cmd.add_rendition(Rendition("/tmp/small.mp4", Avc(),
+                                    scale=Scale(-2, 360), scale_from=big))
+        self.assertEqual(
+            find_item_after(cmd, '-filter_complex'),
+            '[0:v]split=2[s0][v1];'
+            '[s0]zscale=filter=spline36:w=-2:h=1080:dither=error_diffusion,'
+            'split=2[v0][s2];'
+            '[s2]zscale=filter=spline36:w=-2:h=360:dither=error_diffusion[v2]')
+
+    def test_cascade_with_pixfmt(self):
+        # the smaller rendition is scaled from the frames before
+        # the conversion to the pixel format of the bigger one
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        big = cmd.add_rendition(Rendition("/tmp/big.mp4", Avc(),
+                                          scale=Scale(-2, 1080),
+                                          dst_pixfmt='yuv420p'))
+        cmd.add_rendition(Rendition("/tmp/small.mp4", Avc(),
+                                    scale=Scale(-2, 360), scale_from=big,
+                                    dst_pixfmt='yuv420p10le'))
+        self.assertEqual(
+            find_item_after(cmd, '-filter_complex'),
+            '[0:v]null[s0];'
+            '[s0]zscale=filter=spline36:w=-2:h=1080:dither=error_diffusion,'
+            'split=2[f0][s1];'
+            '[f0]format=yuv420p[v0];'
+            '[s1]zscale=filter=spline36:w=-2:h=360:dither=error_diffusion,'
+            'format=yuv420p10le[v1]')
+
+    def test_single_output(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        cmd.add_rendition(Rendition("/tmp/master.mov", Prores()))
+        self.assertEqual(find_item_after(cmd, '-filter_complex'),
+                         '[0:v]null[v0]')
+
+    def test_parent_must_be_added_before(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        other = Rendition("/tmp/other.mp4", Avc())
+        cmd.add_rendition(Rendition("/tmp/small.mp4", Avc(),
+                                    scale=Scale(-2, 360), scale_from=other))
+        with self.assertRaises(ValueError):
+            list(cmd)
+
+
+class TestLadder(unittest.TestCase):
+    def test_ladder(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        renditions = add_ladder(cmd, [(720, 3), (1080, 6), (360, 0.8)],
+                                "/tmp/out_{height}p.mp4")
+        self.assertEqual([r.dst_file for r in renditions],
+                         ["/tmp/out_1080p.mp4", "/tmp/out_720p.mp4",
+                          "/tmp/out_360p.mp4"])
+        self.assertIsNone(renditions[0].scale_from)
+        self.assertIs(renditions[1].scale_from, renditions[0])
+        self.assertIs(renditions[2].scale_from, renditions[1])
+
+        args = list(cmd)
+        self.assertEqual(args.count('-i'), 1)
+        self.assertEqual([args[i + 1] for i, a in enumerate(args)
+                          if a == '-b:v'], ['6000k', '3000k', '800k'])
+        graph = find_item_after(args, '-filter_complex')
+        self.assertTrue(graph.startswith('[0:v]null[s0];'), graph)
+        self.assertIn('h=360', graph.split(';')[-1])
+
+    def test_hevc(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = "/tmp/src.mov"
+        add_ladder(cmd, [(1080, 6), (720, 3)], "/tmp/{height}.mp4",
+                   codec=Hevc)
+        self.assertEqual(str(cmd).count('libx265'), 2)
+
+    def test_unique_heights(self):
+        with self.assertRaises(ValueError):
+            add_ladder(FfmpegCommand(), [(720, 3), (720, 2)], "/tmp/{height}")
+
+
+class TestRenditionRun(unittest.TestCase):
+    def test_run(self):
+        with TemporaryDirectory() as tds:
+            td = Path(tds)
+            cmd = FfmpegCommand()
+            cmd.custom.before_i.string = '-f lavfi'
+            cmd.src_file = 'testsrc=size=320x240:rate=10:duration=1,' \
+                           'format=yuv420p'
+            cmd.add_rendition(Rendition(td / 'a.mov', Prores()))
+            cmd.add_rendition(Rendition(td / 'b.mp4', Avc(),
+                                        scale=Scale(160, -2),
+                                        dst_pixfmt='yuv420p'))
+            subprocess.check_call(list(cmd),
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+            self.assertGreater((td / 'a.mov').stat().st_size, 0)
+            self.assertGreater((td / 'b.mp4').stat().st_size, 0)
+
+    def test_run_ladder(self):
+        with TemporaryDirectory() as tds:
+            td = Path(tds)
+            cmd = FfmpegCommand()
+            cmd.custom.before_i.string = '-f lavfi'
+            cmd.src_file = 'testsrc=size=320x240:rate=10:duration=1,' \
+                           'format=yuv420p'
+            add_ladder(cmd, [(240, 1), (120, 0.3), (60, 0.1)],
+                       td / '{height}.mp4')
+            subprocess.check_call(list(cmd),
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+            for height in (240, 120, 60):
+                self.assertGreater((td / f'{height}.mp4').stat().st_size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
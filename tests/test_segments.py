@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from tests.common import create_test_cmd, unique_item_after
+from vtcff import Hevc, NoAudio, plan_segments, split_time_range, Avc, \
+    FfmpegCommand, encode_segmented, Seek
+from vtcff._segments import _concat_list_line, _frame_ranges
+
+
+class TestSplitTimeRange(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(split_time_range(10, 30, 3),
+                         [(10, 10), (20, 10), (30, 10)])
+
+    def test_adjacent(self):
+        parts = split_time_range(0.5, 7200.3, 7)
+        for (b1, d1), (b2, _) in zip(parts, parts[1:]):
+            self.assertEqual(b1 + d1, b2)
+        self.assertEqual(parts[-1][0] + parts[-1][1], 0.5 + 7200.3)
+
+    def test_wrong_args(self):
+        with self.assertRaises(ValueError):
+            split_time_range(0, 10, 0)
+        with self.assertRaises(ValueError):
+            split_time_range(0, 0, 2)
+
+
+class TestFrameRanges(unittest.TestCase):
+    def test_adjacent(self):
+        # 250 frames in 3 segments: 83.33 frames each
+        ranges = _frame_ranges(split_time_range(0, 10, 3), 25)
+        self.assertEqual(ranges, [(0, 83), (83, 84), (167, 83)])
+
+    def test_empty_dropped(self):
+        self.assertEqual(_frame_ranges([(0, 1), (1, 0.01), (1.01, 1)], 25),
+                         [(0, 25), (25, 25)])
+
+
+def hevc_cmd():
+    cmd = create_test_cmd()
+    cmd.dst_codec_video = Hevc(mbps=100, near_lossless=True)
+    return cmd
+
+
+class TestPlan(unittest.TestCase):
+    def test_segments(self):
+        cmd = hevc_cmd()
+        plan = plan_segments(cmd, 4, "/tmp/work", src_duration=100,
+                             src_fps=25)
+        self.assertEqual(len(plan.segments), 4)
+        # a quarter of a frame before the first frame of each segment
+        self.assertEqual([s.dst_time_range.begin for s in plan.segments],
+                         [0, 24.99, 49.99, 74.99])
+        self.assertEqual([s.dst_time_range.duration for s in plan.segments],
+                         [24.99, 25, 25, 25])
+        for seg in plan.segments:
+            self.assertEqual(seg.dst_time_range.seek, Seek.FAST)
+            self.assertIsInstance(seg.dst_codec_audio, NoAudio)
+            self.assertIn('-an', list(seg))
+            self.assertIn('libx265', list(seg))
+        self.assertEqual(plan.segments[1].dst_file,
+                         Path("/tmp/work/segment_0001.mov"))
+        # the original command is not changed
+        self.assertIsNone(cmd.dst_time_range.duration)
+
+    def test_input_seeking(self):
+        plan = plan_segments(hevc_cmd(), 4, "/tmp/work", src_duration=100,
+                             src_fps=25)
+        args = list(plan.segments[3])
+        # the seek before -i jumps close to the start of the segment
+        self.assertEqual(args[args.index('-ss') + 1], '73.99')
+        self.assertLess(args.index('-ss'), args.index('-i'))
+
+    def test_time_range_of_command(self):
+        cmd = hevc_cmd()
+        cmd.dst_time_range.begin = 10
+        cmd.dst_time_range.duration = 20
+        plan = plan_segments(cmd, 2, "/tmp/work", src_fps=25)
+        self.assertEqual([(s.dst_time_range.begin, s.dst_time_range.duration)
+                          for s in plan.segments],
+                         [(9.99, 10), (19.99, 10)])
+        # audio is cut from the source with the same range
+        self.assertEqual(unique_item_after(plan.join_args, '-ss'), '10.0')
+        self.assertEqual(unique_item_after(plan.join_args, '-t'), '20.0')
+
+    def test_duration_required(self):
+        with self.assertRaises(ValueError):
+            plan_segments(hevc_cmd(), 2, "/tmp/work", src_fps=25)
+
+    def test_fps_required(self):
+        with self.assertRaises(ValueError):
+            plan_segments(hevc_cmd(), 2, "/tmp/work", src_duration=10)
+
+    def test_join(self):
+        plan = plan_segments(hevc_cmd(), 2, "/tmp/work", src_duration=10,
+                             src_fps=25)
+        args = plan.join_args
+        self.assertEqual(unique_item_after(args, '-f'), 'concat')
+        self.assertEqual(unique_item_after(args, '-codec:v'), 'copy')
+        self.assertEqual(unique_item_after(args, '-codec:a'), 'copy')
+        self.assertIn('/tmp/path/to/src.mov', args)
+        self.assertEqual(args[-1], '/tmp/path/to/dst.mov')
+
+    def test_join_without_audio(self):
+        cmd = hevc_cmd()
+        cmd.dst_codec_audio = NoAudio()
+        args = plan_segments(cmd, 2, "/tmp/work", src_duration=10,
+                             src_fps=25).join_args
+        self.assertNotIn('/tmp/path/to/src.mov', args)
+        self.assertIn('-an', args)
+
+    def test_concat_line_escaping(self):
+        self.assertEqual(_concat_list_line(Path("/a/it's.mov")),
+                         "file '/a/it'\\''s.mov'")
+
+
+def _count_frames(file: Path) -> int:
+    # one line per frame, besides the comments
+    out = subprocess.check_output(
+        ['ffmpeg', '-v', 'error', '-i', str(file), '-map', '0:v',
+         '-f', 'framemd5', '-'], encoding='utf-8')
+    return sum(1 for line in out.splitlines()
+               if line and not line.startswith('#'))
+
+
+class TestEncodeSegmented(unittest.TestCase):
+    def test_frames_not_duplicated(self):
+        with TemporaryDirectory() as tds:
+            td = Path(tds)
+            src = td / 'src.mp4'
+            # keyframes every 10 frames, so the segments do not start
+            # at keyframes
+            subprocess.check_call(
+                ['ffmpeg', '-v', 'error', '-f', 'lavfi',
+                 '-i', 'testsrc=size=160x120:rate=25:duration=10',
+                 '-codec:v', 'libx264', '-g', '10', '-pix_fmt', 'yuv420p',
+                 str(src)])
+            self.assertEqual(_count_frames(src), 250)
+
+            for count in (3, 7):
+                with self.subTest(count=count):
+                    cmd = FfmpegCommand()
+                    cmd.src_file = src
+                    cmd.dst_file = td / f'dst_{count}.mp4'
+                    cmd.dst_codec_video = Avc()
+                    cmd.dst_codec_audio = NoAudio()
+                    encode_segmented(cmd, count, src_duration=10, src_fps=25)
+                    self.assertEqual(_count_frames(cmd.dst_file), 250)
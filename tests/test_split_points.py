@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from tests.common import create_test_cmd
+from vtcff import SplitPointIndex, plan_segments, Hevc, Seek
+from vtcff._disk_cache import file_key, read_cached, write_cached
+from vtcff._split_points import _parse_keyframe_packets, \
+    _parse_scene_metadata, _CACHE_VERSION
+
+
+class TestParsers(unittest.TestCase):
+    def test_packets(self):
+        txt = ("packet,0.000000,K_\npacket,0.041667,__\npacket,N/A,K_\n"
+               "packet,2.000000,K_\nstream,0.000000\n")
+        self.assertEqual(_parse_keyframe_packets(txt), [0.0, 2.0])
+
+    def test_packets_start_time(self):
+        # -ss and the frames start from zero, the packets do not
+        txt = "packet,1.400000,K__\npacket,3.400000,K__\nstream,1.400000\n"
+        self.assertEqual(_parse_keyframe_packets(txt), [0.0, 2.0])
+        txt = "packet,1.400000,K__\nstream,N/A\n"
+        self.assertEqual(_parse_keyframe_packets(txt), [1.4])
+
+    def test_scenes(self):
+        txt = ("frame:0    pts:12288   pts_time:8\n"
+               "lavfi.scene_score=0.441\n"
+               "frame:1    pts:30208   pts_time:19.6667\n"
+               "lavfi.scene_score=0.513\n")
+        self.assertEqual(_parse_scene_metadata(txt), [8.0, 19.6667])
+
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SplitPointIndex(keyframes=[0, 2, 4, 6, 8, 10],
+                                     scene_changes=[3.5, 6.0, 9.2])
+
+    def test_keyframe_near(self):
+        self.assertEqual(self.index.keyframe_near(5.9, 0.2), 6)
+        self.assertIsNone(self.index.keyframe_near(5, 0.5))
+
+    def test_keyframe_at_or_before(self):
+        self.assertEqual(self.index.keyframe_at_or_before(5.9), 4)
+        self.assertEqual(self.index.keyframe_at_or_before(6), 6)
+        self.assertIsNone(SplitPointIndex([1]).keyframe_at_or_before(0.5))
+
+    def test_scene_on_keyframe_preferred(self):
+        self.assertEqual(self.index.split_point_near(5, tolerance=1.5), 6.0)
+
+    def test_keyframe_preferred_to_scene(self):
+        self.assertEqual(self.index.split_point_near(3.4, tolerance=1), 4)
+
+    def test_scene_without_keyframes(self):
+        index = SplitPointIndex(keyframes=[0], scene_changes=[3.5])
+        self.assertEqual(index.split_point_near(3, tolerance=1), 3.5)
+
+    def test_nothing_near(self):
+        index = SplitPointIndex(keyframes=[0, 100])
+        self.assertEqual(index.split_point_near(50, tolerance=5), 50)
+
+    def test_snap_ranges(self):
+        self.assertEqual(
+            self.index.snap_ranges([(0, 5), (5, 5)], tolerance=1.5),
+            [(0, 6.0), (6.0, 4.0)])
+
+    def test_snap_merges_duplicates(self):
+        index = SplitPointIndex(keyframes=[0, 5])
+        self.assertEqual(
+            index.snap_ranges([(0, 4), (4, 2), (6, 4)], tolerance=1.5),
+            [(0, 5), (5, 5)])
+
+    def test_plan_segments(self):
+        cmd = create_test_cmd()
+        cmd.dst_codec_video = Hevc(mbps=10)
+        plan = plan_segments(cmd, 2, "/tmp/work", src_duration=10,
+                             split_points=self.index, src_fps=25)
+        self.assertEqual([s.dst_time_range.begin for s in plan.segments],
+                         [0, 6.0])
+        # the second segment is on a keyframe: -ss before -i only
+        self.assertEqual(plan.segments[1].dst_time_range.seek, Seek.KEYFRAME)
+        args = list(plan.segments[1])
+        self.assertEqual(args.count('-ss'), 1)
+        self.assertLess(args.index('-ss'), args.index('-i'))
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_roundtrip(self):
+        with TemporaryDirectory() as td, \
+                mock.patch.dict(os.environ, {'VTCFF_CACHE_DIR': td}):
+            self.assertIsNone(read_cached('section', 'key'))
+            write_cached('section', 'key', {'a': [1, 2]})
+            self.assertEqual(read_cached('section', 'key'), {'a': [1, 2]})
+
+    def test_file_key_changes(self):
+        with TemporaryDirectory() as td:
+            f = Path(td) / "file.mov"
+            f.write_bytes(b'123')
+            key = file_key(f)
+            self.assertEqual(key, file_key(f))
+            self.assertNotEqual(key, file_key(f, 'extra'))
+            f.write_bytes(b'12345')
+            self.assertNotEqual(key, file_key(f))
+
+    def test_probe_uses_cache(self):
+        with TemporaryDirectory() as td, \
+                mock.patch.dict(os.environ, {'VTCFF_CACHE_DIR': td}):
+            src = Path(td) / "src.mov"
+            src.write_bytes(b'data')
+            write_cached('split_points',
+                         file_key(str(src), _CACHE_VERSION, True, 0.3),
+                         {'keyframes': [0, 1], 'scene_changes': [0.5]})
+            # no ffprobe is run: the executable does not exist
+            index = SplitPointIndex.probe(src, ffprobe_exe='/nonexistent')
+            self.assertEqual(index.keyframes, [0, 1])
+            self.assertEqual(index.scene_changes, [0.5])
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from tests.common import create_test_cmd, unique_item_after, find_item_after
+from vtcff import Tier, Scale, Hevc, Avc, Prores, VcPreset, Dither, \
+    FfmpegCommand, Rendition
+
+
+def create_cmd(tier: Tier = Tier.MASTER, zscale: bool = True):
+    cmd = create_test_cmd(zscale=zscale)
+    cmd.scale = Scale(1280, 720)
+    cmd.src_pixfmt = 'yuv422p10le'
+    cmd.dst_pixfmt = 'yuv420p'
+    cmd.dst_codec_video = Hevc(mbps=5)
+    cmd.tier = tier
+    return cmd
+
+
+class TestTier(unittest.TestCase):
+    def test_master_is_default(self):
+        cmd = create_cmd()
+        self.assertEqual(FfmpegCommand().tier, Tier.MASTER)
+        self.assertEqual(
+            unique_item_after(cmd, '-vf'),
+            'zscale=filter=spline36:w=1280:h=720:dither=error_diffusion,'
+            'format=yuv420p')
+        self.assertEqual(unique_item_after(cmd, '-sws_flags'),
+                         'spline+accurate_rnd+full_chroma_int+full_chroma_inp')
+        self.assertNotIn('-preset', list(cmd))
+
+    def test_review(self):
+        cmd = create_cmd(Tier.REVIEW)
+        self.assertEqual(
+            unique_item_after(cmd, '-vf'),
+            'zscale=filter=bicubic:w=1280:h=720:dither=ordered,'
+            'format=yuv420p')
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'fast')
+
+    def test_proxy(self):
+        cmd = create_cmd(Tier.PROXY)
+        self.assertEqual(
+            unique_item_after(cmd, '-vf'),
+            'zscale=filter=bilinear:w=1280:h=720:dither=none,'
+            'format=yuv420p')
+        self.assertEqual(unique_item_after(cmd, '-sws_flags'),
+                         'fast_bilinear')
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'ultrafast')
+
+    def test_swscale(self):
+        cmd = create_cmd(Tier.PROXY, zscale=False)
+        self.assertTrue(unique_item_after(cmd, '-vf').startswith(
+            'scale=width=1280:height=720'))
+        self.assertEqual(unique_item_after(cmd, '-sws_flags'),
+                         'fast_bilinear')
+
+    def test_explicit_settings_kept(self):
+        cmd = create_cmd(Tier.PROXY)
+        cmd.dither = Dither.ERROR_DIFFUSION
+        cmd.dst_codec_video = Hevc(mbps=5, preset=VcPreset.N7_SLOW)
+        self.assertIn('dither=error_diffusion', unique_item_after(cmd, '-vf'))
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'slow')
+
+    def test_filter_settings_kept(self):
+        cmd = create_cmd(Tier.PROXY)
+        cmd._zscale().kernel = 'lanczos'
+        cmd._zscale().dither = Dither.RANDOM
+        vf = unique_item_after(cmd, '-vf')
+        self.assertIn('filter=lanczos', vf)
+        self.assertIn('dither=random', vf)
+
+    def test_preset_not_slowed_down(self):
+        cmd = create_cmd(Tier.REVIEW)
+        # lossless x265 is already encoded with 'ultrafast'
+        cmd.dst_codec_video = Hevc(lossless=True)
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'ultrafast')
+        cmd.dst_codec_video = Hevc(mbps=5, near_lossless=True)
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'fast')
+
+    def test_default_preset(self):
+        self.assertEqual(Hevc(lossless=True).default_preset(),
+                         VcPreset.N1_ULTRAFAST)
+        self.assertIsNone(Hevc(mbps=5).default_preset())
+        self.assertIsNone(Avc().default_preset())
+
+    def test_avc_and_prores(self):
+        cmd = create_cmd(Tier.PROXY)
+        cmd.dst_codec_video = Avc()
+        self.assertEqual(unique_item_after(cmd, '-preset'), 'ultrafast')
+        cmd.dst_codec_video = Prores()
+        self.assertNotIn('-preset', list(cmd))
+
+    def test_codec_not_modified(self):
+        cmd = create_cmd(Tier.PROXY)
+        list(cmd)
+        self.assertIsNone(cmd.dst_codec_video.preset)
+        self.assertIsNone(cmd._zscale().kernel)
+
+    def test_renditions(self):
+        cmd = FfmpegCommand()
+        cmd.src_file = '/tmp/src.mov'
+        cmd.tier = Tier.PROXY
+        cmd.add_rendition(Rendition('/tmp/a.mp4', Avc(),
+                                    scale=Scale(-2, 360)))
+        args = list(cmd)
+        self.assertIn('filter=bilinear',
+                      find_item_after(args, '-filter_complex'))
+        self.assertEqual(find_item_after(args, '-preset'), 'ultrafast')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 # SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 
+from ._batch import run_batch, run_batch_async, plan_batch, BatchReport, \
+    JobReport, BatchPlan
 from ._codec_audio_copy import AudioCopy
 from ._codec_audio_none import NoAudio
 from ._codec_avc import Avc
@@ -9,15 +11,35 @@ from ._codec_hevc import Hevc, VcPreset, HevcBitrateSpecifiedForLosslessError, \
     HevcBitrateNotSpecifiedError, HevcLosslessAndNearLosslessError
 from ._codec_prores_ks import Prores, ProresProfile
 from ._codec_video_copy import VideoCopy
+from ._compiled_command import CompiledCommand
 from ._command import FfmpegCommand, VideoCodecNotSpecifiedError, \
-    AudioCodecNotSpecifiedError
+    AudioCodecNotSpecifiedError, EncoderNotAvailableError, \
+    PixfmtNotSupportedError
 from ._common import Scale
 from ._filter_crop import Crop
+from ._filter_graph import FilterGraph, GraphChain
 from ._filter_pad import Pad
 from ._filter_transpose import Transpose
-from ._math_cropping import crop_and_scale
+from ._filter_zscale import Dither
+from ._frame_sequence import FrameSequence, frame_sequence
+from ._frames_reader import iter_frames
+from ._frames_ring import FrameRing, decode_to_ring
+from ._frames_writer import FramesWriter
+from ._geometry_plan import GeometryPlan, plan_geometry, pixels_per_frame
+from ._ladder import add_ladder
+from ._math_cropping import crop_and_scale, crop_and_scale_many
 from ._math_padding import _letterbox
+from ._pf_00_pixfmt_table import find_pixfmts, pixfmt_info, PixfmtInfo, \
+    PIXFMT_TABLE_VERSION
 from ._pf_10_pixfmts_stdout_parser import pixfmt_alpha
 from ._pf_15_pixfmt_subsampling import pixfmt_subsampling
 from ._pf_20_pixfmt_bpc import pixfmt_bpc
+from ._pf_30_array_pixfmt import array_pixfmt
+from ._progress import FfmpegProgress
+from ._rendition import Rendition
+from ._segments import encode_segmented, encode_segmented_async, \
+    plan_segments, split_time_range
+from ._split_points import SplitPointIndex
+from ._tier import Tier
+from ._time_span import Seek
 
@@ -4,10 +4,14 @@
 import shlex
 from typing import List, Iterable, Tuple, Optional
 
+from ._compiled_command import Tracked
 
-class ArgsSubset:
+
+class ArgsSubset(Tracked):
     # хранит аргументы в виде List[str].
-    # Позволяет задавать/читать их и иначе: в виде строки, в виде списка пар
+    # Позволяет задавать/читать их и иначе: в виде строки, в виде списка пар.
+    # Список можно менять и на месте (.list.extend), поэтому при компиляции
+    # команды он сравнивается целиком
     def __init__(self):
         self.list: List[str] = list()
 
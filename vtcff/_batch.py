@@ -0,0 +1,196 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import copy
+import os
+import time
+from typing import List, Optional, NamedTuple, Callable, Sequence
+
+from ._codec import Codec
+from ._codec_avc import Avc
+from ._codec_avc_preset import VcPreset
+from ._codec_hevc import Hevc
+from ._codec_prores_ks import Prores
+from ._command import FfmpegCommand
+
+# x264/x265 stop scaling well somewhere around this number of threads
+# (at least for HD sources). When the queue is long, it is more efficient
+# to run more encodes with fewer threads each
+_PREFERRED_THREADS_PER_JOB = 4
+
+
+def _video_codecs(cmd: FfmpegCommand) -> List[Optional[Codec]]:
+    """The video codecs of the output files."""
+    return [r.dst_codec_video for r in cmd.renditions] \
+        or [cmd.dst_codec_video]
+
+
+def _codec_cost_factor(codec: Optional[Codec]) -> float:
+    if isinstance(codec, (Hevc, Avc)):
+        preset = codec.preset or codec.default_preset() \
+            or VcPreset.N6_MEDIUM
+        factor = float(list(VcPreset).index(preset) + 1)
+        return factor * 2 if isinstance(codec, Hevc) else factor
+    if isinstance(codec, Prores):
+        return 1.0
+    # stream copy or something we know nothing about
+    return 0.1
+
+
+def estimated_cost(cmd: FfmpegCommand) -> float:
+    """Returns a rough relative cost of the encode, including all the
+    renditions. It only makes sense to compare costs of different commands
+    with each other."""
+    src_size = 0
+    if cmd.src_file is not None and os.path.isfile(cmd.src_file):
+        src_size = os.path.getsize(cmd.src_file)
+    amount = float(src_size or 1)
+    if cmd.dst_time_range.duration is not None:
+        # we don't know the duration of the source, so we cannot compute
+        # the fraction. But shorter excerpts are usually cheaper
+        amount = min(amount, cmd.dst_time_range.duration * 1e6)
+    return amount * sum(_codec_cost_factor(c) for c in _video_codecs(cmd))
+
+
+def _threads_unset(codec: Optional[Codec]) -> bool:
+    return isinstance(codec, (Hevc, Avc, Prores)) and codec.threads is None
+
+
+def _with_threads(cmd: FfmpegCommand, threads: int) -> FfmpegCommand:
+    """A copy of the command with the threads of its encoders limited.
+    The encoders of the renditions run at once, so they share the threads
+    of the job."""
+    if not any(_threads_unset(c) for c in _video_codecs(cmd)):
+        return cmd
+    result = copy.deepcopy(cmd)
+    codecs = _video_codecs(result)
+    for codec in codecs:
+        if _threads_unset(codec):
+            assert isinstance(codec, (Hevc, Avc, Prores))
+            codec.threads = max(1, threads // len(codecs))
+    return result
+
+
+class BatchPlan(NamedTuple):
+    commands: List[FfmpegCommand]
+    """Commands in the order they will be started, longest first.
+    These are copies of the original commands if thread limits were
+    injected."""
+    concurrency: int
+    """Number of encodes running simultaneously."""
+    threads_per_job: int
+
+
+def plan_batch(commands: Sequence[FfmpegCommand],
+               cores: Optional[int] = None,
+               threads_per_job: Optional[int] = None,
+               cost: Callable[[FfmpegCommand], float] = estimated_cost) \
+        -> BatchPlan:
+    """Decides how many encodes to run at once within the budget of `cores`
+    and limits the threads of each encoder accordingly.
+
+    Commands are ordered by decreasing `cost`: starting long jobs first
+    keeps the total time close to the minimum (LPT scheduling)."""
+    if cores is None:
+        cores = os.cpu_count() or 1
+    if cores < 1:
+        raise ValueError(cores)
+    if threads_per_job is not None and threads_per_job < 1:
+        raise ValueError(threads_per_job)
+
+    if threads_per_job is None:
+        concurrency = max(1, min(len(commands),
+                                 cores // _PREFERRED_THREADS_PER_JOB))
+        threads_per_job = max(1, cores // concurrency)
+    else:
+        concurrency = max(1, min(len(commands), cores // threads_per_job))
+
+    ordered = sorted(commands, key=cost, reverse=True)
+    return BatchPlan(
+        commands=[_with_threads(c, threads_per_job) for c in ordered],
+        concurrency=concurrency,
+        threads_per_job=threads_per_job)
+
+
+class JobReport(NamedTuple):
+    command: FfmpegCommand
+    wall_time: float
+    """Seconds from the start of the process to its end."""
+    frames: Optional[int]
+    """Frames encoded, as reported by ffmpeg."""
+    error: Optional[BaseException] = None
+
+
+class BatchReport(NamedTuple):
+    jobs: List[JobReport]
+    wall_time: float
+    """Seconds from the start of the first job to the end of the last."""
+
+    @property
+    def frames(self) -> int:
+        return sum(j.frames or 0 for j in self.jobs)
+
+    @property
+    def frames_per_second(self) -> float:
+        if self.wall_time <= 0:
+            return 0.0
+        return self.frames / self.wall_time
+
+    @property
+    def failed(self) -> List[JobReport]:
+        return [j for j in self.jobs if j.error is not None]
+
+
+async def _run_job(cmd: FfmpegCommand,
+                   semaphore: asyncio.Semaphore) -> JobReport:
+    try:
+        # rejecting the commands that cannot run before they take a slot
+        cmd = copy.deepcopy(cmd)
+        cmd.adapt_to_ffmpeg()
+    except Exception as e:  # pylint: disable=broad-except
+        return JobReport(cmd, 0.0, None, e)
+
+    async with semaphore:
+        started = time.monotonic()
+        frames: Optional[int] = None
+        try:
+            async for progress in cmd.run_async():
+                if progress.frame is not None:
+                    frames = progress.frame
+        except Exception as e:  # pylint: disable=broad-except
+            # one failed job should not stop the whole night
+            return JobReport(cmd, time.monotonic() - started, frames, e)
+        return JobReport(cmd, time.monotonic() - started, frames)
+
+
+async def run_batch_async(commands: Sequence[FfmpegCommand],
+                          cores: Optional[int] = None,
+                          threads_per_job: Optional[int] = None,
+                          cost: Callable[[FfmpegCommand], float]
+                          = estimated_cost) -> BatchReport:
+    """Runs the commands as planned by `plan_batch`. Failed jobs do not
+    interrupt the others: their errors are stored in the report.
+
+    Before running, each command is checked with
+    `FfmpegCommand.adapt_to_ffmpeg`."""
+    plan = plan_batch(commands, cores=cores, threads_per_job=threads_per_job,
+                      cost=cost)
+    semaphore = asyncio.Semaphore(plan.concurrency)
+    started = time.monotonic()
+    # tasks are created in the planned order, and the semaphore wakes
+    # the waiters in FIFO order, so the longest jobs start first
+    jobs = await asyncio.gather(
+        *(_run_job(c, semaphore) for c in plan.commands))
+    return BatchReport(jobs=list(jobs), wall_time=time.monotonic() - started)
+
+
+def run_batch(commands: Sequence[FfmpegCommand],
+              cores: Optional[int] = None,
+              threads_per_job: Optional[int] = None,
+              cost: Callable[[FfmpegCommand], float] = estimated_cost) \
+        -> BatchReport:
+    """Blocking version of `run_batch_async`."""
+    return asyncio.run(run_batch_async(commands, cores=cores,
+                                       threads_per_job=threads_per_job,
+                                       cost=cost))
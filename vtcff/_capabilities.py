@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import shutil
+import subprocess
+import sys
+import threading
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Tuple, Set, List, Union, Optional
+
+from ._disk_cache import read_cached, write_cached
+
+
+def _exe_key(ffmpeg_exe: Union[str, Path]) -> Tuple[str, int, int]:
+    found = shutil.which(str(ffmpeg_exe))
+    if found is None:
+        raise FileNotFoundError(ffmpeg_exe)
+    exe = Path(found).resolve()
+    st = exe.stat()
+    return str(exe), st.st_size, st.st_mtime_ns
+
+
+def _parse_encoders(txt: str) -> Set[str]:
+    # Encoders:
+    #  V..... = Video
+    #  ...
+    #  ------
+    #  V....D a64multi             Multicolor charset for Commodore 64
+    result = set()
+    started = False
+    for line in txt.splitlines():
+        if started:
+            words = line.split()
+            if len(words) >= 2:
+                result.add(words[1])
+        elif line.strip().startswith('---'):
+            started = True
+    return result
+
+
+def _parse_filters(txt: str) -> Set[str]:
+    # Filters:
+    #   T.. = Timeline support
+    #   ...
+    #  ... abench            A->A       Benchmark part of a filtergraph.
+    #  TSC zscale            V->V       Apply resizing, colorspace and ...
+    result = set()
+    for line in txt.splitlines():
+        words = line.split()
+        if len(words) >= 3 and '->' in words[2]:
+            result.add(words[1])
+    return result
+
+
+def _parse_encoder_pixfmts(txt: str) -> Optional[Tuple[str, ...]]:
+    # Encoder prores_ks [Apple ProRes (iCodec Pro)]:
+    #     General capabilities: threads
+    #     Supported pixel formats: yuv422p10le yuv444p10le yuva444p10le
+    #
+    # The line is missing for unknown encoders and for the encoders
+    # that do not declare the formats
+    prefix = 'Supported pixel formats:'
+    for line in txt.splitlines():
+        line = line.strip()
+        if line.startswith(prefix):
+            return tuple(line[len(prefix):].split())
+    return None
+
+
+class FfmpegCapabilities:
+    """Results of the queries to a particular ffmpeg executable.
+
+    Each query runs ffmpeg at most once per executable. The results are
+    kept in memory and persisted to the cache directory, so other processes
+    on the same host do not run ffmpeg at all.
+
+    The executable is identified by its resolved path, size and modification
+    time: this does not require running it. The version string is stored
+    along with the results."""
+
+    def __init__(self, key: Tuple[str, int, int]):
+        self.key = key
+        self.exe = Path(key[0])
+        self._disk_key = hashlib.sha1(repr(self.key).encode('utf-8')) \
+            .hexdigest()
+        self._lock = threading.Lock()
+        self._outputs: Dict[str, str] = dict()
+        cached = read_cached('capabilities', self._disk_key)
+        if isinstance(cached, dict):
+            self._outputs.update(cached)
+
+    def _output(self, *args: str) -> str:
+        query = ' '.join(args)
+        with self._lock:
+            # the version is always stored, so each cached record tells
+            # which build it describes
+            missing = [q for q in ('-version', query)
+                       if q not in self._outputs]
+            for q in missing:
+                self._outputs[q] = subprocess.run(
+                    [str(self.exe), '-hide_banner', *q.split(' ')],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    encoding=sys.stdout.encoding or "utf-8",
+                    check=True).stdout
+            if missing:
+                write_cached('capabilities', self._disk_key, self._outputs)
+            return self._outputs[query]
+
+    @property
+    def version(self) -> str:
+        """The first line of `ffmpeg -version`."""
+        lines = self._output('-version').splitlines()
+        return lines[0] if lines else ''
+
+    @property
+    def pix_fmts_stdout(self) -> str:
+        return self._output('-pix_fmts')
+
+    @cached_property
+    def encoders(self) -> Set[str]:
+        return _parse_encoders(self._output('-encoders'))
+
+    @cached_property
+    def filters(self) -> Set[str]:
+        return _parse_filters(self._output('-filters'))
+
+    def encoder_pixfmts(self, encoder: str) -> Optional[Tuple[str, ...]]:
+        """The pixel formats the encoder accepts, from
+        `ffmpeg -h encoder=...`. None if the encoder does not list them."""
+        return _parse_encoder_pixfmts(self._output('-h', f'encoder={encoder}'))
+
+    @cached_property
+    def buildconf(self) -> List[str]:
+        """The options ffmpeg was configured with, like
+        '--enable-libzimg'."""
+        return [line.strip() for line in
+                self._output('-buildconf').splitlines()
+                if line.strip().startswith('--')]
+
+
+_instances: Dict[Tuple[str, int, int], FfmpegCapabilities] = dict()
+_instances_lock = threading.Lock()
+
+
+def capabilities(ffmpeg_exe: Union[str, Path] = "ffmpeg") \
+        -> FfmpegCapabilities:
+    """Returns the (cached) capabilities of the executable."""
+    key = _exe_key(ffmpeg_exe)
+    with _instances_lock:
+        result = _instances.get(key)
+        if result is None:
+            result = FfmpegCapabilities(key)
+            _instances[key] = result
+        return result
+
+
+def _forget_all() -> None:
+    """Clears the in-memory cache (for tests)."""
+    with _instances_lock:
+        _instances.clear()
+
@@ -3,8 +3,10 @@
 
 from typing import Iterable, Tuple, Optional
 
+from ._compiled_command import Tracked
 
-class Codec:
+
+class Codec(Tracked):
     def args(self) -> Iterable[Tuple[str, Optional[str]]]:
         raise NotImplementedError
 
@@ -8,11 +8,28 @@ from ._codec_avc_preset import VcPreset
 
 
 class Avc(VideoCodec):
-    def __init__(self, preset: VcPreset = None):
+    def __init__(self, preset: Optional[VcPreset] = None,
+                 threads: Optional[int] = None,
+                 mbps: Optional[float] = None):
         self.preset: Optional[VcPreset] = preset
+        self.threads: Optional[int] = threads
+        self.mbps: Optional[float] = mbps
+        """Average bitrate. None means the default constant quality
+        of x264."""
+
+    def default_preset(self) -> Optional[VcPreset]:
+        """The preset used when `preset` is None. None means the default
+        of x264 (medium)."""
+        return None
 
     def args(self) -> Iterable[Tuple[str, str]]:
         yield "-codec:v", "libx264"
 
         if self.preset is not None:
             yield "-preset", str(self.preset.value)
+
+        if self.mbps is not None:
+            yield "-b:v", f"{round(self.mbps * 1000)}k"
+
+        if self.threads is not None:
+            yield "-threads:v", str(self.threads)
@@ -22,15 +22,31 @@ class HevcLosslessAndNearLosslessError(Exception):
 
 class Hevc(VideoCodec):
     def __init__(self,
-                 preset: VcPreset = None,
+                 preset: Optional[VcPreset] = None,
                  lossless: bool = False,
                  near_lossless: bool = False,
-                 mbps: float = None):
+                 mbps: Optional[float] = None,
+                 threads: Optional[int] = None):
 
         self.preset: Optional[VcPreset] = preset
         self.lossless = lossless
         self.near_lossless = near_lossless
         self.mbps = mbps
+        self.threads: Optional[int] = threads
+        """Size of the x265 thread pool. None means x265 will create
+        a thread per CPU core."""
+
+    def default_preset(self) -> Optional[VcPreset]:
+        """The preset used when `preset` is None. None means the default
+        of x265 (medium)."""
+        if self.lossless:
+            # we are not losing any quality here,
+            # we want better-than-prores result fast
+            return VcPreset.N1_ULTRAFAST
+        if self.near_lossless:
+            # safest bet is highest quality
+            return VcPreset.N10_PLACEBO
+        return None
 
     def args(self) -> Iterable[Tuple[str, str]]:
 
@@ -63,16 +79,11 @@ class Hevc(VideoCodec):
                 raise HevcBitrateNotSpecifiedError
             params["bitrate"] = str(round(self.mbps * 1000))
 
-        p = self.preset
-        if p is None:
-            if self.lossless:
-                # we are not losing any quality here,
-                # we want better-than-prores result fast
-                p = VcPreset.N1_ULTRAFAST
-            elif self.near_lossless:
-                # safest bet is highest quality
-                p = VcPreset.N10_PLACEBO
+        if self.threads is not None:
+            params["pools"] = str(self.threads)
 
+        p = self.preset if self.preset is not None \
+            else self.default_preset()
         if p is not None:
             yield "-preset", str(p.value)
 
@@ -32,10 +32,12 @@ class Prores(VideoCodec):
     def __init__(self,
                  profile: ProresProfile = ProresProfile.NORMAL,
                  qscale: Optional[int] = None,
-                 spoof_vendor: bool = False):
+                 spoof_vendor: bool = False,
+                 threads: Optional[int] = None):
         self.profile: ProresProfile = profile
         self.qscale: Optional[int] = qscale
         self.spoof_vendor: bool = spoof_vendor
+        self.threads: Optional[int] = threads
 
     def args(self) -> Iterable[Tuple[str, str]]:
         yield '-codec:v', 'prores_ks'
@@ -47,3 +49,5 @@ class Prores(VideoCodec):
             yield '-q:v', str(self.qscale)
         if self.profile is not None:
             yield '-profile:v', str(self.profile.value)
+        if self.threads is not None:
+            yield '-threads:v', str(self.threads)
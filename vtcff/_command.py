@@ -4,20 +4,38 @@
 import os.path
 import warnings
 from pathlib import Path
-from typing import Optional, List, Iterable, Dict, Union, Tuple, Type
+from typing import Optional, List, Iterable, Dict, Union, Tuple, Type, \
+    AsyncIterator, Hashable, Iterator, NamedTuple
 
 import framefile
 
 from vtcff._args_subset import ArgsSubset
+from vtcff._capabilities import capabilities
 from vtcff._codec import Codec
 from vtcff._codec_audio_copy import AudioCopy
+from vtcff._codec_avc import Avc
+from vtcff._codec_avc_preset import VcPreset
+from vtcff._codec_hevc import Hevc
 from vtcff._codec_video_copy import VideoCopy
+from vtcff._compiled_command import CompiledCommand, Tracked, \
+    untracked_copy, untracked_instance
 from vtcff._common import Scale
+from vtcff._dither import auto_dither
 from vtcff._filter_crop import Crop
+from vtcff._filter_format import FormatFilter
+from vtcff._filter_graph import FilterGraph, GraphChain
+from vtcff._filter_normalize import normalized_filters
+from vtcff._geometry_plan import GeometryPlan, plan_geometry, \
+    pixels_per_frame
 from vtcff._filter_pad import Pad
 from vtcff._filter_swscale import SwscaleFilter
 from vtcff._filter_transpose import Transpose, TransposeFilter
-from vtcff._filter_zscale import ZscaleFilter, ColorSpaceConvertor
+from vtcff._filter_zscale import ZscaleFilter, ColorSpaceConvertor, Dither
+from vtcff._frame_sequence import FrameSequence, frame_sequence
+from vtcff._pf_00_pixfmt_table import pixfmt_rgb
+from vtcff._progress import FfmpegProgress, iter_progress, with_progress_args
+from vtcff._rendition import Rendition
+from vtcff._tier import Tier, TIER_SETTINGS
 from vtcff._time_span import BeginEndDuration
 
 
@@ -29,21 +47,47 @@ class AudioCodecNotSpecifiedError(Exception):
     pass
 
 
-def arg_i(path_or_pattern: Union[str, Path]) -> List[str]:
-    path_or_pattern = str(path_or_pattern)
+class EncoderNotAvailableError(Exception):
+    pass
+
+
+class PixfmtNotSupportedError(Exception):
+    pass
+
+
+def _input_args(path_or_pattern: str,
+                sequence: Optional[FrameSequence],
+                start_number: Optional[int] = None) -> List[str]:
+    if sequence is not None:
+        # without -start_number ffmpeg only finds sequences starting
+        # from 0..4
+        if start_number is None:
+            start_number = sequence.first
+        return ["-start_number", str(start_number),
+                "-i", sequence.pattern]
     if '*' in path_or_pattern:
         # http://ffmpeg.org/ffmpeg.html#Video-and-Audio-file-format-conversion
         return ["-f",
                 "image2",
                 "-pattern_type", "glob",
                 "-i", path_or_pattern]
-    else:
-        if os.path.isdir(path_or_pattern):
-            path_or_pattern = framefile.directory_to_pattern(
-                framefile.Format.percent,
-                Path(path_or_pattern))
-        assert isinstance(path_or_pattern, str)
-        return ["-i", path_or_pattern]
+    if os.path.isdir(path_or_pattern):
+        raise framefile.PatternNotFoundError(path_or_pattern)
+    return ["-i", path_or_pattern]
+
+
+def arg_i(path_or_pattern: Union[str, Path]) -> List[str]:
+    path_or_pattern = str(path_or_pattern)
+    return _input_args(path_or_pattern, frame_sequence(path_or_pattern))
+
+
+def _video_encoder(codec: Optional[Codec]) -> Optional[str]:
+    if codec is None:
+        return None
+    for key, value in codec.args():
+        if desynonimize(key) == '-codec:v':
+            return value
+    return None
 
 
 def desynonimize(arg: str) -> str:
@@ -55,7 +99,19 @@ def desynonimize(arg: str) -> str:
     return arg
 
 
-class CustomArgs:
+class _Compiled(NamedTuple):
+    """The result of `FfmpegCommand.compile` along with the state it was
+    computed for."""
+    version: int
+    custom: Hashable
+    src_sequence: Optional[FrameSequence]
+    check_src: bool
+    """The source is a frame sequence or a glob pattern, so the arguments
+    may change without changing the command."""
+    args: CompiledCommand
+
+
+class CustomArgs(Tracked):
     def __init__(self):
         self._before_i: ArgsSubset = ArgsSubset()
         self._after_i: ArgsSubset = ArgsSubset()
@@ -79,7 +135,7 @@ class CustomArgs:
         return self._audio
 
 
-class FfmpegCommand:
+class FfmpegCommand(Tracked):
 
     def __init__(self, use_zscale: bool = True):
 
@@ -93,6 +149,20 @@ class FfmpegCommand:
         self.src_gamma: Optional[float] = None
         self.src_fps: Optional[float] = None
 
+        # the size of the source frames is optional. When it is known,
+        # the filters that would not change the frames are not run
+        self.src_width: Optional[int] = None
+        self.src_height: Optional[int] = None
+
+        # the pixel format of the decoded source frames. When it is known,
+        # zscale dithers only the frames that lose bits per channel
+        self.src_pixfmt: Optional[str] = None
+
+        self.reorder_filters = True
+        """When the source size is known, run the crop, scale, transpose
+        and pad filters in the order that processes the fewest pixels,
+        rather than in the order they were set."""
+
         self.dst_file: Optional[Union[Path, str]] = None
 
         # the following fields will affect the parameters that have quite
@@ -120,12 +190,30 @@ class FfmpegCommand:
 
         self.dst_pixfmt: Optional[str] = None
 
+        self.tier = Tier.MASTER
+        """The speed of the scalers, dithering and x264/x265 presets.
+        The explicitly set `dither` and codec presets are kept."""
+
+        self.dither: Optional[Dither] = None
+        """The dithering of zscale. None means the dithering of the `tier`
+        if the bits per channel are reduced from `src_pixfmt` to `dst_pixfmt`
+        (or when either is unknown), and no dithering otherwise."""
+
+        # the pixel formats accepted by the encoders, as found
+        # by adapt_to_ffmpeg()
+        self._encoder_pixfmts: Dict[str, Tuple[str, ...]] = dict()
+
         # про -color_range
         # https://trac.ffmpeg.org/ticket/443
         self._dst_color_range_meta: Optional[bool] = None
 
         self._filter_chain: List = list()
 
+        self.filter_graph: Optional[FilterGraph] = None
+        """A graph to use instead of the filters of the command (crop,
+        scale, color conversion...). Its unconnected output pads are mapped
+        to the output file."""
+
         self.dst_time_range = BeginEndDuration()
 
         # the FfmpegCommand object can generate parameters it understands.
@@ -133,8 +221,15 @@ class FfmpegCommand:
         # then in fields of the following object
         self.custom = CustomArgs()
 
+        # when not empty, the command writes these outputs instead of
+        # dst_file
+        self._renditions: List[Rendition] = list()
+
         self.debug = False
 
+        # the last result of compile()
+        self._compiled: Optional[_Compiled] = None
+
     @property
     def override_general(self) -> ArgsSubset:
         warnings.warn("Use .custom.after_i", DeprecationWarning)  # 2021-10
@@ -156,6 +251,8 @@ class FfmpegCommand:
             return vf
         result = obj_type()
         self._filter_chain.append(result)
+        self._own(result)
+        self._touch()
         return result
 
     def _find_filter(self, obj_type):
@@ -174,8 +271,12 @@ class FfmpegCommand:
         for idx, item in enumerate(self._filter_chain):
             if isinstance(item, obj_type):
                 self._filter_chain[idx] = new_instance
+                self._own(new_instance)
+                self._touch()
                 return
         self._filter_chain.append(new_instance)
+        self._own(new_instance)
+        self._touch()
 
     def _remove_filter(self, obj_type):
         items_removed = 0
@@ -183,6 +284,7 @@ class FfmpegCommand:
             if isinstance(item, obj_type):
                 del self._filter_chain[idx]
                 items_removed += 1
+        self._touch()
 
         assert 0 <= items_removed <= 1
 
@@ -221,10 +323,10 @@ class FfmpegCommand:
         old_src_color_space = self.src_color_space
         old_dst_color_space = self.dst_color_space
 
-        if self._use_zscale:
-            self._remove_filter(ZscaleFilter)
-        else:
-            self._remove_filter(SwscaleFilter)
+        old_type, new_type = (ZscaleFilter, SwscaleFilter) \
+            if self._use_zscale else (SwscaleFilter, ZscaleFilter)
+        old_idx = self._find_filter_index(old_type)
+        self._remove_filter(old_type)
 
         self._use_zscale = x
         self.scale = old_scale
@@ -233,6 +335,15 @@ class FfmpegCommand:
         self.src_color_space = old_src_color_space
         self.dst_color_space = old_dst_color_space
 
+        # the new scaler was appended to the chain. Putting it where the
+        # old one was keeps the crops, transposes and pads around it
+        # in their places
+        new_idx = self._find_filter_index(new_type)
+        if 0 <= old_idx < new_idx:
+            self._filter_chain.insert(old_idx,
+                                      self._filter_chain.pop(new_idx))
+            self._touch()
+
     @property
     def scale(self) -> Optional[Scale]:
         if self._use_zscale:
@@ -277,6 +388,7 @@ class FfmpegCommand:
 
         if idx_a > idx_b:
             self._filter_chain.insert(idx_b, self._filter_chain.pop(idx_a))
+            self._touch()
 
         assert (self._find_filter_index(type_a)
                 < self._find_filter_index(type_b))
@@ -379,7 +491,24 @@ class FfmpegCommand:
     def src_range_full(self, x: Optional[bool]):
         self._curr_scale_filter().src_range_full = x
 
-    def _iter_known_before_i(self) -> Iterable[Union[str, Tuple[str, str]]]:
+    @property
+    def renditions(self) -> Tuple[Rendition, ...]:
+        return tuple(self._renditions)
+
+    def add_rendition(self, rendition: Rendition) -> Rendition:
+        """Adds an output to the command. A command with renditions decodes
+        the source once, applies its filters once, and then splits the
+        frames between the renditions, each with its own scale, pixel format,
+        codecs and file. The `dst_file`, `dst_codec_video`, `dst_pixfmt` and
+        `dst_codec_audio` of the command itself are not used."""
+        self._renditions.append(rendition)
+        self._own(rendition)
+        self._touch()
+        return rendition
+
+    def _iter_known_before_i(
+            self, src_sequence: Optional[FrameSequence] = None) \
+            -> Iterable[Union[str, Tuple[str, str]]]:
         yield str(self.ffmpeg_exe)
 
         # для файлов EXR стоит указывать что-то вроде '-gamma 2.2', причем
@@ -420,23 +549,59 @@ class FfmpegCommand:
             # (https://stackoverflow.com/a/51224132)
             yield '-r', str(self.src_fps)
 
-    def _iter_known_all_after_i(self) -> Iterable[
-        Union[str, Tuple[str, Optional[str]]]]:
-        if self.dst_time_range.begin:
-            yield "-ss", str(self.dst_time_range.begin)
-        if self.dst_time_range.duration is not None:
-            yield "-t", str(self.dst_time_range.duration)
-        if self._filter_chain:
-            vf_str = ','.join(str(f) for f in self._filter_chain)
+        if self._sequence_trim(src_sequence) is None:
+            coarse_seek, _ = self.dst_time_range.split_begin()
+            if coarse_seek:
+                yield '-ss', str(coarse_seek)
+
+    def _iter_trim_after_i(
+            self, src_sequence: Optional[FrameSequence] = None) \
+            -> Iterable[Tuple[str, str]]:
+        trim = self._sequence_trim(src_sequence)
+        if trim is not None:
+            # the exact number of frames also lets ffmpeg report
+            # the progress of the whole encode
+            yield "-frames:v", str(trim[1])
+        else:
+            _, residual_seek = self.dst_time_range.split_begin()
+            if residual_seek:
+                yield "-ss", str(residual_seek)
+            if self.dst_time_range.duration is not None:
+                yield "-t", str(self.dst_time_range.duration)
+
+    def _iter_known_all_after_i(
+            self, src_sequence: Optional[FrameSequence] = None) \
+            -> Iterable[Union[str, Tuple[str, Optional[str]]]]:
+        for pair in self._iter_trim_after_i(src_sequence):
+            yield pair
+        graph = self._video_graph()
+        if graph.is_linear():
+            vf_str = graph.chains[0].filters_string()
             if vf_str:
                 yield '-vf', vf_str
-
-        if self.dst_codec_video is not None:
-            for pair in self.dst_codec_video.args():
+        else:
+            yield '-filter_complex', str(graph)
+            for label in graph.outputs():
+                yield '-map', f'[{label}]'
+            if self.dst_codec_audio is not None:
+                # '?' allows sources without audio
+                yield '-map', '0:a?'
+        for item in self._iter_encoding_args(self.dst_codec_video,
+                                             self.dst_pixfmt,
+                                             self.dst_codec_audio):
+            yield item
+
+    def _iter_encoding_args(self, codec_video: Optional[Codec],
+                            pixfmt: Optional[str],
+                            codec_audio: Optional[Codec]) \
+            -> Iterable[Union[str, Tuple[str, Optional[str]]]]:
+        codec_video = self._tiered_codec(codec_video)
+        if codec_video is not None:
+            for pair in codec_video.args():
                 yield pair
 
-        if self.dst_pixfmt:
-            yield '-pix_fmt', self.dst_pixfmt
+        if pixfmt:
+            yield '-pix_fmt', pixfmt
 
         # странные параметры, которые определяют "метаданные" результирующего
         # видео. В итоге оно при кодировании выглядит например как
@@ -455,11 +620,10 @@ class FfmpegCommand:
             yield '-color_range', '2' if self._dst_color_range_meta else '1'
 
         yield '-movflags', '+write_colr'
-        yield ('-sws_flags',
-               'spline+accurate_rnd+full_chroma_int+full_chroma_inp')
+        yield '-sws_flags', TIER_SETTINGS[self.tier].sws_flags
 
-        if self.dst_codec_audio is not None:
-            for pair in self.dst_codec_audio.args():
+        if codec_audio is not None:
+            for pair in codec_audio.args():
                 yield pair
 
         if self.debug:
@@ -521,17 +685,18 @@ class FfmpegCommand:
                 if v is not None:
                     yield v
 
-    def _iter_almost_final(self) -> Iterable[str]:
+    def _iter_almost_final(self, input_args: Iterable[str],
+                           src_sequence: Optional[FrameSequence] = None) \
+            -> Iterable[str]:
         """Возвращает аргументы к команде ffmpeg списком."""
 
         for x in self._iter_replacing_overrides(
-                self._iter_known_before_i(),
+                self._iter_known_before_i(src_sequence),
                 dict(self.custom.before_i.pairs())):
             yield x
 
-        if self.src_file:  # todo это не должно быть опциональным
-            for arg in arg_i(self.src_file):
-                yield arg
+        for arg in input_args:
+            yield arg
 
         combined_overrides_after_i = self._combine_overrides([
             dict(self.custom.after_i.pairs()),
@@ -539,8 +704,14 @@ class FfmpegCommand:
             dict(self.custom.audio.pairs()),
         ])
 
+        if self._renditions:
+            for x in self._iter_renditions(src_sequence,
+                                           combined_overrides_after_i):
+                yield x
+            return
+
         for x in self._iter_replacing_overrides(
-                self._iter_known_all_after_i(),
+                self._iter_known_all_after_i(src_sequence),
                 combined_overrides_after_i):
             yield x
 
@@ -549,17 +720,380 @@ class FfmpegCommand:
             raise ValueError("Output file not specified")
         yield str(self.dst_file)
 
-    def __iter__(self) -> Iterable[str]:
-        args = list(desynonimize(arg) for arg in self._iter_almost_final())
+    def _src_size(self) -> Optional[Tuple[int, int]]:
+        if self.src_width is None or self.src_height is None:
+            return None
+        return self.src_width, self.src_height
+
+    def _outputs(self) -> List[Tuple[Optional[Codec], Optional[str]]]:
+        """The video codec and pixel format of each output file."""
+        return [(r.dst_codec_video, r.dst_pixfmt)
+                for r in self._renditions] \
+            or [(self.dst_codec_video, self.dst_pixfmt)]
+
+    def _crosses_rgb(self) -> bool:
+        """Whether the frames may be converted between YUV and RGB after
+        the filters: to the `dst_pixfmt`, or to the formats the encoder
+        accepts, if they are known. A source of an unknown format is
+        taken for YUV."""
+        src_rgb = bool(self.src_pixfmt and pixfmt_rgb(self.src_pixfmt))
+        for codec, pixfmt in self._outputs():
+            formats = (pixfmt,) if pixfmt \
+                else self._encoder_pixfmts.get(_video_encoder(codec) or '',
+                                               ())
+            families = {pixfmt_rgb(f) for f in formats} - {None}
+            if families and src_rgb not in families:
+                return True
+        return False
+
+    def _normalized(self) -> List:
+        """The filter chain without the filters that do nothing, with the
+        settings of the tier."""
+        outputs = self._outputs()
+        return self._tiered(
+            normalized_filters(self._filter_chain, self._src_size(),
+                               crosses_rgb=self._crosses_rgb()),
+            [pixfmt for _, pixfmt in outputs])
+
+    def _filters(self) -> List:
+        """The normalized filters in the order they will run. The order is
+        planned after the tier sets the kernels, since they decide which
+        filters can be swapped."""
+        src_size = self._src_size()
+        filters = self._normalized()
+        if src_size is not None and self.reorder_filters:
+            filters = list(plan_geometry(filters, src_size).filters)
+        return filters
+
+    def geometry_plan(self) -> GeometryPlan:
+        """Returns the filters in the order they will run, with the
+        estimated number of pixels they process per frame. Requires
+        `src_width` and `src_height`."""
+        src_size = self._src_size()
+        if src_size is None:
+            raise ValueError("The source size is unknown")
+        filters = self._normalized()
+        if not self.reorder_filters:
+            pixels = pixels_per_frame(filters, src_size)
+            return GeometryPlan(tuple(filters), pixels, pixels)
+        return plan_geometry(filters, src_size)
+
+    def _tiered(self, filters: Iterable,
+                dst_pixfmts: Iterable[Optional[str]]) -> List:
+        """The filters with the kernel and dithering of the tier, where
+        the zscale filters do not set their own."""
+        settings = TIER_SETTINGS[self.tier]
+        dither = self.dither if self.dither is not None \
+            else auto_dither(self.src_pixfmt, dst_pixfmts,
+                             reducing=settings.reducing_dither)
+        kernel = settings.zscale_kernel
+        return [untracked_copy(f, dither=f.dither or dither,
+                               kernel=f.kernel or kernel)
+                if isinstance(f, ZscaleFilter)
+                and (f.dither is None or f.kernel is None) else f
+                for f in filters]
+
+    def _tiered_codec(self, codec: Optional[Codec]) -> Optional[Codec]:
+        """The codec with the preset of the tier, if the codec has no
+        preset of its own and the tier's one is faster."""
+        preset = TIER_SETTINGS[self.tier].preset
+        if preset is None or not isinstance(codec, (Avc, Hevc)) \
+                or codec.preset is not None:
+            return codec
+        default = codec.default_preset()
+        order = list(VcPreset)
+        if order.index(preset) < order.index(default or VcPreset.N6_MEDIUM):
+            return untracked_copy(codec, preset=preset)
+        return codec
+
+    def _terminal_format(self, codec: Optional[Codec],
+                         pixfmt: Optional[str]) -> Optional[FormatFilter]:
+        """The filter that makes the graph output the frames in the format
+        the encoder gets. Without it, the last filter of the graph may
+        output another format, and ffmpeg converts it once more.
+
+        This is the `pixfmt` if set, otherwise any of the formats
+        the encoder accepts, if they are known."""
+        encoder = _video_encoder(codec)
+        if encoder == 'copy':
+            return None
+        if pixfmt:
+            return FormatFilter((pixfmt,))
+        if encoder is not None and encoder in self._encoder_pixfmts:
+            return FormatFilter(self._encoder_pixfmts[encoder])
+        return None
+
+    def _video_graph(self) -> FilterGraph:
+        """The filter graph of a command without renditions."""
+        if self.filter_graph is None:
+            filters = self._filters()
+            terminal = self._terminal_format(self.dst_codec_video,
+                                             self.dst_pixfmt)
+            if terminal is not None:
+                filters.append(terminal)
+            return untracked_instance(
+                FilterGraph, _chains=[GraphChain(('0:v',), tuple(filters))])
+        if any(str(f) for f in self._filter_chain):
+            raise ValueError("The filters of the command are not used "
+                             "with a filter_graph. Put them into the graph")
+        self.filter_graph.validate()
+        return self.filter_graph
+
+    def _renditions_graph(self) -> FilterGraph:
+        """The graph that applies the filter chain once, then splits the
+        frames into a labeled output per rendition, like
+        '[0:v]crop=...,split=2[v0][s1];[s1]zscale=...[v1]'.
+
+        A rendition scaled from another rendition takes the frames from
+        the output of that one instead of the split of the source."""
+        if self.filter_graph is not None:
+            raise ValueError("A command with renditions cannot have "
+                             "a filter_graph")
+        # the consumers of the source frames (None) and of the output
+        # of each rendition
+        children: Dict[Optional[int], List[int]] = {None: []}
+        scales = []
+        formats = []
+        for idx, rendition in enumerate(self._renditions):
+            children[idx] = []
+            parent = None
+            if rendition.scale_from is not None:
+                parent = next((i for i in range(idx) if self._renditions[i]
+                               is rendition.scale_from), None)
+                if parent is None:
+                    raise ValueError(f"Rendition {idx} is scaled from "
+                                     f"a rendition not added before it")
+            children[parent].append(idx)
+            scales.append(rendition._scale_filter(self._use_zscale))
+            if scales[idx] is not None:
+                scales[idx], = self._tiered([scales[idx]],
+                                            [rendition.dst_pixfmt])
+            formats.append(self._terminal_format(rendition.dst_codec_video,
+                                                 rendition.dst_pixfmt))
+
+        def input_label(idx: int) -> str:
+            # a rendition without filters and consumers needs no chain
+            # of its own: its frames come right from the parent
+            if scales[idx] is None and formats[idx] is None \
+                    and not children[idx]:
+                return f'v{idx}'
+            return f's{idx}'
+
+        def chain(src: str, filters: List, outputs: List[str]) \
+                -> GraphChain:
+            if len(outputs) > 1:
+                filters = filters + [f'split={len(outputs)}']
+            return GraphChain((src,), tuple(filters), tuple(outputs))
+
+        # the frames of the common filters go to all the renditions
+        common = self._filters()
+        chains = [chain('0:v', common,
+                        [input_label(i) for i in children[None]])]
+        for idx in range(len(self._renditions)):
+            if input_label(idx) != f's{idx}':
+                continue
+            filters = [scales[idx]] if scales[idx] else []
+            consumers = [input_label(i) for i in children[idx]]
+            if formats[idx] is None:
+                chains.append(chain(f's{idx}', filters,
+                                    [f'v{idx}'] + consumers))
+            elif not consumers:
+                chains.append(chain(f's{idx}', filters + [formats[idx]],
+                                    [f'v{idx}']))
+            else:
+                # the renditions scaled from this one take the frames
+                # before they are converted for its encoder
+                chains.append(chain(f's{idx}', filters,
+                                    [f'f{idx}'] + consumers))
+                chains.append(chain(f'f{idx}', [formats[idx]], [f'v{idx}']))
+        return untracked_instance(FilterGraph, _chains=chains)
+
+    def _iter_renditions(self, src_sequence: Optional[FrameSequence],
+                         overrides: Dict[str, Optional[str]]) \
+            -> Iterable[str]:
+        if self.dst_file is not None:
+            raise ValueError("dst_file is not used when the command "
+                             "has renditions")
+        yield '-filter_complex'
+        yield str(self._renditions_graph())
+
+        # each output has its own options, so the custom arguments
+        # are repeated for each of them
+        for idx, rendition in enumerate(self._renditions):
+            if rendition.dst_file is None:
+                raise ValueError(f"Output file of rendition {idx} "
+                                 f"not specified")
+            for x in self._iter_replacing_overrides(
+                    self._iter_rendition_args(idx, rendition, src_sequence),
+                    overrides):
+                yield x
+            yield str(rendition.dst_file)
+
+    def _iter_rendition_args(self, idx: int, rendition: Rendition,
+                             src_sequence: Optional[FrameSequence]) \
+            -> Iterable[Union[str, Tuple[str, Optional[str]]]]:
+        yield '-map', f'[v{idx}]'
+        if rendition.dst_codec_audio is not None:
+            # '?' allows sources without audio
+            yield '-map', '0:a?'
+        for pair in self._iter_trim_after_i(src_sequence):
+            yield pair
+        for item in self._iter_encoding_args(rendition.dst_codec_video,
+                                             rendition.dst_pixfmt,
+                                             rendition.dst_codec_audio):
+            yield item
+
+    def __getstate__(self):
+        # the file system may differ where the copy is loaded
+        state = super().__getstate__()
+        state['_compiled'] = None
+        return state
+
+    def _src_sequence(self) -> Optional[FrameSequence]:
+        if not self.src_file:
+            return None
+        return frame_sequence(str(self.src_file))
+
+    def _sequence_trim(self, src_sequence: Optional[FrameSequence]) \
+            -> Optional[Tuple[int, int]]:
+        """Returns the first frame number and the number of frames to read
+        from the image sequence, or None if the sequence cannot be trimmed
+        by choosing the files.
 
-        if not any(s in args for s in ("-codec:v", "-vn")):
-            raise VideoCodecNotSpecifiedError(args)
+        Unlike -ss after -i, this does not make ffmpeg decode the frames
+        before the trim point."""
+        if src_sequence is None:
+            return None
+        time_range = self.dst_time_range
+        if not time_range.begin and time_range.duration is None:
+            return src_sequence.first, src_sequence.contiguous_count
+        if not self.src_fps:
+            # the frame numbers are unknown, so ffmpeg will trim
+            # by the timestamps
+            return None
+        start = src_sequence.first + int(round(time_range.begin
+                                               * self.src_fps))
+        available = src_sequence.contiguous_count_from(start)
+        if available <= 0:
+            raise ValueError(f"Frame {start} not found in "
+                             f"{src_sequence.pattern}")
+        if time_range.duration is None:
+            return start, available
+        return start, min(available,
+                          int(round(time_range.duration * self.src_fps)))
+
+    def _custom_state(self) -> Hashable:
+        c = self.custom
+        # the lists of the custom args can be modified in place, without
+        # notifying anybody, so they are compared by value
+        return (tuple(c.before_i.list), tuple(c.after_i.list),
+                tuple(c.video.list), tuple(c.audio.list))
+
+    def compile(self) -> CompiledCommand:
+        """Returns the immutable list of arguments.
+
+        The result is memoized: it is computed again only when some field
+        of the command (including the fields of its filters, codecs and
+        custom arguments) has changed since the previous call, or the
+        source is a frame sequence directory whose contents have changed.
+        A source that was not a frame sequence or a glob pattern is not
+        checked on disk again until the command changes."""
+
+        version = self._version
+        custom = self._custom_state()
+        compiled = self._compiled
+        if compiled is not None and (compiled.version != version
+                                     or compiled.custom != custom):
+            compiled = None
+
+        if compiled is not None and not compiled.check_src:
+            return compiled.args
+        # the arguments also depend on the directory contents when the
+        # source is a frame sequence
+        src_sequence = self._src_sequence()
+        if compiled is not None and compiled.src_sequence == src_sequence:
+            return compiled.args
+
+        trim = self._sequence_trim(src_sequence)
+        input_args = _input_args(
+            str(self.src_file), src_sequence,
+            start_number=trim[0] if trim is not None else None) \
+            if self.src_file else []  # todo это не должно быть опциональным
+
+        args = CompiledCommand(
+            desynonimize(arg) for arg in
+            self._iter_almost_final(input_args, src_sequence))
+
+        if "-codec:v" not in args and "-vn" not in args:
+            raise VideoCodecNotSpecifiedError(list(args))
 
         # The -vn / -an / -sn / -dn options can be used to skip inclusion
         # of video, audio, subtitle and data streams respectively
-        if not any(s in args for s in ("-codec:a", "-an")):
+        if "-codec:a" not in args and "-an" not in args:
             raise AudioCodecNotSpecifiedError
-        return iter(args)
+
+        check_src = src_sequence is not None or '*' in str(self.src_file)
+        # not a change of the command, so bypassing Tracked.__setattr__
+        object.__setattr__(self, '_compiled', _Compiled(
+            version, custom, src_sequence, check_src, args))
+        return args
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.compile())
 
     def __str__(self):
-        return ' '.join(iter(self))
+        return str(self.compile())
+
+    def _encoders(self) -> List[str]:
+        """Names of the encoders the command will use."""
+        args = list(self)
+        return [args[idx + 1] for idx, arg in enumerate(args[:-1])
+                if arg in ('-codec:v', '-codec:a') and args[idx + 1] != 'copy']
+
+    def adapt_to_ffmpeg(self) -> None:
+        """Checks the command against the build of `ffmpeg_exe`, so that
+        a command that cannot run fails now rather than minutes later.
+
+        If the build has no `zscale` filter (no libzimg), switches the
+        command to `scale`. If an encoder is missing, raises
+        `EncoderNotAvailableError`.
+
+        Finds the pixel formats the video encoders accept. The filter graph
+        then ends with a `format=` filter, so the frames are converted
+        to one of them by the scaler of the graph rather than by swscale
+        after the graph. If the encoder does not accept the `dst_pixfmt`,
+        raises `PixfmtNotSupportedError`.
+
+        The capabilities of the build are cached, so the check does not
+        run ffmpeg each time."""
+        caps = capabilities(self.ffmpeg_exe)
+        if self._use_zscale and 'zscale' not in caps.filters:
+            self.use_zscale = False
+        for encoder in self._encoders():
+            if encoder not in caps.encoders:
+                raise EncoderNotAvailableError(encoder)
+
+        for codec, pixfmt in self._outputs():
+            video_encoder = _video_encoder(codec)
+            if video_encoder is None or video_encoder == 'copy':
+                continue
+            supported = caps.encoder_pixfmts(video_encoder)
+            if supported is None:
+                continue
+            if pixfmt and pixfmt not in supported:
+                raise PixfmtNotSupportedError(
+                    f"{video_encoder} does not accept {pixfmt}. "
+                    f"Supported: {' '.join(supported)}")
+            if self._encoder_pixfmts.get(video_encoder) != supported:
+                self._encoder_pixfmts[video_encoder] = supported
+                self._touch()
+
+    def run_async(self) -> AsyncIterator[FfmpegProgress]:
+        """Runs the command with asyncio, yielding progress events
+        as ffmpeg reports them:
+
+            async for progress in cmd.run_async():
+                print(progress.frame, progress.speed)
+
+        Raises `subprocess.CalledProcessError` if ffmpeg fails."""
+        return iter_progress(with_progress_args(list(self)))
@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import itertools
+import threading
+import weakref
+from typing import Iterable, Tuple, FrozenSet, Optional, Iterator, TypeVar, \
+    Any, Dict, Type
+
+# The versions of the tracked objects. Every change takes a number that was
+# never used before in the process, so a version seen earlier cannot come
+# back. itertools.count is atomic, so threads never take the same number
+_versions = itertools.count(1)
+
+_owners_lock = threading.Lock()
+
+
+class Tracked:
+    """Base for the objects that affect the arguments of a command.
+
+    Assigning any attribute gives the object a new `_version`. The change
+    propagates to the tracked objects that contain this one, so the version
+    of a command changes when the command or any of its filters, codecs
+    and other parts change, and only then."""
+
+    _version = 0
+
+    # the objects containing this one, by their ids
+    _owners: Optional[Dict[int, 'weakref.ReferenceType[Tracked]']] = None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if isinstance(value, _CONTAINERS):
+            self._own(value)
+        self._touch()
+
+    def _own(self, value: Any) -> None:
+        """Makes the changes of the tracked objects in `value` (an object,
+        a list or a tuple) propagate to this object. Must be called when
+        adding them to a container that belongs to the object."""
+        if isinstance(value, Tracked):
+            # setdefault and item assignment are atomic
+            owners = value.__dict__.setdefault('_owners', dict())
+            owners[id(self)] = weakref.ref(self)
+            count = len(owners)
+            if count >= 8 and count & (count - 1) == 0:
+                # the count is a power of two: the objects shared by many
+                # short-lived commands do not collect dead references
+                _forget_dead(owners)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, _CONTAINERS):
+                    self._own(item)
+
+    def _touch(self) -> None:
+        """Marks the object and its owners as changed. Must be called after
+        mutating a container that belongs to the object."""
+        self.__dict__['_version'] = next(_versions)
+        owners = self._owners
+        if owners:
+            # copying the values of a dict is atomic
+            for ref in tuple(owners.values()):
+                owner = ref()
+                if owner is not None:
+                    owner._touch()
+
+    def __getstate__(self):
+        # the copy is owned by the copies of the owners, which register
+        # themselves in __setstate__
+        state = dict(self.__dict__)
+        state.pop('_owners', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for value in state.values():
+            if isinstance(value, _CONTAINERS):
+                self._own(value)
+        # the version may come from another process
+        self.__dict__['_version'] = next(_versions)
+
+
+def _forget_dead(owners: Dict[int, 'weakref.ReferenceType[Tracked]']) \
+        -> None:
+    with _owners_lock:
+        for key, ref in tuple(owners.items()):
+            if ref() is None and owners.get(key) is ref:
+                del owners[key]
+
+
+# the values that may contain tracked objects
+_CONTAINERS = (Tracked, list, tuple)
+
+T = TypeVar('T', bound=Tracked)
+
+
+def untracked_copy(obj: T, **attrs) -> T:
+    """Returns a shallow copy of a tracked object with some attributes
+    replaced. The copy is made while compiling a command and does not
+    count as a change of the original object."""
+    result = object.__new__(type(obj))
+    result.__dict__.update(obj.__dict__)
+    result.__dict__.pop('_owners', None)
+    result.__dict__.update(attrs)
+    return result
+
+
+def untracked_instance(cls: Type[T], **attrs) -> T:
+    """Returns a new tracked object with the given attributes, without
+    calling the constructor. The object is made while compiling a command,
+    so the changes of the objects it contains do not propagate to it."""
+    result = object.__new__(cls)
+    result.__dict__.update(attrs)
+    return result
+
+
+class CompiledCommand:
+    """The immutable argument list of a `FfmpegCommand`.
+
+    Checking whether an argument is present takes O(1)."""
+
+    __slots__ = ('_args', '_arg_set', '_str')
+
+    def __init__(self, args: Iterable[str]):
+        self._args: Tuple[str, ...] = tuple(args)
+        self._arg_set: FrozenSet[str] = frozenset(self._args)
+        self._str: Optional[str] = None
+
+    @property
+    def args(self) -> Tuple[str, ...]:
+        return self._args
+
+    def __contains__(self, arg: object) -> bool:
+        return arg in self._arg_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._args)
+
+    def __len__(self) -> int:
+        return len(self._args)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompiledCommand):
+            return NotImplemented
+        return self._args == other._args
+
+    def __hash__(self) -> int:
+        return hash(self._args)
+
+    def __str__(self) -> str:
+        if self._str is None:
+            self._str = ' '.join(self._args)
+        return self._str
+
+    def __repr__(self) -> str:
+        return f"CompiledCommand({list(self._args)!r})"
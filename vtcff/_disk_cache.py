@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""A tiny persistent cache of JSON documents. The results of ffmpeg/ffprobe
+runs are stored here, so they cost nothing the next time."""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, Any, Union
+
+
+def cache_dir() -> Path:
+    """The directory for the cached data. Can be changed with the
+    VTCFF_CACHE_DIR environment variable."""
+    env = os.environ.get('VTCFF_CACHE_DIR')
+    if env:
+        return Path(env)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+        return Path(base) / 'vtcff' / 'Cache'
+    if sys.platform == 'darwin':
+        return Path.home() / 'Library' / 'Caches' / 'vtcff'
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'vtcff'
+
+
+def file_key(path: Union[str, Path], *extra: Any) -> str:
+    """Returns a key that changes whenever the file is replaced
+    or modified."""
+    resolved = Path(path).resolve()
+    st = resolved.stat()
+    return hashlib.sha1(
+        repr((str(resolved), st.st_size, st.st_mtime_ns) + extra)
+        .encode('utf-8')).hexdigest()
+
+
+def _cache_file(section: str, key: str) -> Path:
+    return cache_dir() / section / f"{key}.json"
+
+
+def read_cached(section: str, key: str) -> Optional[Any]:
+    try:
+        with _cache_file(section, key).open('rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # missing or damaged files are the same as no files
+        return None
+
+
+def _prune(directory: Path, max_entries: int) -> None:
+    """Removes the least recently written files of the section, leaving
+    `max_entries` of them."""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+    except OSError:
+        return
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - max_entries)]:
+        try:
+            os.remove(path)
+        except OSError:
+            # removed by a parallel process
+            pass
+
+
+def write_cached(section: str, key: str, data: Any,
+                 max_entries: Optional[int] = None) -> None:
+    """Stores the data. If `max_entries` is set, the oldest files of the
+    section are removed so that it keeps no more than that."""
+    target = _cache_file(section, key)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # writing to a temporary file and renaming it, so that parallel
+        # processes never read a half-written file
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wt', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, target)
+    except OSError:
+        # the cache is an optimization. If the directory is not writable,
+        # we will just compute the data again next time
+        return
+    if max_entries is not None:
+        _prune(target.parent, max_entries)
@@ -0,0 +1,31 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+from typing import Optional, Iterable
+
+from ._filter_zscale import Dither
+from ._pf_00_pixfmt_table import pixfmt_info
+
+
+def _bpc(pixfmt: Optional[str]) -> Optional[int]:
+    # only the static table: compiling a command does not run ffmpeg
+    if not pixfmt:
+        return None
+    info = pixfmt_info(pixfmt)
+    return info.bpc if info is not None else None
+
+
+def auto_dither(src_pixfmt: Optional[str],
+                dst_pixfmts: Iterable[Optional[str]],
+                reducing: Dither = Dither.ERROR_DIFFUSION) -> Dither:
+    """The `reducing` dither when the frames lose bits per channel on
+    the way to any of the `dst_pixfmts`, no dithering otherwise.
+
+    When the depth of a format is unknown, the depth is assumed to be
+    reduced."""
+    src_bpc = _bpc(src_pixfmt)
+    dst_bpcs = [_bpc(pixfmt) for pixfmt in dst_pixfmts]
+    if src_bpc is None or not dst_bpcs \
+            or any(bpc is None or bpc < src_bpc for bpc in dst_bpcs):
+        return reducing
+    return Dither.NONE
@@ -3,8 +3,10 @@
 
 from typing import Optional, Iterable, Tuple
 
+from ._compiled_command import Tracked
 
-class FilterBase:
+
+class FilterBase(Tracked):
     def __init__(self):
         self._pairs = dict()
 
@@ -15,6 +17,7 @@ class FilterBase:
             assert val is None
             if key in self._pairs:
                 del self._pairs[key]
+        self._touch()
         assert self._pairs.get(key) == val
 
     @classmethod
@@ -0,0 +1,17 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+from typing import NamedTuple, Tuple
+
+
+class FormatFilter(NamedTuple):
+    """Constrains the pixel format of the frames leaving the filter graph.
+
+    Placed at the end of the graph, it lets ffmpeg negotiate the format with
+    the scaler that is already there, so the scaler outputs the final format
+    itself. Otherwise ffmpeg appends its own conversion (swscale) after the
+    graph."""
+    pixfmts: Tuple[str, ...]
+
+    def __str__(self):
+        return 'format=' + '|'.join(self.pixfmts)
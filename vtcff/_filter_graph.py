@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Filter graphs with named pads, rendered to -filter_complex.
+
+    graph = FilterGraph()
+    graph.add('0:v', ['split=2'], ['a', 'b'])
+    graph.add('a', [Crop(0, 0, 960, 1080)], 'left')
+    graph.add('b', [Crop(960, 0, 960, 1080), 'hflip'], 'right')
+    graph.add(['left', 'right'], ['hstack'], 'out')
+
+The filters are the objects the commands use (`Crop`, `Pad`,
+`TransposeFilter`, `ZscaleFilter`, `SwscaleFilter`...) or strings."""
+
+from typing import NamedTuple, Tuple, Any, Iterable, List, Union, Set
+
+from ._compiled_command import Tracked
+
+_Labels = Union[str, Iterable[str]]
+
+
+def _labels(x: _Labels) -> Tuple[str, ...]:
+    if isinstance(x, str):
+        return (x,)
+    return tuple(x)
+
+
+def _is_stream(label: str) -> bool:
+    # '0:v', '1:a:0' are streams of the input files, not pads of the graph
+    return ':' in label
+
+
+class GraphChain(NamedTuple):
+    """Filters applied one after another, from the input pads
+    to the output pads."""
+    inputs: Tuple[str, ...] = ()
+    filters: Tuple[Any, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+    def filters_string(self) -> str:
+        # a filter with nothing to do (like ZscaleFilter without arguments)
+        # renders to an empty string
+        return ','.join(s for s in (str(f) for f in self.filters) if s)
+
+    def __str__(self):
+        return (''.join(f'[{label}]' for label in self.inputs)
+                + (self.filters_string() or 'null')
+                + ''.join(f'[{label}]' for label in self.outputs))
+
+
+class FilterGraph(Tracked):
+    def __init__(self, chains: Iterable[GraphChain] = ()):
+        self._chains: List[GraphChain] = list(chains)
+
+    @property
+    def chains(self) -> Tuple[GraphChain, ...]:
+        return tuple(self._chains)
+
+    def add(self, inputs: _Labels = (), filters: Iterable[Any] = (),
+            outputs: _Labels = ()) -> GraphChain:
+        chain = GraphChain(_labels(inputs), tuple(filters), _labels(outputs))
+        self._chains.append(chain)
+        self._own(chain)
+        self._touch()
+        return chain
+
+    def outputs(self) -> List[str]:
+        """The output pads not connected to any chain. They are the outputs
+        of the whole graph."""
+        consumed = {label for chain in self._chains
+                    for label in chain.inputs}
+        return [label for chain in self._chains for label in chain.outputs
+                if label not in consumed]
+
+    def validate(self) -> None:
+        """Raises ValueError if a pad is produced or consumed twice, or
+        a chain takes a pad that no chain produces."""
+        produced: Set[str] = set()
+        for chain in self._chains:
+            for label in chain.outputs:
+                if label in produced:
+                    raise ValueError(f"Pad [{label}] is produced twice")
+                produced.add(label)
+        consumed: Set[str] = set()
+        for chain in self._chains:
+            for label in chain.inputs:
+                if _is_stream(label):
+                    continue
+                if label not in produced:
+                    raise ValueError(f"Pad [{label}] is not produced "
+                                     f"by any chain")
+                if label in consumed:
+                    raise ValueError(f"Pad [{label}] is consumed twice")
+                consumed.add(label)
+
+    def is_linear(self) -> bool:
+        """Whether the graph is a single chain processing the first video
+        stream, so it can be passed as -vf."""
+        if len(self._chains) != 1:
+            return False
+        chain = self._chains[0]
+        return chain.inputs in ((), ('0:v',)) and len(chain.outputs) <= 1
+
+    def __str__(self):
+        return ';'.join(str(chain) for chain in self._chains)
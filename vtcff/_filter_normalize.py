@@ -0,0 +1,166 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Removing the filters that do nothing. Each filter in the chain is a full
+pass over the frame, and a scaler without anything to do may still convert
+the pixel format back and forth."""
+
+from typing import List, Optional, Tuple, Any, Sequence
+
+from ._common import Scale
+from ._compiled_command import untracked_copy
+from ._filter_crop import Crop
+from ._filter_pad import Pad
+from ._filter_swscale import SwscaleFilter
+from ._filter_transpose import TransposeFilter
+from ._filter_zscale import ZscaleFilter
+
+Size = Tuple[int, int]
+
+# the arguments of the scalers describing the source and the result
+# of the same conversion
+_ZSCALE_IN_OUT = (('matrixin', 'matrix'), ('rangein', 'range'),
+                  ('primariesin', 'primaries'), ('transferin', 'transfer'))
+_SWSCALE_IN_OUT = (('in_color_matrix', 'out_color_matrix'),
+                   ('in_range', 'out_range'))
+
+
+def _proportional(value: int, factor: int, num: int, den: int) -> int:
+    # ffmpeg: av_rescale(h, iw, ih * factor) * factor
+    return (value * num * 2 + den * factor) // (den * factor * 2) * factor
+
+
+def scaled_size(scale: Scale, size: Optional[Size]) -> Optional[Size]:
+    """The size of the frames after the scaling, or None if it cannot
+    be computed."""
+    if size is None:
+        return None
+    src_w, src_h = size
+    w, h = scale.width, scale.height
+    if scale.downscale_only:
+        w = min(w, src_w) if w >= 0 else w
+        h = min(h, src_h) if h >= 0 else h
+    if w == 0:
+        w = src_w
+    if h == 0:
+        h = src_h
+    if w > 0 and h > 0:
+        return w, h
+    if w < 0 and h > 0:
+        return _proportional(h, -w, src_w, src_h), h
+    if h < 0 and w > 0:
+        return w, _proportional(w, -h, src_h, src_w)
+    return None
+
+
+def size_after(f: Any, size: Optional[Size]) -> Optional[Size]:
+    if size is None:
+        return None
+    if isinstance(f, Crop):
+        return (f.width, f.height) if f.width > 0 and f.height > 0 else None
+    if isinstance(f, TransposeFilter):
+        return size[1], size[0]
+    if isinstance(f, Pad):
+        if isinstance(f.width, int) and isinstance(f.height, int) \
+                and f.width > 0 and f.height > 0:
+            return f.width, f.height
+        return None
+    if isinstance(f, ZscaleFilter):
+        return scaled_size(f.scaling, size) if f.scaling else size
+    if isinstance(f, SwscaleFilter):
+        if f.width is None and f.height is None:
+            return size
+        if f.width is None or f.height is None:
+            # a single dimension is not resolved here: the size is unknown
+            return None
+        return scaled_size(Scale(f.width, f.height, f.downscale_only), size)
+    return None
+
+
+def _without_same_in_out(pairs: dict, in_out: Sequence[Tuple[str, str]]) \
+        -> dict:
+    result = dict(pairs)
+    for key_in, key_out in in_out:
+        if key_in in result and result.get(key_out) == result[key_in]:
+            del result[key_in]
+            del result[key_out]
+    return result
+
+
+def _normalized_zscale(f: ZscaleFilter, size: Optional[Size],
+                       crosses_rgb: bool) -> Optional[ZscaleFilter]:
+    pairs = f._pairs if crosses_rgb \
+        else _without_same_in_out(f._pairs, _ZSCALE_IN_OUT)
+    scaling = f.scaling
+    if scaling is not None and size is not None \
+            and scaled_size(scaling, size) == size:
+        scaling = None
+    if scaling is None and not pairs:
+        return None
+    if scaling == f.scaling and pairs == f._pairs:
+        return f
+    return untracked_copy(f, _pairs=pairs, scaling=scaling)
+
+
+def _normalized_swscale(f: SwscaleFilter, size: Optional[Size],
+                        crosses_rgb: bool) -> Optional[SwscaleFilter]:
+    pairs = f._pairs if crosses_rgb \
+        else _without_same_in_out(f._pairs, _SWSCALE_IN_OUT)
+    width, height = f.width, f.height
+    if width is not None and size is not None \
+            and size_after(f, size) == size:
+        width, height = None, None
+    if width is None and not pairs:
+        return None
+    if width == f.width and pairs == f._pairs:
+        return f
+    return untracked_copy(f, _pairs=pairs, width=width, height=height)
+
+
+def _merged_crops(filters: Sequence[Any]) -> List[Any]:
+    result: List[Any] = []
+    for f in filters:
+        if isinstance(f, Crop) and result and isinstance(result[-1], Crop):
+            # the second crop is relative to the first one
+            prev = result[-1]
+            f = Crop(left=prev.left + f.left, top=prev.top + f.top,
+                     width=f.width, height=f.height)
+            result[-1] = f
+        else:
+            result.append(f)
+    return result
+
+
+def normalized_filters(filters: Sequence[Any],
+                       src_size: Optional[Size] = None,
+                       crosses_rgb: bool = False) -> List[Any]:
+    """Returns the filters without the ones that do nothing: empty scalers,
+    conversions between equal color spaces or ranges, crops and pads
+    of the full frame, scaling to the same size. Adjacent crops are merged.
+
+    The size-dependent checks are only made while the size of the frames
+    is known, starting from `src_size`.
+
+    If `crosses_rgb` is True, the frames are converted between YUV and RGB
+    after the filters. That conversion needs the color matrix and range
+    of the frames, so the scalers keep them even if they are the same
+    in and out.
+
+    The filter objects are not modified: the changed ones are returned
+    as copies."""
+    result = []
+    size = src_size
+    for f in _merged_crops(filters):
+        if isinstance(f, (Crop, Pad)):
+            if size is not None and (f.left, f.top, f.width, f.height) \
+                    == (0, 0) + size:
+                continue
+        elif isinstance(f, ZscaleFilter):
+            f = _normalized_zscale(f, size, crosses_rgb)
+        elif isinstance(f, SwscaleFilter):
+            f = _normalized_swscale(f, size, crosses_rgb)
+        if f is None:
+            continue
+        size = size_after(f, size)
+        result.append(f)
+    return result
@@ -3,6 +3,8 @@
 
 from enum import IntEnum, unique
 
+from ._compiled_command import Tracked
+
 
 @unique
 class Transpose(IntEnum):
@@ -13,7 +15,7 @@ class Transpose(IntEnum):
     CLOCKWISE_VFLIP = 3
 
 
-class TransposeFilter:
+class TransposeFilter(Tracked):
     def __init__(self):
         self.kind = Transpose.CLOCKWISE
 
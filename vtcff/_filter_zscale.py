@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 import warnings
+from enum import Enum, unique
 from typing import Optional
 
 from vtcff._common import Scale, frame_dimension_spec
@@ -27,10 +28,25 @@ def _full_limited_none(x: Optional[str]):
         raise ValueError
 
 
+@unique
+class Dither(Enum):
+    NONE = 'none'
+    ORDERED = 'ordered'
+    RANDOM = 'random'
+    ERROR_DIFFUSION = 'error_diffusion'
+    """The best quality and the slowest."""
+
+
 class ZscaleFilter(FilterBase):
     def __init__(self):
         super().__init__()
         self.scaling: Optional[Scale] = None
+        self.dither: Optional[Dither] = None
+        """None means error diffusion, or the dithering chosen by the
+        command for its tier and pixel formats."""
+        self.kernel: Optional[str] = None
+        """The filter used for resizing. None means spline36, or the kernel
+        of the tier of the command."""
 
     @property
     def dst_range_full(self) -> Optional[bool]:
@@ -74,7 +90,7 @@ class ZscaleFilter(FilterBase):
 
         all_pairs = dict()
         if self.scaling is not None:
-            all_pairs["filter"] = 'spline36'
+            all_pairs["filter"] = self.kernel or 'spline36'
             # todo test downscale_only
             all_pairs["w"] = frame_dimension_spec(
                 iw_or_ih='iw',
@@ -91,7 +107,7 @@ class ZscaleFilter(FilterBase):
         if not all_pairs:
             return ''
 
-        all_pairs['dither'] = 'error_diffusion'
+        all_pairs['dither'] = (self.dither or Dither.ERROR_DIFFUSION).value
 
         return "zscale=" + ":".join(
             lhs + '=' + rhs for (lhs, rhs) in all_pairs.items())
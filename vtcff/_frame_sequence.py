@@ -0,0 +1,183 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Indexing of directories with numbered frame files like img_0001.exr.
+Directories with hundreds of thousands of frames on network storage take
+seconds to list, so each directory is listed once: the result is reused
+until the modification time of the directory changes."""
+
+import hashlib
+import os
+import re
+import stat
+import threading
+from fnmatch import fnmatch
+from typing import NamedTuple, Tuple, Optional, Dict, List
+
+from ._disk_cache import read_cached, write_cached
+
+# the last group of at least two digits in the file name,
+# like framefile does
+_NUMBERED = re.compile(r'^(.*\D)?(\d{2,})(\D*)$')
+
+
+class FrameSequence(NamedTuple):
+    pattern: str
+    """The path with the number replaced by a placeholder for ffmpeg,
+    like '/path/to/img_%04d.exr'."""
+    first: int
+    last: int
+    padding: int
+    frame_count: int
+    """The number of existing frame files."""
+    gaps: Tuple[Tuple[int, int], ...]
+    """The ranges of missing frame numbers, as (first, last) inclusive."""
+    total_bytes: int
+
+    @property
+    def contiguous_count(self) -> int:
+        """The number of frames ffmpeg will read: the image2 demuxer stops
+        at the first missing file."""
+        return self.contiguous_count_from(self.first)
+
+    def contiguous_count_from(self, number: int) -> int:
+        """The number of existing frames from `number` to the next gap.
+        Zero if the frame `number` does not exist."""
+        if not self.first <= number <= self.last:
+            return 0
+        for gap_first, gap_last in self.gaps:
+            if number < gap_first:
+                return gap_first - number
+            if number <= gap_last:
+                return 0
+        return self.last - number + 1
+
+
+class _Group:
+    __slots__ = ('numbers', 'total_bytes')
+
+    def __init__(self):
+        self.numbers: List[int] = []
+        self.total_bytes = 0
+
+
+def _scan(directory: str, name_filter: Optional[str]) \
+        -> Tuple[Optional[FrameSequence], int]:
+    """Returns the most common numbered sequence in the directory and the
+    number of files matching the filter."""
+    groups: Dict[Tuple[str, int, str], _Group] = dict()
+    matched = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if name_filter is not None and not fnmatch(entry.name,
+                                                       name_filter):
+                continue
+            if not entry.is_file():
+                continue
+            matched += 1
+            m = _NUMBERED.match(entry.name)
+            if m is None:
+                continue
+            prefix, digits, suffix = m.group(1) or '', m.group(2), m.group(3)
+            key = (prefix, len(digits), suffix)
+            group = groups.get(key)
+            if group is None:
+                group = _Group()
+                groups[key] = group
+            group.numbers.append(int(digits))
+            group.total_bytes += entry.stat().st_size
+
+    if not groups:
+        return None, matched
+
+    (prefix, padding, suffix), group = max(
+        groups.items(), key=lambda item: len(item[1].numbers))
+    numbers = sorted(group.numbers)
+    gaps = tuple((a + 1, b - 1) for a, b in zip(numbers, numbers[1:])
+                 if b - a > 1)
+    # '%' in file names must be escaped for the image2 demuxer
+    placeholder = f"%0{padding}d"
+    pattern = os.path.join(directory,
+                           prefix.replace('%', '%%') + placeholder +
+                           suffix.replace('%', '%%'))
+    return FrameSequence(pattern=pattern, first=numbers[0], last=numbers[-1],
+                         padding=padding, frame_count=len(numbers),
+                         gaps=gaps, total_bytes=group.total_bytes), matched
+
+
+_cache: Dict[Tuple[str, Optional[str]],
+             Tuple[int, Optional[FrameSequence], int]] = dict()
+_cache_lock = threading.Lock()
+
+# the number of directories with the listings on disk
+_MAX_DISK_ENTRIES = 1000
+
+
+def _scan_cached(directory: str, mtime_ns: int,
+                 name_filter: Optional[str]) \
+        -> Tuple[Optional[FrameSequence], int]:
+    mem_key = (directory, name_filter)
+    with _cache_lock:
+        cached = _cache.get(mem_key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1], cached[2]
+
+    # a single file per directory: it is rewritten when the directory
+    # changes, rather than left behind
+    disk_key = hashlib.sha1(repr((os.path.abspath(directory),
+                                  name_filter)).encode('utf-8')).hexdigest()
+    from_disk = read_cached('frame_sequences', disk_key)
+    if from_disk is not None and from_disk.get('mtime_ns') == mtime_ns:
+        seq = None
+        if from_disk['sequence'] is not None:
+            seq = FrameSequence(*from_disk['sequence'])
+            # JSON has the pairs as lists
+            seq = seq._replace(gaps=tuple((a, b) for a, b in seq.gaps))
+        seq_and_matched = seq, from_disk['matched']
+    else:
+        seq_and_matched = _scan(directory, name_filter)
+        write_cached('frame_sequences', disk_key,
+                     {'mtime_ns': mtime_ns,
+                      'sequence': seq_and_matched[0],
+                      'matched': seq_and_matched[1]},
+                     max_entries=_MAX_DISK_ENTRIES)
+
+    with _cache_lock:
+        _cache[mem_key] = (mtime_ns,) + seq_and_matched
+    return seq_and_matched
+
+
+def frame_sequence(path_or_pattern: str) -> Optional[FrameSequence]:
+    """Returns the frame sequence if the argument is a directory of numbered
+    files, or a glob pattern like '/path/*.exr' matching exactly one
+    sequence without gaps. Otherwise returns None.
+
+    Only the modification time of the directory is checked on repeated
+    calls. Note that it changes when files are added, removed or renamed,
+    but not when the existing files are rewritten."""
+    if '*' in path_or_pattern:
+        directory, name_filter = os.path.split(path_or_pattern)
+        if not directory or '*' in directory:
+            return None
+    else:
+        directory, name_filter = path_or_pattern, None
+
+    try:
+        st = os.stat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+
+    seq, matched = _scan_cached(directory, st.st_mtime_ns, name_filter)
+    if name_filter is not None and seq is not None \
+            and (seq.gaps or seq.frame_count != matched):
+        # the glob would feed ffmpeg with files the sequence does not cover
+        return None
+    return seq
+
+
+def _forget_all() -> None:
+    """Clears the in-memory cache (for tests)."""
+    with _cache_lock:
+        _cache.clear()
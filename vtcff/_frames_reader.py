@@ -0,0 +1,190 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import copy
+import re
+import subprocess
+import threading
+from typing import Optional, Tuple, Iterator, Any, List, IO
+
+from ._command import FfmpegCommand
+from ._frames_writer import _require_numpy
+from ._pf_20_pixfmt_bpc import pixfmt_bpc
+from ._pf_30_array_pixfmt import _packed_pixfmt, pixfmt_array_layout
+from ._progress import _STDERR_TAIL_SIZE
+
+# Output #0, rawvideo, to 'pipe:1':
+#   Stream #0:0: Video: rawvideo (RGB[24] / 0x18424752), rgb24(pc, ...),
+#     1280x720, q=2-31, 663552 kb/s, 30 fps
+_OUTPUT_STREAM = re.compile(
+    r'Stream #0:\d+.*: Video: rawvideo.*?, (\d+)x(\d+)')
+
+
+class _StderrReader(threading.Thread):
+    """Keeps reading stderr, so ffmpeg never blocks on it. Finds the size
+    of the output frames in the header ffmpeg prints before the first
+    frame."""
+
+    def __init__(self, stream):
+        super().__init__(daemon=True)
+        self._stream = stream
+        self.size: Optional[Tuple[int, int]] = None
+        self.size_known = threading.Event()
+        self.tail = b''
+
+    def run(self):
+        output_started = False
+        for line in self._stream:
+            self.tail = (self.tail + line)[-_STDERR_TAIL_SIZE:]
+            if self.size is None:
+                text = line.decode('utf-8', errors='replace')
+                if text.startswith('Output #0'):
+                    output_started = True
+                elif output_started:
+                    m = _OUTPUT_STREAM.search(text)
+                    if m is not None:
+                        self.size = int(m.group(1)), int(m.group(2))
+                        self.size_known.set()
+        self.size_known.set()
+
+
+def _readinto_exactly(stream, view: memoryview) -> int:
+    """Fills the whole view unless the stream ends. Returns the number
+    of bytes read."""
+    total = 0
+    while total < len(view):
+        n = stream.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def rawvideo_pixfmt(bpc: int, channels: int = 3) -> str:
+    """Returns the packed pixel format for reading frames of the bit
+    depth: up to 8 bits are read as uint8, deeper formats as uint16."""
+    result = _packed_pixfmt('u', 8 if bpc <= 8 else 16,
+                            None if bpc <= 8 else 'le', channels)
+    if result is None:
+        raise ValueError(f"No pixel format for {channels} channels")
+    return result
+
+
+def _rawvideo_args(cmd: FfmpegCommand, pixfmt: str,
+                   size_from_log: bool) -> List[str]:
+    cmd = copy.deepcopy(cmd)
+    cmd.dst_file = 'pipe:1'
+    cmd.dst_codec_video = None
+    cmd.dst_codec_audio = None
+    cmd.dst_pixfmt = pixfmt
+    cmd.custom.after_i.list += ['-f', 'rawvideo', '-codec:v', 'rawvideo',
+                                '-an']
+    if size_from_log:
+        # the size will be read from the log, so the log must not be quiet
+        cmd.custom.after_i.list += ['-loglevel',
+                                    'verbose' if cmd.debug else 'info']
+    return list(cmd)
+
+
+class _RawvideoProcess:
+    """ffmpeg writing raw frames to its stdout."""
+
+    def __init__(self, args: List[str]):
+        self.args = args
+        self.proc = subprocess.Popen(args,
+                                     stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE,
+                                     bufsize=0)
+        assert self.proc.stdout is not None
+        self.stdout: IO[bytes] = self.proc.stdout
+        self._stderr = _StderrReader(self.proc.stderr)
+        self._stderr.start()
+
+    def size_from_log(self) -> Optional[Tuple[int, int]]:
+        self._stderr.size_known.wait()
+        return self._stderr.size
+
+    def finish(self) -> None:
+        """Waits for the process to exit. Raises
+        `subprocess.CalledProcessError` if it failed."""
+        return_code = self.proc.wait()
+        self._stderr.join()
+        if return_code != 0:
+            raise subprocess.CalledProcessError(return_code, self.args,
+                                                stderr=self._stderr.tail)
+
+    def close(self) -> None:
+        # we get here early when the caller stops the iteration
+        if self.proc.returncode is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.stdout.close()
+
+
+def iter_frames(cmd: FfmpegCommand,
+                src_pixfmt: Optional[str] = None,
+                bpc: Optional[int] = None,
+                channels: int = 3,
+                size: Optional[Tuple[int, int]] = None,
+                buffers: int = 2) -> Iterator[Any]:
+    """Decodes the source of `cmd` and yields the frames as NumPy arrays
+    of shape (height, width, channels).
+
+    The filters of the command (crop, scale, transpose...) are applied
+    by ffmpeg, so a downscaled frame is all that crosses the pipe.
+    The output file and codecs of `cmd` are ignored.
+
+    The arrays are uint8 for sources up to 8 bits per channel,
+    otherwise uint16. The depth is taken from `bpc`, or from `src_pixfmt`
+    with `pixfmt_bpc`. When neither is given, 8 bits are assumed.
+
+    The `size` (width, height) of the output frames is read from the ffmpeg
+    log, unless specified.
+
+    The frames are read into `buffers` preallocated arrays used in turn:
+    a yielded array is overwritten `buffers` frames later. Copy the arrays
+    that must live longer."""
+    np = _require_numpy()
+    if bpc is None:
+        bpc = pixfmt_bpc(src_pixfmt) if src_pixfmt is not None else 8
+        if bpc is None:
+            raise ValueError(f"Unknown bits per channel of {src_pixfmt}. "
+                             f"Specify bpc")
+    pixfmt = rawvideo_pixfmt(bpc, channels)
+    dtype, _ = pixfmt_array_layout(pixfmt)
+    if buffers < 1:
+        raise ValueError(buffers)
+
+    ffmpeg = _RawvideoProcess(
+        _rawvideo_args(cmd, pixfmt, size_from_log=size is None))
+    read = 0
+    frame_size = 0
+    try:
+        if size is None:
+            size = ffmpeg.size_from_log()
+        if size is not None:
+            width, height = size
+            shape = (height, width, channels)
+            arrays = [np.empty(shape, dtype=dtype) for _ in range(buffers)]
+            views = [memoryview(a).cast('B') for a in arrays]
+            frame_size = len(views[0])
+            idx = 0
+            while True:
+                read = _readinto_exactly(ffmpeg.stdout, views[idx])
+                if read < frame_size:
+                    # zero at the end of the stream. Anything else means
+                    # the frame size was wrong or ffmpeg failed
+                    break
+                yield arrays[idx]
+                idx = (idx + 1) % buffers
+        ffmpeg.finish()
+    finally:
+        ffmpeg.close()
+
+    if size is None:
+        raise ValueError("Cannot find the frame size in the ffmpeg log. "
+                         "Specify the size explicitly")
+    if read != 0:
+        raise ValueError(f"The stream ended with a partial frame "
+                         f"({read} of {frame_size} bytes). Wrong frame size?")
@@ -0,0 +1,244 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Passing the decoded frames to several worker processes through shared
+memory. ffmpeg output is read right into the slots of the ring, and the
+workers get NumPy arrays backed by the same memory, so the frames are not
+copied between the processes."""
+
+import multiprocessing
+import threading
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterator, List, Optional, Tuple
+
+from ._command import FfmpegCommand
+from ._frames_reader import _RawvideoProcess, _rawvideo_args, \
+    _readinto_exactly
+from ._frames_writer import _require_numpy
+from ._pf_30_array_pixfmt import array_pixfmt
+
+# indexes in FrameRing._counters
+_NEXT_READ = 0
+_TOTAL = 1
+
+# the memory of the closed rings whose arrays were still referenced
+_deferred: List[Tuple[SharedMemory, List[weakref.ref]]] = []
+_deferred_lock = threading.Lock()
+
+
+def _closed_if_unused(shm: SharedMemory, refs: List[weakref.ref]) -> bool:
+    """Detaches the memory unless any of the arrays is alive. Returns
+    whether the memory was detached."""
+    if any(r() is not None for r in refs):
+        return False
+    shm.close()
+    return True
+
+
+class FrameRing:
+    """A ring of `slots` frames of the same shape (height, width, channels)
+    in shared memory. One process writes the frames, any number of processes
+    read them.
+
+        ring = FrameRing((1080, 1920, 3), 'uint16')
+        workers = [Process(target=work, args=(ring,)) for _ in range(4)]
+        ...
+        decode_to_ring(cmd, ring)
+
+        def work(ring):
+            for number, frame in ring.frames():
+                analyze(frame)
+            ring.close()
+
+    Each frame is read by exactly one of the readers. A slot is reused
+    after its reader asks for the next frame, and the writer waits while
+    all the slots are in use.
+
+    The ring is passed to the processes as an argument of
+    `multiprocessing.Process`: the semaphores it contains cannot be sent
+    to an already running process."""
+
+    def __init__(self, shape: Tuple[int, int, int], dtype: Any = 'uint8',
+                 slots: int = 8, ctx: Optional[Any] = None):
+        np = _require_numpy()
+        if slots < 1:
+            raise ValueError(slots)
+        if len(shape) != 3:
+            raise ValueError(f"Expected (height, width, channels), "
+                             f"got {shape}")
+        if ctx is None:
+            ctx = multiprocessing.get_context()
+        self.shape: Tuple[int, ...] = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self.frame_nbytes = (shape[0] * shape[1] * shape[2]
+                             * self.dtype.itemsize)
+
+        self._shm = SharedMemory(create=True,
+                                 size=self.frame_nbytes * slots)
+        self._owner = True
+        # a slot is free when its semaphore is set. The count of `_filled`
+        # is the number of frames written and not yet taken by the readers,
+        # plus one when the writing is over
+        self._free = [ctx.Semaphore(1) for _ in range(slots)]
+        self._filled = ctx.Semaphore(0)
+        self._counters = ctx.Array('q', [0, -1])
+        self._written = 0
+        self._ended = False
+        self._arrays: Optional[List[Any]] = None
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block."""
+        return self._shm.name
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_shm']
+        state['_arrays'] = None
+        state['_owner'] = False
+        state['_shm_name'] = self._shm.name
+        return state
+
+    def __setstate__(self, state):
+        name = state.pop('_shm_name')
+        self.__dict__.update(state)
+        self._shm = SharedMemory(name=name)
+
+    # writing #################################################################
+
+    def fill_from(self, stream) -> int:
+        """Reads raw frames from the binary stream right into the slots
+        until the stream ends, then tells the readers there will be no more
+        frames. Returns the number of frames read."""
+        count = 0
+        read = 0
+        buf = self._shm.buf
+        # the buffer is None only after the ring is closed
+        assert buf is not None
+        try:
+            while True:
+                slot = self._written % self.slots
+                self._free[slot].acquire()
+                start = slot * self.frame_nbytes
+                with buf[start:start + self.frame_nbytes] as view:
+                    read = _readinto_exactly(stream, view)
+                if read < self.frame_nbytes:
+                    self._free[slot].release()
+                    break
+                self._written += 1
+                count += 1
+                self._filled.release()
+        finally:
+            self.end_writing()
+        if read != 0:
+            raise ValueError(f"The stream ended with a partial frame "
+                             f"({read} of {self.frame_nbytes} bytes)")
+        return count
+
+    def end_writing(self) -> None:
+        """Tells the readers there will be no more frames."""
+        if self._ended:
+            return
+        self._ended = True
+        with self._counters.get_lock():
+            self._counters[_TOTAL] = self._written
+        self._filled.release()
+
+    # reading #################################################################
+
+    def _slot_arrays(self) -> List[Any]:
+        if self._arrays is None:
+            np = _require_numpy()
+            self._arrays = [
+                np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf,
+                           offset=slot * self.frame_nbytes)
+                for slot in range(self.slots)]
+        return self._arrays
+
+    def frames(self) -> Iterator[Tuple[int, Any]]:
+        """Yields (frame number, array) until the writing is over.
+
+        The array is the slot itself, not a copy. It is valid until the
+        next iteration: then the slot is given back to the writer."""
+        arrays = self._slot_arrays()
+        counters = self._counters
+        while True:
+            self._filled.acquire()
+            with counters.get_lock():
+                number = counters[_NEXT_READ]
+                total = counters[_TOTAL]
+                over = 0 <= total <= number
+                if not over:
+                    counters[_NEXT_READ] = number + 1
+            if over:
+                # passing the end mark on to the other readers
+                self._filled.release()
+                return
+            slot = number % self.slots
+            try:
+                yield number, arrays[slot]
+            finally:
+                self._free[slot].release()
+
+    # cleanup #################################################################
+
+    def close(self) -> None:
+        """Detaches this process from the shared memory.
+
+        The arrays yielded by `frames` point right into the memory. If some
+        of them are still referenced (like the loop variable after the last
+        frame), the memory is not unmapped under them: it is detached by
+        a later `close` of any ring after the arrays are gone, or when
+        the process exits."""
+        arrays, self._arrays = self._arrays, None
+        refs = [weakref.ref(a) for a in arrays or ()]
+        del arrays
+        with _deferred_lock:
+            _deferred.append((self._shm, refs))
+            _deferred[:] = [(shm, refs) for shm, refs in _deferred
+                            if not _closed_if_unused(shm, refs)]
+
+    def unlink(self) -> None:
+        """Frees the shared memory. Only the process that created the ring
+        does this, after the other processes have closed it."""
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'FrameRing':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        self.unlink()
+
+
+def decode_to_ring(cmd: FfmpegCommand, ring: FrameRing) -> int:
+    """Decodes the source of `cmd` into the ring. The filters of the command
+    must produce frames of the ring shape. The depth of the frames follows
+    the dtype of the ring: uint8 or uint16.
+
+    Returns the number of frames after the readers are told there will be
+    no more of them. Raises `subprocess.CalledProcessError` if ffmpeg
+    failed."""
+    height, width, channels = ring.shape
+    try:
+        pixfmt = array_pixfmt(ring.dtype, channels)
+        ffmpeg = _RawvideoProcess(_rawvideo_args(cmd, pixfmt,
+                                                 size_from_log=True))
+    except BaseException:
+        # the readers must not wait for the frames forever
+        ring.end_writing()
+        raise
+    try:
+        size = ffmpeg.size_from_log()
+        if size is not None and size != (width, height):
+            raise ValueError(f"The frames are {size[0]}x{size[1]}, "
+                             f"the ring is for {width}x{height}")
+        count = ring.fill_from(ffmpeg.stdout)
+        ffmpeg.finish()
+    finally:
+        ring.end_writing()
+        ffmpeg.close()
+    return count
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import copy
+import subprocess
+import tempfile
+from typing import Optional, List, Any, Tuple, IO
+
+from ._command import FfmpegCommand
+from ._pf_30_array_pixfmt import array_pixfmt
+from ._progress import _STDERR_TAIL_SIZE
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("NumPy is required for reading and writing "
+                          "frames as arrays: pip install vtcff[numpy]") from e
+    return numpy
+
+
+def _read_file_tail(f) -> bytes:
+    f.seek(0, 2)
+    f.seek(max(0, f.tell() - _STDERR_TAIL_SIZE))
+    return f.read()
+
+
+class FramesWriter:
+    """Pipes NumPy arrays of shape (height, width, channels) to ffmpeg
+    as raw video frames.
+
+        with FramesWriter(cmd, width=1920, height=1080,
+                          dtype='uint16', fps=25) as writer:
+            for frame in frames:
+                writer.write(frame)
+
+    The `cmd` defines the output. It is not modified: the writer uses a copy
+    with the input replaced by the pipe.
+
+    The arrays are written without copying (unless they are not
+    C-contiguous). `write` blocks while the pipe is full, so a slow encoder
+    slows down the producer instead of accumulating frames in memory."""
+
+    def __init__(self, cmd: FfmpegCommand,
+                 width: int, height: int,
+                 dtype: Any = 'uint8',
+                 channels: int = 3,
+                 fps: float = 25):
+        np = _require_numpy()
+        self.dtype = np.dtype(dtype)
+        self.shape: Tuple[int, ...] = (height, width, channels)
+        self.pixfmt = array_pixfmt(self.dtype, channels)
+        """The pixel format matching the memory layout of the arrays,
+        like 'rgb48le'."""
+
+        cmd = copy.deepcopy(cmd)
+        cmd.src_file = 'pipe:0'
+        cmd.src_fps = fps
+        cmd.custom.before_i.list = [
+            '-f', 'rawvideo',
+            '-pix_fmt', self.pixfmt,
+            '-s', f'{width}x{height}'] + cmd.custom.before_i.list
+        self.args: List[str] = list(cmd)
+
+        self.frames_written = 0
+        self._proc: Optional[subprocess.Popen] = None
+        self._stderr: Optional[IO[bytes]] = None
+
+    def open(self) -> None:
+        # stderr goes to a file: nobody reads it while the frames are
+        # being written, and a full stderr pipe would block ffmpeg
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(self.args,
+                                      stdin=subprocess.PIPE,
+                                      stdout=subprocess.DEVNULL,
+                                      stderr=self._stderr,
+                                      # unbuffered: the bytes go from
+                                      # the array right to the pipe
+                                      bufsize=0)
+
+    def write(self, frame: Any) -> None:
+        if self._proc is None:
+            raise RuntimeError("The writer is not open")
+        if frame.dtype != self.dtype:
+            raise ValueError(f"Expected {self.dtype}, got {frame.dtype}")
+        if frame.shape != self.shape and not (
+                self.shape[2] == 1 and frame.shape == self.shape[:2]):
+            raise ValueError(f"Expected shape {self.shape}, "
+                             f"got {frame.shape}")
+        if not frame.flags.c_contiguous:
+            frame = _require_numpy().ascontiguousarray(frame)
+
+        view = memoryview(frame).cast('B')
+        stdin = self._proc.stdin
+        assert stdin is not None
+        try:
+            # a raw pipe may accept only a part of the data
+            while view:
+                written = stdin.write(view)
+                view = view[written:]
+        except BrokenPipeError:
+            # ffmpeg exited. The reason is in its stderr
+            self.close()
+            raise
+        self.frames_written += 1
+
+    def close(self) -> None:
+        """Waits for ffmpeg to finish encoding. Raises
+        `subprocess.CalledProcessError` if it failed."""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        stderr, self._stderr = self._stderr, None
+        assert stderr is not None
+        try:
+            assert proc.stdin is not None
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            return_code = proc.wait()
+            if return_code != 0:
+                raise subprocess.CalledProcessError(
+                    return_code, self.args,
+                    stderr=_read_file_tail(stderr))
+        finally:
+            stderr.close()
+
+    def _abort(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        proc.kill()
+        proc.wait()
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def __enter__(self) -> 'FramesWriter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
@@ -0,0 +1,274 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Ordering the geometry filters (crop, scale, transpose, pad) so that each
+of them processes as few pixels as possible.
+
+Two adjacent filters are swapped only if the swapped pair, with its
+arguments translated, computes each output pixel from the same source
+pixels with the same weights. Moving a scaler across a transpose only
+changes the order of its horizontal and vertical passes.
+
+A crop or a pad moved across a resampling kernel would change the pixels
+near its edges: the kernel would see other neighbours. So crops and pads
+only cross the scalers with the point kernel, when the scaling factors map
+them to whole pixels, and the offsets and sizes are even, as the subsampled
+chroma requires."""
+
+from typing import NamedTuple, Optional, Tuple, Any, Sequence, List, Union
+
+from ._common import Scale
+from ._compiled_command import untracked_copy
+from ._filter_crop import Crop
+from ._filter_normalize import Size, size_after
+from ._filter_pad import Pad
+from ._filter_swscale import SwscaleFilter
+from ._filter_transpose import TransposeFilter, Transpose
+from ._filter_zscale import ZscaleFilter
+
+_Scaler = Union[ZscaleFilter, SwscaleFilter]
+
+
+class GeometryPlan(NamedTuple):
+    filters: Tuple[Any, ...]
+    pixels_per_frame: Optional[int]
+    """The estimated number of pixels the filters process for each frame,
+    or None if the sizes of the frames cannot be computed."""
+    unplanned_pixels_per_frame: Optional[int]
+    """The same estimate for the filters in the original order."""
+
+
+def _is_scaler(f: Any) -> bool:
+    return isinstance(f, (ZscaleFilter, SwscaleFilter))
+
+
+def _scaling(f: _Scaler) -> Optional[Scale]:
+    if isinstance(f, ZscaleFilter):
+        return f.scaling
+    if f.width is None or f.height is None:
+        return None
+    return Scale(f.width, f.height, f.downscale_only)
+
+
+def _point_kernel(f: _Scaler) -> bool:
+    """Whether each output pixel is copied from a single input pixel,
+    including the chroma ones. The kernel of swscale is set by the flags
+    of the whole command, so it is not known here."""
+    return isinstance(f, ZscaleFilter) and f.kernel == 'point'
+
+
+def _with_scaling(f: _Scaler, scale: Scale) -> _Scaler:
+    if isinstance(f, ZscaleFilter):
+        return untracked_copy(f, scaling=scale)
+    return untracked_copy(f, width=scale.width, height=scale.height,
+                          downscale_only=scale.downscale_only)
+
+
+def _converts_colors(f: _Scaler) -> bool:
+    return bool(f._pairs)
+
+
+def _area(size: Size) -> int:
+    return size[0] * size[1]
+
+
+def _stage_pixels(f: Any, size_in: Size, size_out: Size) -> int:
+    if isinstance(f, Crop):
+        # ffmpeg crops by moving the pointers to the planes,
+        # without touching the pixels
+        return 0
+    if isinstance(f, Pad):
+        return _area(size_out)
+    if _is_scaler(f):
+        return max(_area(size_in), _area(size_out))
+    return _area(size_in)
+
+
+def pixels_per_frame(filters: Sequence[Any], src_size: Size) \
+        -> Optional[int]:
+    """Estimates the number of pixels the filters process for each frame:
+    the input of a transpose, the larger of the input and output of
+    a scaler, the output of a pad. Crops are free.
+
+    Returns None if the size of the frames gets unknown somewhere
+    in the chain."""
+    total = 0
+    size: Optional[Size] = src_size
+    for f in filters:
+        assert size is not None
+        size_out = size_after(f, size)
+        if size_out is None:
+            return None
+        total += _stage_pixels(f, size, size_out)
+        size = size_out
+    return total
+
+
+def _exact_div(value: int, num: int, den: int) -> Optional[int]:
+    if (value * num) % den:
+        return None
+    return value * num // den
+
+
+def _crop_before_transpose(kind: Transpose, crop: Crop, size: Size) -> Crop:
+    # `size` is the frame before the transpose. The crop is in the
+    # transposed frame
+    w, h = size
+    x, y, cw, ch = crop.left, crop.top, crop.width, crop.height
+    if kind == Transpose.COUNTER_CLOCKWISE_VFLIP:
+        return Crop(y, x, ch, cw)
+    if kind == Transpose.CLOCKWISE:
+        return Crop(y, h - x - cw, ch, cw)
+    if kind == Transpose.COUNTER_CLOCKWISE:
+        return Crop(w - y - ch, x, ch, cw)
+    assert kind == Transpose.CLOCKWISE_VFLIP
+    return Crop(w - y - ch, h - x - cw, ch, cw)
+
+
+_PadValues = Tuple[int, int, int, int]
+
+
+def _pad_values(pad: Pad) -> Optional[_PadValues]:
+    """The left, top, width and height of the pad, if they are numbers
+    rather than expressions."""
+    left, top, width, height = pad.left, pad.top, pad.width, pad.height
+    if isinstance(left, int) and isinstance(top, int) \
+            and isinstance(width, int) and isinstance(height, int):
+        return left, top, width, height
+    return None
+
+
+def _pad_after_transpose(kind: Transpose, pad: Pad, values: _PadValues,
+                         size: Size) -> Pad:
+    # `size` is the frame before the pad
+    w, h = size
+    x, y, pw, ph = values
+    if kind == Transpose.COUNTER_CLOCKWISE_VFLIP:
+        left, top = y, x
+    elif kind == Transpose.CLOCKWISE:
+        left, top = ph - y - h, x
+    elif kind == Transpose.COUNTER_CLOCKWISE:
+        left, top = y, pw - x - w
+    else:
+        assert kind == Transpose.CLOCKWISE_VFLIP
+        left, top = ph - y - h, pw - x - w
+    return Pad(left=left, top=top, width=ph, height=pw, color=pad.color)
+
+
+def _even(*values: Optional[int]) -> bool:
+    # odd sizes and offsets of the picture would be rounded
+    # for the subsampled chroma
+    return all(v is not None and v % 2 == 0 for v in values)
+
+
+def _crop_before_scaler(scaler: _Scaler, crop: Crop, size: Size) \
+        -> Optional[Tuple[Crop, _Scaler]]:
+    scaled = size_after(scaler, size)
+    if scaled is None:
+        return None
+    (w, h), (sw, sh) = size, scaled
+    left, top = _exact_div(crop.left, w, sw), _exact_div(crop.top, h, sh)
+    width = _exact_div(crop.width, w, sw)
+    height = _exact_div(crop.height, h, sh)
+    if left is None or top is None or width is None or height is None \
+            or not _even(crop.left, crop.top, crop.width, crop.height,
+                         left, top, width, height):
+        return None
+    return (Crop(left, top, width, height),
+            _with_scaling(scaler, Scale(crop.width, crop.height)))
+
+
+def _pad_after_scaler(pad: Pad, scaler: _Scaler, size: Size) \
+        -> Optional[Tuple[_Scaler, Pad]]:
+    values = _pad_values(pad)
+    if values is None:
+        return None
+    pad_left, pad_top, pad_width, pad_height = values
+    scaled = size_after(scaler, (pad_width, pad_height))
+    if scaled is None:
+        return None
+    (w, h), (sw, sh) = size, scaled
+    new_w, new_h = _exact_div(w, sw, pad_width), \
+        _exact_div(h, sh, pad_height)
+    left, top = _exact_div(pad_left, sw, pad_width), \
+        _exact_div(pad_top, sh, pad_height)
+    if new_w is None or new_h is None or left is None or top is None \
+            or not _even(pad_left, pad_top, pad_width, pad_height,
+                         new_w, new_h, left, top):
+        return None
+    return (_with_scaling(scaler, Scale(new_w, new_h)),
+            Pad(left=left, top=top, width=sw, height=sh, color=pad.color))
+
+
+def _swapped(a: Any, b: Any, size: Size) -> Optional[Tuple[Any, Any]]:
+    """Returns the filters that give the same frames as `a` followed
+    by `b`, but in the opposite order. Returns None if there are no such
+    filters. The `size` is the size of the frames before `a`."""
+
+    if isinstance(a, TransposeFilter) and isinstance(b, Crop):
+        return _crop_before_transpose(a.kind, b, size), a
+
+    if isinstance(a, TransposeFilter) and _is_scaler(b) \
+            or _is_scaler(a) and isinstance(b, TransposeFilter):
+        transpose, scaler = (a, b) if isinstance(a, TransposeFilter) \
+            else (b, a)
+        scale = _scaling(scaler)
+        if scale is not None:
+            scaler = _with_scaling(scaler, Scale(scale.height, scale.width,
+                                                 scale.downscale_only))
+        return (scaler, transpose) if transpose is a else (transpose, scaler)
+
+    if isinstance(a, Pad) and isinstance(b, TransposeFilter):
+        values = _pad_values(a)
+        if values is None:
+            return None
+        return b, _pad_after_transpose(b.kind, a, values, size)
+
+    if _is_scaler(a) and isinstance(b, Crop) and _point_kernel(a):
+        return _crop_before_scaler(a, b, size)
+
+    if isinstance(a, Pad) and _is_scaler(b) and _point_kernel(b) \
+            and not _converts_colors(b):
+        # the black is defined in the color space of the pad, so a pad
+        # is not moved across a color conversion
+        return _pad_after_scaler(a, b, size)
+
+    return None
+
+
+def plan_geometry(filters: Sequence[Any], src_size: Size) -> GeometryPlan:
+    """Reorders the filters so that they process fewer pixels, without
+    changing the geometry of the result.
+
+    Typically a crop moves to the start, downscaling before transposing
+    and padding, and padding to the end."""
+    current: List[Any] = list(filters)
+    original = pixels_per_frame(current, src_size)
+    if original is None:
+        return GeometryPlan(tuple(current), None, None)
+
+    def final_size(chain: Sequence[Any]) -> Optional[Size]:
+        size: Optional[Size] = src_size
+        for f in chain:
+            size = size_after(f, size)
+        return size
+
+    result_size = final_size(current)
+    best = original
+    improved = True
+    while improved:
+        # each accepted swap reduces the integer cost, so the loop ends
+        improved = False
+        size: Optional[Size] = src_size
+        for idx in range(len(current) - 1):
+            assert size is not None
+            pair = _swapped(current[idx], current[idx + 1], size)
+            if pair is not None:
+                candidate = current[:idx] + list(pair) + current[idx + 2:]
+                cost = pixels_per_frame(candidate, src_size)
+                if cost is not None and cost < best \
+                        and final_size(candidate) == result_size:
+                    current, best, improved = candidate, cost, True
+                    break
+            size = size_after(current[idx], size)
+    return GeometryPlan(tuple(current), best, original)
@@ -0,0 +1,45 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+from typing import Iterable, Tuple, Callable, List, Union
+
+from ._codec import Codec
+from ._codec_avc import Avc
+from ._command import FfmpegCommand
+from ._common import Scale
+from ._rendition import Rendition
+
+
+def add_ladder(cmd: FfmpegCommand,
+               rungs: Iterable[Tuple[int, float]],
+               dst_file: Union[Path, str],
+               codec: Callable[..., Codec] = Avc,
+               dst_pixfmt: str = 'yuv420p') -> List[Rendition]:
+    """Adds a rendition to the command for each (height, mbps) rung of
+    an adaptive bitrate ladder. Returns the renditions from the highest
+    to the lowest.
+
+    The `dst_file` is formatted with the `height` and `mbps` of each rung,
+    like 'out_{height}p.mp4'. The `codec` is called with the `mbps` keyword
+    argument: `Avc`, `Hevc` or something like
+    `functools.partial(Hevc, preset=VcPreset.N5_FAST)`.
+
+    The source is decoded and color-converted once. The highest rung is
+    scaled from the source, and each next rung from the previous one, so
+    the scaler of a small rung does not process the full-size frames."""
+    rungs = sorted(rungs, key=lambda rung: rung[0], reverse=True)
+    if len({height for height, _ in rungs}) != len(rungs):
+        raise ValueError("Rung heights must be unique")
+    result: List[Rendition] = []
+    for height, mbps in rungs:
+        rendition = Rendition(
+            dst_file=str(dst_file).format(height=height, mbps=mbps),
+            dst_codec_video=codec(mbps=mbps),
+            # the width is computed proportionally and rounded
+            # to an even number
+            scale=Scale(-2, height),
+            dst_pixfmt=dst_pixfmt,
+            scale_from=result[-1] if result else None)
+        result.append(cmd.add_rendition(rendition))
+    return result
@@ -1,7 +1,10 @@
 # SPDX-FileCopyrightText: (c) 2016-2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 
-from typing import Tuple
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd
+from typing import Tuple, Sequence, List
 
 from vtcff._filter_crop import Crop
 from ._command import FfmpegCommand, Scale
@@ -32,21 +35,35 @@ def crop_height(width, aspect: Tuple[int, int], div=1):
     # Поэтому мы подбираем не только высоту, но и ширину уменьшаем до тех пор,
     # пока на найдем пару WxH, соответствующую требованиям.
 
-    aspect_f = aspect[0] / aspect[1]
-
-    for w in range(width, 0, -1):
-
-        if w % div != 0:
-            continue
+    # Пары вида (k*p, k*q), где p/q - несократимая дробь aspect, подходят
+    # точно. Обе стороны делятся на div, если k кратно
+    #   lcm(div/gcd(div,p), div/gcd(div,q))
+    # Наибольшая такая пара - нижняя граница ответа. Выше нее могут быть
+    # только пары, пропорции которых совпадают с aspect после округления.
+    # Их перебираем по высоте с шагом div: ширина однозначно определяется
+    # высотой, и перебор не зависит от размера кадра.
 
-        h = int(round(w / aspect_f))
-
-        if h % div != 0:
-            continue
+    aspect_f = aspect[0] / aspect[1]
 
-        if round(h * aspect_f) == w:
+    if isinstance(aspect[0], int) and isinstance(aspect[1], int):
+        g = gcd(aspect[0], aspect[1])
+        p, q = aspect[0] // g, aspect[1] // g
+    else:
+        ratio = Fraction(aspect[0]) / Fraction(aspect[1])
+        p, q = ratio.numerator, ratio.denominator
+    k_div_w, k_div_h = div // gcd(div, p), div // gcd(div, q)
+    step = k_div_w * k_div_h // gcd(k_div_w, k_div_h)
+    k = width // p // step * step
+
+    h = int(round(width / aspect_f)) // div * div
+    while h > k * q:
+        w = int(round(h * aspect_f))
+        if 0 < w <= width and w % div == 0 and int(round(w / aspect_f)) == h:
             return w, h
+        h -= div
 
+    if k > 0:
+        return k * p, k * q
     return None, None
 
 
@@ -175,15 +192,38 @@ def whwh_to_xywh(sourceWidth, sourceHeight,
     return cropLeft, cropTop, croppedWidth, croppedHeight
 
 
-def crop_and_scale(cmd: FfmpegCommand,
-                   src_width, src_height,
-                   dst_width, dst_height,
-                   align_x="M", align_y="M"):
+@lru_cache(maxsize=4096)
+def _crop_rect(src_width, src_height, dst_width, dst_height,
+               align_x, align_y) -> Crop:
     x, y, w, h = whwh_to_xywh(sourceWidth=src_width,
                               sourceHeight=src_height,
                               targetWidth=dst_width,
                               targetHeight=dst_height, alignX=align_x,
                               alignY=align_y)
-    cmd.crop = Crop(left=x, top=y, width=w, height=h)
+    return Crop(left=x, top=y, width=w, height=h)
+
+
+def crop_and_scale_many(src_sizes: Sequence[Tuple[int, int]],
+                        dst_sizes: Sequence[Tuple[int, int]],
+                        align_x="M", align_y="M") -> List[Crop]:
+    """Returns the crop rectangles `crop_and_scale` would set for each
+    pair of source and target sizes (the sequences must have the same
+    length).
+
+    Libraries of clips usually contain few distinct resolutions,
+    so each distinct pair is computed only once."""
+    if len(src_sizes) != len(dst_sizes):
+        raise ValueError("The number of source and target sizes differ")
+    return [_crop_rect(sw, sh, dw, dh, align_x, align_y)
+            for (sw, sh), (dw, dh) in zip(src_sizes, dst_sizes)]
+
+
+def crop_and_scale(cmd: FfmpegCommand,
+                   src_width, src_height,
+                   dst_width, dst_height,
+                   align_x="M", align_y="M"):
+    cmd.crop = _crop_rect(src_width, src_height, dst_width, dst_height,
+                          align_x, align_y)
     cmd.scale = Scale(-2, dst_height)
     cmd._crop_before_scale()
+    cmd.src_width, cmd.src_height = src_width, src_height
@@ -2,47 +2,66 @@
 # SPDX-License-Identifier: MIT
 
 
+from typing import Optional, Tuple
+
 from ._command import FfmpegCommand, Scale
 from ._filter_pad import Pad
+from ._filter_swscale import SwscaleFilter
+from ._filter_zscale import ZscaleFilter
+from ._pf_15_pixfmt_subsampling import pixfmt_subsampling
+
+
+def _chroma_alignment(pixfmt: Optional[str]) -> Tuple[int, int]:
+    """The horizontal and vertical steps of the chroma samples.
+    For unknown formats assumes 4:2:0."""
+    subsampling = pixfmt_subsampling(pixfmt) if pixfmt else None
+    if subsampling is None:
+        return 2, 2
+    align_x = {'444': 1, '440': 1, '422': 2, '420': 2, '411': 4,
+               '410': 4}.get(subsampling, 2)
+    align_y = 2 if subsampling in ('420', '440', '410') else 1
+    return align_x, align_y
+
+
+def _aligned(value: float, align: int, limit: int) -> int:
+    return min(limit, max(align, int(round(value / align)) * align))
 
 
 class LetterboxSizes:
+    """Fitting the source into the target frame without changing its
+    aspect ratio: the picture is scaled to `picture_width` x `picture_height`,
+    then padded with bars to the target size.
+
+    All the sizes are in the pixels of the target. The picture size and the
+    offsets are multiples of `align_x` and `align_y`, so the bars begin
+    on whole chroma samples."""
+
     def __init__(self,
                  src_width: int, src_height: int,
-                 dst_width: int, dst_height: int):
-
-        src_aspect = src_width / src_height
-        dst_aspect = dst_width / dst_height
-
-        needSourceWidth = int(round(dst_aspect * src_height))
-        # если бы ширина исходника была равна этому значению,
-        # а высота неизменна, то в обоих файлах соотношение сторон было
-        # бы одинаковым
-
-        self.pad_left = 0
-        self.pad_right = 0
-        self.pad_top = 0
-        self.pad_bottom = 0
-
-        if needSourceWidth != src_width:
-            # придется добавлять полосы
-            if src_aspect > dst_aspect:
-                # исходник шире, чем результат
-                # нужно добавить к исходнику полосы сверху и снизу
-                need_source_height = src_width / dst_aspect
-                assert need_source_height > src_height
-                padding_total = need_source_height - src_height
-                padding_half = int(round(padding_total / 2))
-                self.pad_top = padding_half
-                self.pad_bottom = int(round(padding_total - padding_half))
-            else:
-                # исходник уже, чем результат
-                # нужно добавить к исходнику полосы слева и справа
-                assert needSourceWidth > src_width
-                padding_total = needSourceWidth - src_width
-                padding_half = int(round(padding_total / 2))
-                self.pad_left = padding_half
-                self.pad_right = padding_total - padding_half
+                 dst_width: int, dst_height: int,
+                 align_x: int = 2, align_y: int = 2):
+
+        # comparing the aspect ratios without the float rounding
+        src_cross, dst_cross = src_width * dst_height, dst_width * src_height
+
+        self.picture_width = dst_width
+        self.picture_height = dst_height
+
+        if src_cross > dst_cross:
+            # исходник шире, чем результат: полосы сверху и снизу
+            self.picture_height = _aligned(
+                dst_width * src_height / src_width, align_y, dst_height)
+        elif src_cross < dst_cross:
+            # исходник уже, чем результат: полосы слева и справа
+            self.picture_width = _aligned(
+                dst_height * src_width / src_height, align_x, dst_width)
+
+        self.pad_left = (dst_width - self.picture_width) // 2 \
+            // align_x * align_x
+        self.pad_right = dst_width - self.picture_width - self.pad_left
+        self.pad_top = (dst_height - self.picture_height) // 2 \
+            // align_y * align_y
+        self.pad_bottom = dst_height - self.picture_height - self.pad_top
 
 
 def pad_lrtb_to_lrwh(pad_left=0, pad_right=0, pad_top=0, pad_bottom=0):
@@ -74,13 +93,19 @@ def pad_lrtb_to_lrwh(pad_left=0, pad_right=0, pad_top=0, pad_bottom=0):
 def _letterbox(cmd: FfmpegCommand,
                src_width: int, src_height: int,
                dst_width: int, dst_height: int):
-    """Marked private because not tested."""
-    # todo test
+    """Scales the source to fit the target size, then pads it with black
+    bars to exactly the target size.
+
+    The bars are added after the scaling, so the scaler processes only the
+    picture. They are aligned to the chroma samples of `cmd.dst_pixfmt`."""
+    align_x, align_y = _chroma_alignment(cmd.dst_pixfmt)
     sizes = LetterboxSizes(src_width=src_width, src_height=src_height,
-                           dst_width=dst_width, dst_height=dst_height)
-    l, t, w, h = pad_lrtb_to_lrwh(pad_left=sizes.pad_left,
-                                  pad_right=sizes.pad_right,
-                                  pad_top=sizes.pad_top,
-                                  pad_bottom=sizes.pad_bottom)
-    cmd._pad = Pad(left=l, top=t, width=w, height=h)
-    cmd.scale = Scale(-2, dst_height)
+                           dst_width=dst_width, dst_height=dst_height,
+                           align_x=align_x, align_y=align_y)
+    cmd.scale = Scale(sizes.picture_width, sizes.picture_height)
+    cmd._pad = Pad(left=sizes.pad_left, top=sizes.pad_top,
+                   width=dst_width, height=dst_height)
+    cmd._place_a_before_b(
+        type_a=ZscaleFilter if cmd.use_zscale else SwscaleFilter,
+        type_b=Pad)
+    cmd.src_width, cmd.src_height = src_width, src_height
@@ -0,0 +1,289 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""
+A static table of the pixel formats known to ffmpeg. It allows answering
+questions about pixel formats without running `ffmpeg -pix_fmts`.
+
+The table was built from the output of `ffmpeg -pix_fmts`. The values
+that cannot be reliably derived from that output (bits per channel of
+semi-planar and packed formats, subsampling of "nv" formats and so on)
+were filled in by hand according to libavutil/pixdesc.c.
+"""
+
+from typing import NamedTuple, Optional, Dict, FrozenSet, List, Any, Tuple
+
+PIXFMT_TABLE_VERSION = "ffmpeg-4.4"
+"""The ffmpeg version the table corresponds to. Pixel formats added
+in later versions are not in the table."""
+
+
+class PixfmtInfo(NamedTuple):
+    name: str
+    components: int
+    bits_per_pixel: int
+    bpc: Optional[int]
+    """Maximum number of bits per color channel. None for hardware
+    formats."""
+    subsampling: Optional[str]
+    """Chroma subsampling like '422'. RGB formats are '444'. None for
+    formats without chroma (gray, bayer, palette, hardware)."""
+    alpha: bool
+    planar: bool
+    """The components are stored in more than one plane (this includes
+    semi-planar formats like nv12)."""
+    endian: Optional[str]
+    """'le' or 'be' for formats with multi-byte components that have
+    a fixed byte order, otherwise None."""
+
+
+_TABLE: Tuple[PixfmtInfo, ...] = (
+    PixfmtInfo('yuv420p', 3, 12, 8, '420', False, True, None),
+    PixfmtInfo('yuyv422', 3, 16, 8, '422', False, False, None),
+    PixfmtInfo('rgb24', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('bgr24', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('yuv422p', 3, 16, 8, '422', False, True, None),
+    PixfmtInfo('yuv444p', 3, 24, 8, '444', False, True, None),
+    PixfmtInfo('yuv410p', 3, 9, 8, '410', False, True, None),
+    PixfmtInfo('yuv411p', 3, 12, 8, '411', False, True, None),
+    PixfmtInfo('gray', 1, 8, 8, None, False, False, None),
+    PixfmtInfo('monow', 1, 1, 1, None, False, False, None),
+    PixfmtInfo('monob', 1, 1, 1, None, False, False, None),
+    PixfmtInfo('pal8', 1, 8, 8, None, False, False, None),
+    PixfmtInfo('yuvj420p', 3, 12, 8, '420', False, True, None),
+    PixfmtInfo('yuvj422p', 3, 16, 8, '422', False, True, None),
+    PixfmtInfo('yuvj444p', 3, 24, 8, '444', False, True, None),
+    PixfmtInfo('uyvy422', 3, 16, 8, '422', False, False, None),
+    PixfmtInfo('uyyvyy411', 3, 12, 8, '411', False, False, None),
+    PixfmtInfo('bgr8', 3, 8, 3, '444', False, False, None),
+    PixfmtInfo('bgr4', 3, 4, 2, '444', False, False, None),
+    PixfmtInfo('bgr4_byte', 3, 4, 2, '444', False, False, None),
+    PixfmtInfo('rgb8', 3, 8, 3, '444', False, False, None),
+    PixfmtInfo('rgb4', 3, 4, 2, '444', False, False, None),
+    PixfmtInfo('rgb4_byte', 3, 4, 2, '444', False, False, None),
+    PixfmtInfo('nv12', 3, 12, 8, '420', False, True, None),
+    PixfmtInfo('nv21', 3, 12, 8, '420', False, True, None),
+    PixfmtInfo('argb', 4, 32, 8, '444', True, False, None),
+    PixfmtInfo('rgba', 4, 32, 8, '444', True, False, None),
+    PixfmtInfo('abgr', 4, 32, 8, '444', True, False, None),
+    PixfmtInfo('bgra', 4, 32, 8, '444', True, False, None),
+    PixfmtInfo('gray16be', 1, 16, 16, None, False, False, 'be'),
+    PixfmtInfo('gray16le', 1, 16, 16, None, False, False, 'le'),
+    PixfmtInfo('yuv440p', 3, 16, 8, '440', False, True, None),
+    PixfmtInfo('yuvj440p', 3, 16, 8, '440', False, True, None),
+    PixfmtInfo('yuva420p', 4, 20, 8, '420', True, True, None),
+    PixfmtInfo('rgb48be', 3, 48, 16, '444', False, False, 'be'),
+    PixfmtInfo('rgb48le', 3, 48, 16, '444', False, False, 'le'),
+    PixfmtInfo('rgb565be', 3, 16, 6, '444', False, False, 'be'),
+    PixfmtInfo('rgb565le', 3, 16, 6, '444', False, False, 'le'),
+    PixfmtInfo('rgb555be', 3, 15, 5, '444', False, False, 'be'),
+    PixfmtInfo('rgb555le', 3, 15, 5, '444', False, False, 'le'),
+    PixfmtInfo('bgr565be', 3, 16, 6, '444', False, False, 'be'),
+    PixfmtInfo('bgr565le', 3, 16, 6, '444', False, False, 'le'),
+    PixfmtInfo('bgr555be', 3, 15, 5, '444', False, False, 'be'),
+    PixfmtInfo('bgr555le', 3, 15, 5, '444', False, False, 'le'),
+    PixfmtInfo('vaapi_moco', 0, 0, None, None, False, False, None),
+    PixfmtInfo('vaapi_idct', 0, 0, None, None, False, False, None),
+    PixfmtInfo('vaapi_vld', 0, 0, None, None, False, False, None),
+    PixfmtInfo('yuv420p16le', 3, 24, 16, '420', False, True, 'le'),
+    PixfmtInfo('yuv420p16be', 3, 24, 16, '420', False, True, 'be'),
+    PixfmtInfo('yuv422p16le', 3, 32, 16, '422', False, True, 'le'),
+    PixfmtInfo('yuv422p16be', 3, 32, 16, '422', False, True, 'be'),
+    PixfmtInfo('yuv444p16le', 3, 48, 16, '444', False, True, 'le'),
+    PixfmtInfo('yuv444p16be', 3, 48, 16, '444', False, True, 'be'),
+    PixfmtInfo('dxva2_vld', 0, 0, None, None, False, False, None),
+    PixfmtInfo('rgb444le', 3, 12, 4, '444', False, False, 'le'),
+    PixfmtInfo('rgb444be', 3, 12, 4, '444', False, False, 'be'),
+    PixfmtInfo('bgr444le', 3, 12, 4, '444', False, False, 'le'),
+    PixfmtInfo('bgr444be', 3, 12, 4, '444', False, False, 'be'),
+    PixfmtInfo('ya8', 2, 16, 8, None, True, False, None),
+    PixfmtInfo('bgr48be', 3, 48, 16, '444', False, False, 'be'),
+    PixfmtInfo('bgr48le', 3, 48, 16, '444', False, False, 'le'),
+    PixfmtInfo('yuv420p9be', 3, 13, 9, '420', False, True, 'be'),
+    PixfmtInfo('yuv420p9le', 3, 13, 9, '420', False, True, 'le'),
+    PixfmtInfo('yuv420p10be', 3, 15, 10, '420', False, True, 'be'),
+    PixfmtInfo('yuv420p10le', 3, 15, 10, '420', False, True, 'le'),
+    PixfmtInfo('yuv422p10be', 3, 20, 10, '422', False, True, 'be'),
+    PixfmtInfo('yuv422p10le', 3, 20, 10, '422', False, True, 'le'),
+    PixfmtInfo('yuv444p9be', 3, 27, 9, '444', False, True, 'be'),
+    PixfmtInfo('yuv444p9le', 3, 27, 9, '444', False, True, 'le'),
+    PixfmtInfo('yuv444p10be', 3, 30, 10, '444', False, True, 'be'),
+    PixfmtInfo('yuv444p10le', 3, 30, 10, '444', False, True, 'le'),
+    PixfmtInfo('yuv422p9be', 3, 18, 9, '422', False, True, 'be'),
+    PixfmtInfo('yuv422p9le', 3, 18, 9, '422', False, True, 'le'),
+    PixfmtInfo('gbrp', 3, 24, 8, '444', False, True, None),
+    PixfmtInfo('gbrp9be', 3, 27, 9, '444', False, True, 'be'),
+    PixfmtInfo('gbrp9le', 3, 27, 9, '444', False, True, 'le'),
+    PixfmtInfo('gbrp10be', 3, 30, 10, '444', False, True, 'be'),
+    PixfmtInfo('gbrp10le', 3, 30, 10, '444', False, True, 'le'),
+    PixfmtInfo('gbrp16be', 3, 48, 16, '444', False, True, 'be'),
+    PixfmtInfo('gbrp16le', 3, 48, 16, '444', False, True, 'le'),
+    PixfmtInfo('yuva422p', 4, 24, 8, '422', True, True, None),
+    PixfmtInfo('yuva444p', 4, 32, 8, '444', True, True, None),
+    PixfmtInfo('yuva420p9be', 4, 22, 9, '420', True, True, 'be'),
+    PixfmtInfo('yuva420p9le', 4, 22, 9, '420', True, True, 'le'),
+    PixfmtInfo('yuva422p9be', 4, 27, 9, '422', True, True, 'be'),
+    PixfmtInfo('yuva422p9le', 4, 27, 9, '422', True, True, 'le'),
+    PixfmtInfo('yuva444p9be', 4, 36, 9, '444', True, True, 'be'),
+    PixfmtInfo('yuva444p9le', 4, 36, 9, '444', True, True, 'le'),
+    PixfmtInfo('yuva420p10be', 4, 25, 10, '420', True, True, 'be'),
+    PixfmtInfo('yuva420p10le', 4, 25, 10, '420', True, True, 'le'),
+    PixfmtInfo('yuva422p10be', 4, 30, 10, '422', True, True, 'be'),
+    PixfmtInfo('yuva422p10le', 4, 30, 10, '422', True, True, 'le'),
+    PixfmtInfo('yuva444p10be', 4, 40, 10, '444', True, True, 'be'),
+    PixfmtInfo('yuva444p10le', 4, 40, 10, '444', True, True, 'le'),
+    PixfmtInfo('yuva420p16be', 4, 40, 16, '420', True, True, 'be'),
+    PixfmtInfo('yuva420p16le', 4, 40, 16, '420', True, True, 'le'),
+    PixfmtInfo('yuva422p16be', 4, 48, 16, '422', True, True, 'be'),
+    PixfmtInfo('yuva422p16le', 4, 48, 16, '422', True, True, 'le'),
+    PixfmtInfo('yuva444p16be', 4, 64, 16, '444', True, True, 'be'),
+    PixfmtInfo('yuva444p16le', 4, 64, 16, '444', True, True, 'le'),
+    PixfmtInfo('vdpau', 0, 0, None, None, False, False, None),
+    PixfmtInfo('xyz12le', 3, 36, 12, '444', False, False, 'le'),
+    PixfmtInfo('xyz12be', 3, 36, 12, '444', False, False, 'be'),
+    PixfmtInfo('nv16', 3, 16, 8, '422', False, True, None),
+    PixfmtInfo('nv20le', 3, 20, 10, '422', False, True, 'le'),
+    PixfmtInfo('nv20be', 3, 20, 10, '422', False, True, 'be'),
+    PixfmtInfo('rgba64be', 4, 64, 16, '444', True, False, 'be'),
+    PixfmtInfo('rgba64le', 4, 64, 16, '444', True, False, 'le'),
+    PixfmtInfo('bgra64be', 4, 64, 16, '444', True, False, 'be'),
+    PixfmtInfo('bgra64le', 4, 64, 16, '444', True, False, 'le'),
+    PixfmtInfo('yvyu422', 3, 16, 8, '422', False, False, None),
+    PixfmtInfo('ya16be', 2, 32, 16, None, True, False, 'be'),
+    PixfmtInfo('ya16le', 2, 32, 16, None, True, False, 'le'),
+    PixfmtInfo('gbrap', 4, 32, 8, '444', True, True, None),
+    PixfmtInfo('gbrap16be', 4, 64, 16, '444', True, True, 'be'),
+    PixfmtInfo('gbrap16le', 4, 64, 16, '444', True, True, 'le'),
+    PixfmtInfo('qsv', 0, 0, None, None, False, False, None),
+    PixfmtInfo('mmal', 0, 0, None, None, False, False, None),
+    PixfmtInfo('d3d11va_vld', 0, 0, None, None, False, False, None),
+    PixfmtInfo('cuda', 0, 0, None, None, False, False, None),
+    PixfmtInfo('0rgb', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('rgb0', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('0bgr', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('bgr0', 3, 24, 8, '444', False, False, None),
+    PixfmtInfo('yuv420p12be', 3, 18, 12, '420', False, True, 'be'),
+    PixfmtInfo('yuv420p12le', 3, 18, 12, '420', False, True, 'le'),
+    PixfmtInfo('yuv420p14be', 3, 21, 14, '420', False, True, 'be'),
+    PixfmtInfo('yuv420p14le', 3, 21, 14, '420', False, True, 'le'),
+    PixfmtInfo('yuv422p12be', 3, 24, 12, '422', False, True, 'be'),
+    PixfmtInfo('yuv422p12le', 3, 24, 12, '422', False, True, 'le'),
+    PixfmtInfo('yuv422p14be', 3, 28, 14, '422', False, True, 'be'),
+    PixfmtInfo('yuv422p14le', 3, 28, 14, '422', False, True, 'le'),
+    PixfmtInfo('yuv444p12be', 3, 36, 12, '444', False, True, 'be'),
+    PixfmtInfo('yuv444p12le', 3, 36, 12, '444', False, True, 'le'),
+    PixfmtInfo('yuv444p14be', 3, 42, 14, '444', False, True, 'be'),
+    PixfmtInfo('yuv444p14le', 3, 42, 14, '444', False, True, 'le'),
+    PixfmtInfo('gbrp12be', 3, 36, 12, '444', False, True, 'be'),
+    PixfmtInfo('gbrp12le', 3, 36, 12, '444', False, True, 'le'),
+    PixfmtInfo('gbrp14be', 3, 42, 14, '444', False, True, 'be'),
+    PixfmtInfo('gbrp14le', 3, 42, 14, '444', False, True, 'le'),
+    PixfmtInfo('yuvj411p', 3, 12, 8, '411', False, True, None),
+    PixfmtInfo('bayer_bggr8', 3, 8, 8, None, False, False, None),
+    PixfmtInfo('bayer_rggb8', 3, 8, 8, None, False, False, None),
+    PixfmtInfo('bayer_gbrg8', 3, 8, 8, None, False, False, None),
+    PixfmtInfo('bayer_grbg8', 3, 8, 8, None, False, False, None),
+    PixfmtInfo('bayer_bggr16le', 3, 16, 16, None, False, False, 'le'),
+    PixfmtInfo('bayer_bggr16be', 3, 16, 16, None, False, False, 'be'),
+    PixfmtInfo('bayer_rggb16le', 3, 16, 16, None, False, False, 'le'),
+    PixfmtInfo('bayer_rggb16be', 3, 16, 16, None, False, False, 'be'),
+    PixfmtInfo('bayer_gbrg16le', 3, 16, 16, None, False, False, 'le'),
+    PixfmtInfo('bayer_gbrg16be', 3, 16, 16, None, False, False, 'be'),
+    PixfmtInfo('bayer_grbg16le', 3, 16, 16, None, False, False, 'le'),
+    PixfmtInfo('bayer_grbg16be', 3, 16, 16, None, False, False, 'be'),
+    PixfmtInfo('xvmc', 0, 0, None, None, False, False, None),
+    PixfmtInfo('yuv440p10le', 3, 20, 10, '440', False, True, 'le'),
+    PixfmtInfo('yuv440p10be', 3, 20, 10, '440', False, True, 'be'),
+    PixfmtInfo('yuv440p12le', 3, 24, 12, '440', False, True, 'le'),
+    PixfmtInfo('yuv440p12be', 3, 24, 12, '440', False, True, 'be'),
+    PixfmtInfo('ayuv64le', 4, 64, 16, '444', True, False, 'le'),
+    PixfmtInfo('ayuv64be', 4, 64, 16, '444', True, False, 'be'),
+    PixfmtInfo('videotoolbox_vld', 0, 0, None, None, False, False, None),
+    PixfmtInfo('p010le', 3, 15, 10, '420', False, True, 'le'),
+    PixfmtInfo('p010be', 3, 15, 10, '420', False, True, 'be'),
+    PixfmtInfo('gbrap12be', 4, 48, 12, '444', True, True, 'be'),
+    PixfmtInfo('gbrap12le', 4, 48, 12, '444', True, True, 'le'),
+    PixfmtInfo('gbrap10be', 4, 40, 10, '444', True, True, 'be'),
+    PixfmtInfo('gbrap10le', 4, 40, 10, '444', True, True, 'le'),
+    PixfmtInfo('mediacodec', 0, 0, None, None, False, False, None),
+    PixfmtInfo('gray12be', 1, 12, 12, None, False, False, 'be'),
+    PixfmtInfo('gray12le', 1, 12, 12, None, False, False, 'le'),
+    PixfmtInfo('gray10be', 1, 10, 10, None, False, False, 'be'),
+    PixfmtInfo('gray10le', 1, 10, 10, None, False, False, 'le'),
+    PixfmtInfo('p016le', 3, 24, 16, '420', False, True, 'le'),
+    PixfmtInfo('p016be', 3, 24, 16, '420', False, True, 'be'),
+    PixfmtInfo('d3d11', 0, 0, None, None, False, False, None),
+    PixfmtInfo('gray9be', 1, 9, 9, None, False, False, 'be'),
+    PixfmtInfo('gray9le', 1, 9, 9, None, False, False, 'le'),
+    PixfmtInfo('gbrpf32be', 3, 96, 32, '444', False, True, 'be'),
+    PixfmtInfo('gbrpf32le', 3, 96, 32, '444', False, True, 'le'),
+    PixfmtInfo('gbrapf32be', 4, 128, 32, '444', True, True, 'be'),
+    PixfmtInfo('gbrapf32le', 4, 128, 32, '444', True, True, 'le'),
+    PixfmtInfo('drm_prime', 0, 0, None, None, False, False, None),
+    PixfmtInfo('opencl', 0, 0, None, None, False, False, None),
+    PixfmtInfo('gray14be', 1, 14, 14, None, False, False, 'be'),
+    PixfmtInfo('gray14le', 1, 14, 14, None, False, False, 'le'),
+    PixfmtInfo('grayf32be', 1, 32, 32, None, False, False, 'be'),
+    PixfmtInfo('grayf32le', 1, 32, 32, None, False, False, 'le'),
+    PixfmtInfo('yuva422p12be', 4, 36, 12, '422', True, True, 'be'),
+    PixfmtInfo('yuva422p12le', 4, 36, 12, '422', True, True, 'le'),
+    PixfmtInfo('yuva444p12be', 4, 48, 12, '444', True, True, 'be'),
+    PixfmtInfo('yuva444p12le', 4, 48, 12, '444', True, True, 'le'),
+    PixfmtInfo('nv24', 3, 24, 8, '444', False, True, None),
+    PixfmtInfo('nv42', 3, 24, 8, '444', False, True, None),
+    PixfmtInfo('vulkan', 0, 0, None, None, False, False, None),
+    PixfmtInfo('y210be', 3, 20, 10, '422', False, False, 'be'),
+    PixfmtInfo('y210le', 3, 20, 10, '422', False, False, 'le'),
+    PixfmtInfo('x2rgb10le', 3, 30, 10, '444', False, False, 'le'),
+    PixfmtInfo('x2rgb10be', 3, 30, 10, '444', False, False, 'be'),
+)
+
+PIXFMTS: Dict[str, PixfmtInfo] = {p.name: p for p in _TABLE}
+
+
+def _build_indexes() -> Dict[str, Dict[Any, FrozenSet[str]]]:
+    result: Dict[str, Dict[Any, set]] = dict()
+    for info in _TABLE:
+        for field, value in info._asdict().items():
+            if field == 'name':
+                continue
+            result.setdefault(field, dict()).setdefault(value, set()) \
+                .add(info.name)
+    return {field: {v: frozenset(names) for v, names in values.items()}
+            for field, values in result.items()}
+
+
+_INDEXES = _build_indexes()
+
+
+def pixfmt_info(pixfmt: str) -> Optional[PixfmtInfo]:
+    """Returns the table row for the pixel format, or None if the format
+    is not in the table."""
+    return PIXFMTS.get(pixfmt)
+
+
+def pixfmt_rgb(pixfmt: str) -> Optional[bool]:
+    """Whether the pixel format stores RGB components rather than YUV
+    or gray ones. Returns None if the format is not in the table."""
+    if pixfmt not in PIXFMTS:
+        return None
+    return any(s in pixfmt for s in ('rgb', 'bgr', 'gbr', 'bayer'))
+
+
+def find_pixfmts(**criteria: Any) -> List[str]:
+    """Returns names of the pixel formats matching all the criteria.
+    The arguments are `PixfmtInfo` fields:
+
+        find_pixfmts(bpc=10, subsampling='422', alpha=True)
+    """
+    names: Optional[FrozenSet[str]] = None
+    for field, value in criteria.items():
+        index = _INDEXES.get(field)
+        if index is None:
+            raise TypeError(f"Unknown field: {field}")
+        matching = index.get(value, frozenset())
+        names = matching if names is None else names & matching
+    if names is None:
+        names = frozenset(PIXFMTS)
+    # keeping the order of the table, like `ffmpeg -pix_fmts` does
+    return [p.name for p in _TABLE if p.name in names]
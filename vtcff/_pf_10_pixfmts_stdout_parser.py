@@ -1,21 +1,17 @@
 # SPDX-FileCopyrightText: (c) 2016-2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 
-import subprocess
-import sys
-from typing import Iterable, List, NamedTuple, Optional, Dict
+from typing import Iterable, List, NamedTuple, Optional, Dict, Tuple
+
+from ._capabilities import capabilities
+from ._pf_00_pixfmt_table import pixfmt_info
 
 
 def _pix_fmts_lines(ffmpeg_exe: str) -> Iterable[str]:
-    result = subprocess.run([ffmpeg_exe, "-pix_fmts"],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            encoding=sys.stdout.encoding or "utf-8")
-    if result.returncode != 0:
-        raise subprocess.CalledProcessError
+    return _split_pix_fmts_stdout(capabilities(ffmpeg_exe).pix_fmts_stdout)
 
-    txt = result.stdout
 
+def _split_pix_fmts_stdout(txt: str) -> Iterable[str]:
     # txt is something like
     #
     # Pixel formats:
@@ -55,9 +51,9 @@ class PixfmtOutputSpec(NamedTuple):
     bits_per_pixel: int
 
 
-def _pix_fmts_tuples(ffmpeg_exe: str) -> List[PixfmtOutputSpec]:
+def _parse_pix_fmts_stdout(txt: str) -> List[PixfmtOutputSpec]:
     result = list()
-    for line in _pix_fmts_lines(ffmpeg_exe):
+    for line in _split_pix_fmts_stdout(txt):
         words = line.split()
         pfo = PixfmtOutputSpec(words[0], words[1], int(words[2]),
                                int(words[3]))
@@ -65,25 +61,40 @@ def _pix_fmts_tuples(ffmpeg_exe: str) -> List[PixfmtOutputSpec]:
     return result
 
 
-_pix_format_spec: Optional[Dict[str, PixfmtOutputSpec]] = None
+def _pix_fmts_tuples(ffmpeg_exe: str) -> List[PixfmtOutputSpec]:
+    return _parse_pix_fmts_stdout(capabilities(ffmpeg_exe).pix_fmts_stdout)
+
+
+# parsed specs for each executable, keyed by `FfmpegCapabilities.key`
+_pix_format_specs: Dict[Tuple[str, int, int], Dict[str, PixfmtOutputSpec]] \
+    = dict()
 
 
 def pixfmt_to_spec(name: str, ffmpeg_exe: str) -> PixfmtOutputSpec:
     """Returns a particular parsed line of `ffmpeg -pix_fmts`"""
-    global _pix_format_spec
-    if _pix_format_spec is None:
-        _pix_format_spec = dict()
-        for t in _pix_fmts_tuples(ffmpeg_exe=ffmpeg_exe):
-            _pix_format_spec[t.name] = t
-    assert _pix_format_spec is not None
-    return _pix_format_spec[name]
-
-
-def pixfmt_alpha(pixfmt: str, ffmpeg_exe: str) -> Optional[bool]:
-    spec = pixfmt_to_spec(pixfmt, ffmpeg_exe=ffmpeg_exe)
-    if spec.nb_components == 4:
+    caps = capabilities(ffmpeg_exe)
+    specs = _pix_format_specs.get(caps.key)
+    if specs is None:
+        specs = {t.name: t for t in
+                 _parse_pix_fmts_stdout(caps.pix_fmts_stdout)}
+        _pix_format_specs[caps.key] = specs
+    return specs[name]
+
+
+def pixfmt_alpha(pixfmt: str, ffmpeg_exe: str = "ffmpeg") -> Optional[bool]:
+    """Returns True for four-component formats, False for three-component
+    formats, and None for the others.
+
+    Formats from the static table are resolved without running ffmpeg."""
+    info = pixfmt_info(pixfmt)
+    if info is not None:
+        nb_components = info.components
+    else:
+        nb_components = pixfmt_to_spec(pixfmt,
+                                       ffmpeg_exe=ffmpeg_exe).nb_components
+    if nb_components == 4:
         return True
-    elif spec.nb_components == 3:
+    elif nb_components == 3:
         return False
     else:
         return None
@@ -1,6 +1,8 @@
 import re
 from typing import Optional
 
+from vtcff._pf_00_pixfmt_table import pixfmt_info
+
 
 def _three_digits(text) -> Optional[str]:
     """True if `text` contains something like aXXXb, where XXX are digits
@@ -13,6 +15,9 @@ def _three_digits(text) -> Optional[str]:
 
 
 def pixfmt_subsampling(pixfmt: str) -> Optional[str]:
+    info = pixfmt_info(pixfmt)
+    if info is not None:
+        return info.subsampling
     td = _three_digits(pixfmt)
     if td:
         return td
@@ -2,8 +2,9 @@
 # SPDX-License-Identifier: MIT
 
 """
-It would probably be easier and more reliable to create a table with all pixel
-formats. But I was too lazy. Therefore, below is a heuristic parser of the data
+The known pixel formats are resolved with the static table from
+`_pf_00_pixfmt_table`. For the formats that are not in the table (added in newer
+ffmpeg versions, for example), below is a heuristic parser of the data
 printed by the command "ffmpeg -pix_fmts".
 
 The `_pix_format_to_depth` dictionary allows you to overload the parser
@@ -226,6 +227,7 @@ import re
 import warnings
 from typing import Optional
 
+from vtcff._pf_00_pixfmt_table import pixfmt_info
 from vtcff._pf_10_pixfmts_stdout_parser import pixfmt_to_spec
 from vtcff._pf_15_pixfmt_subsampling import pixfmt_subsampling
 
@@ -309,10 +311,15 @@ def _guess_bpc(name: str, components: int, bits_per_pixel: int) \
     return result
 
 
-def pixfmt_bpc(pixfmt: str, ffmpeg_exe: str) -> Optional[int]:
+def pixfmt_bpc(pixfmt: str, ffmpeg_exe: str = "ffmpeg") -> Optional[int]:
     """Returns the estimated number of bits-per-color-channel after decoding
     from the specified pixel format. This value optimistically indicates the
-    maximum number of color gradations in each of the channels R, G, B, A."""
-    # todo test alternate path to ffmpeg_exe
+    maximum number of color gradations in each of the channels R, G, B, A.
+
+    Only the formats missing from the static table require running
+    `ffmpeg_exe`."""
+    info = pixfmt_info(pixfmt)
+    if info is not None:
+        return info.bpc
     spec = pixfmt_to_spec(pixfmt, ffmpeg_exe)
     return _guess_bpc(spec.name, spec.nb_components, spec.bits_per_pixel)
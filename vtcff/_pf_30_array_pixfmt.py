@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+"""Matching between the pixel formats and the memory layout of NumPy
+arrays of shape (height, width, channels).
+
+The functions accept anything with the `kind`, `itemsize` and `byteorder`
+attributes of `numpy.dtype`, so this module does not import NumPy."""
+
+import sys
+from typing import Tuple, Any, Optional
+
+from ._pf_00_pixfmt_table import find_pixfmts, pixfmt_info
+from ._pf_20_pixfmt_bpc import pixfmt_bpc
+
+# only the formats with components in this order can be used for arrays
+# without reordering the channels
+_PREFIXES = {1: 'gray', 2: 'ya', 3: 'rgb', 4: 'rgba'}
+
+
+def _endian(dtype: Any) -> Any:
+    if dtype.itemsize == 1:
+        return None
+    order = dtype.byteorder
+    if order in ('=', '|'):
+        order = '<' if sys.byteorder == 'little' else '>'
+    return 'le' if order == '<' else 'be'
+
+
+def _is_float_pixfmt(name: str) -> bool:
+    return 'f16' in name or 'f32' in name
+
+
+def _packed_pixfmt(kind: str, bits: int, endian: Optional[str],
+                   channels: int) -> Optional[str]:
+    prefix = _PREFIXES.get(channels)
+    if prefix is None or kind not in ('u', 'f'):
+        return None
+    for name in find_pixfmts(components=channels, bpc=bits, planar=False,
+                             endian=endian):
+        info = pixfmt_info(name)
+        if (info is not None and name.startswith(prefix)
+                # excluding formats with padding bytes like 'rgb0'
+                and info.bits_per_pixel == bits * channels
+                and _is_float_pixfmt(name) == (kind == 'f')):
+            return name
+    return None
+
+
+def array_pixfmt(dtype: Any, channels: int) -> str:
+    """Returns the packed pixel format with the same memory layout
+    as a C-contiguous array of the `dtype` and shape (h, w, channels).
+
+    For example, uint8 with 3 channels is 'rgb24', little-endian uint16
+    with 4 channels is 'rgba64le'. Raises ValueError if ffmpeg has no such
+    format."""
+    result = _packed_pixfmt(dtype.kind, dtype.itemsize * 8, _endian(dtype),
+                            channels)
+    if result is None:
+        raise ValueError(f"No pixel format for {channels} channels "
+                         f"of {dtype}")
+    return result
+
+
+def pixfmt_array_layout(pixfmt: str) -> Tuple[str, int]:
+    """Returns the dtype string and the number of channels of the arrays
+    `array_pixfmt` maps to this pixel format. For example,
+    'rgb48le' → ('<u2', 3)."""
+    info = pixfmt_info(pixfmt)
+    if info is None:
+        raise ValueError(f"Unknown pixel format: {pixfmt}")
+    bpc = pixfmt_bpc(pixfmt)
+    if (info.planar or bpc not in (8, 16, 32)
+            or info.bits_per_pixel != bpc * info.components
+            or not pixfmt.startswith(_PREFIXES.get(info.components, '?'))):
+        raise ValueError(f"{pixfmt} does not match an array layout")
+    order = {'le': '<', 'be': '>'}.get(info.endian or '', '|')
+    kind = 'f' if _is_float_pixfmt(pixfmt) else 'u'
+    return f"{order}{kind}{bpc // 8}", info.components
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import subprocess
+from typing import NamedTuple, Optional, Dict, List, AsyncIterator
+
+
+class FfmpegProgress(NamedTuple):
+    """A single block of `ffmpeg -progress` output.
+
+    Fields that ffmpeg reports as "N/A" (or does not report at all)
+    are None."""
+
+    frame: Optional[int] = None
+    fps: Optional[float] = None
+    out_time: Optional[float] = None
+    """Position in the output, in seconds."""
+    speed: Optional[float] = None
+    """Encoding speed relative to realtime: 2.0 means "2x"."""
+    bitrate: Optional[float] = None
+    """Output bitrate in kbit/s."""
+    total_size: Optional[int] = None
+    """Bytes written to the output so far."""
+    done: bool = False
+    """True for the last block (progress=end)."""
+
+
+def _int_or_none(s: Optional[str]) -> Optional[int]:
+    try:
+        return int(s) if s is not None else None
+    except ValueError:
+        return None
+
+
+def _float_or_none(s: Optional[str], suffix: str = '') -> Optional[float]:
+    if s is None:
+        return None
+    s = s.strip()
+    if suffix and s.endswith(suffix):
+        s = s[:-len(suffix)]
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _out_time_seconds(block: Dict[str, str]) -> Optional[float]:
+    # "out_time_ms" is actually in microseconds (a long-standing ffmpeg
+    # quirk), so we prefer the explicit "out_time_us" when it is present
+    for key in ('out_time_us', 'out_time_ms'):
+        us = _int_or_none(block.get(key))
+        if us is not None:
+            return us / 1000000
+    return None
+
+
+class ProgressParser:
+    """Incremental parser of the key=value lines printed by
+    `ffmpeg -progress pipe:1`. Every block is terminated by a
+    "progress=continue" or "progress=end" line."""
+
+    def __init__(self):
+        self._block: Dict[str, str] = dict()
+
+    def feed(self, line: str) -> Optional[FfmpegProgress]:
+        """Consumes a single line. Returns the parsed block when the line
+        completes one, otherwise returns None."""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        if key != 'progress':
+            self._block[key] = value.strip()
+            return None
+
+        block, self._block = self._block, dict()
+        return FfmpegProgress(
+            frame=_int_or_none(block.get('frame')),
+            fps=_float_or_none(block.get('fps')),
+            out_time=_out_time_seconds(block),
+            speed=_float_or_none(block.get('speed'), suffix='x'),
+            bitrate=_float_or_none(block.get('bitrate'), suffix='kbits/s'),
+            total_size=_int_or_none(block.get('total_size')),
+            done=value.strip() == 'end')
+
+
+_STDERR_TAIL_SIZE = 64 * 1024
+
+
+async def _read_tail(stream: asyncio.StreamReader) -> bytes:
+    # we must keep reading stderr, otherwise ffmpeg will block as soon
+    # as the pipe buffer is full. Only the tail is kept for error reports
+    tail = b''
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return tail
+        tail = (tail + chunk)[-_STDERR_TAIL_SIZE:]
+
+
+def with_progress_args(args: List[str]) -> List[str]:
+    """Inserts `-progress pipe:1 -nostats` right after the executable.
+    These are global options, so their position does not matter to
+    ffmpeg."""
+    return args[:1] + ['-progress', 'pipe:1', '-nostats'] + args[1:]
+
+
+async def iter_progress(args: List[str]) -> AsyncIterator[FfmpegProgress]:
+    """Runs the command and yields the progress blocks it prints to stdout.
+    Raises `subprocess.CalledProcessError` if the process fails.
+
+    The `args` must already contain `-progress pipe:1`."""
+
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE)
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr_task = asyncio.ensure_future(_read_tail(proc.stderr))
+
+    try:
+        parser = ProgressParser()
+        async for raw_line in proc.stdout:
+            event = parser.feed(raw_line.decode('utf-8', errors='replace'))
+            if event is not None:
+                yield event
+        return_code = await proc.wait()
+        stderr = await stderr_task
+    finally:
+        # we get here early when the caller stops the iteration
+        # or the task is cancelled
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
+
+    if return_code != 0:
+        raise subprocess.CalledProcessError(return_code, args, stderr=stderr)
@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+from typing import Optional, Union
+
+from ._codec import Codec
+from ._codec_audio_copy import AudioCopy
+from ._common import Scale
+from ._compiled_command import Tracked
+from ._filter_swscale import SwscaleFilter
+from ._filter_zscale import ZscaleFilter
+
+
+class Rendition(Tracked):
+    """One of the outputs of a `FfmpegCommand` that decodes the source once
+    and encodes it several times.
+
+    The filters of the command (crop, color conversion, transpose...) are
+    applied once, before the frames are fanned out. The `scale` of the
+    rendition is applied to its own copy of the frames.
+
+    If `scale_from` is another rendition of the same command, the frames
+    are scaled from the output of that rendition rather than from the
+    source, which is cheaper when that rendition is already downscaled."""
+
+    def __init__(self,
+                 dst_file: Union[Path, str, None] = None,
+                 dst_codec_video: Optional[Codec] = None,
+                 scale: Optional[Scale] = None,
+                 dst_pixfmt: Optional[str] = None,
+                 dst_codec_audio: Optional[Codec] = None,
+                 scale_from: Optional['Rendition'] = None):
+        self.dst_file: Optional[Union[Path, str]] = dst_file
+        self.dst_codec_video: Optional[Codec] = dst_codec_video
+        self.dst_codec_audio: Optional[Codec] = \
+            dst_codec_audio if dst_codec_audio is not None else AudioCopy()
+        self.dst_pixfmt: Optional[str] = dst_pixfmt
+        self.scale_from: Optional[Rendition] = scale_from
+
+        # the filters are created here rather than when compiling: creating
+        # a tracked object outdates the compiled commands
+        self._zscale = ZscaleFilter()
+        self._swscale = SwscaleFilter()
+        self.scale = scale
+
+    @property
+    def scale(self) -> Optional[Scale]:
+        return self._zscale.scaling
+
+    @scale.setter
+    def scale(self, s: Optional[Scale]):
+        self._zscale.scaling = s
+        self._swscale.width = s.width if s is not None else None
+        self._swscale.height = s.height if s is not None else None
+        self._swscale.downscale_only = \
+            s.downscale_only if s is not None else False
+
+    def _scale_filter(self, use_zscale: bool) \
+            -> Union[ZscaleFilter, SwscaleFilter, None]:
+        if self.scale is None:
+            return None
+        return self._zscale if use_zscale else self._swscale
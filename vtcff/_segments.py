@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import copy
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Tuple, NamedTuple, Optional, Union
+
+from ._batch import run_batch_async, BatchReport
+from ._codec_audio_none import NoAudio
+from ._command import FfmpegCommand, desynonimize
+from ._progress import iter_progress, with_progress_args
+from ._split_points import SplitPointIndex
+from ._time_span import Seek
+
+# the segments start this fraction of a frame before their first frame.
+# The rounding of the timestamps then cannot drop the first frame or take
+# the last frame of the previous segment
+_FRAME_MARGIN = 0.25
+
+
+def split_time_range(begin: float, duration: float, count: int) \
+        -> List[Tuple[float, float]]:
+    """Splits the time range into `count` adjacent (begin, duration) pairs
+    of equal length."""
+    if count < 1:
+        raise ValueError(count)
+    if duration <= 0:
+        raise ValueError(duration)
+    bounds = [begin + duration * i / count for i in range(count + 1)]
+    # the last bound is set explicitly to avoid accumulating float error
+    bounds[-1] = begin + duration
+    return [(bounds[i], bounds[i + 1] - bounds[i]) for i in range(count)]
+
+
+def _frame_ranges(ranges: List[Tuple[float, float]], fps: float) \
+        -> List[Tuple[int, int]]:
+    """Converts adjacent (begin, duration) ranges in seconds into adjacent
+    (first frame, number of frames) ranges. Empty ranges are dropped."""
+    bounds = [round(b * fps) for b, _ in ranges]
+    bounds.append(round((ranges[-1][0] + ranges[-1][1]) * fps))
+    return [(a, b - a) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _frame_time(frame: float, fps: float) -> float:
+    return max(0.0, round((frame - _FRAME_MARGIN) / fps, 6))
+
+
+def _concat_list_line(path: Path) -> str:
+    # https://ffmpeg.org/ffmpeg-formats.html#concat-1
+    escaped = str(path.absolute()).replace("'", "'\\''")
+    return f"file '{escaped}'"
+
+
+class SegmentPlan(NamedTuple):
+    segments: List[FfmpegCommand]
+    """Independent video-only commands, one per time segment."""
+    concat_list: Path
+    """The file listing the segments for the concat demuxer."""
+    join_args: List[str]
+    """The command that joins the segments without re-encoding
+    and adds the audio."""
+
+
+def _join_args(cmd: FfmpegCommand, concat_list: Path,
+               begin: float, duration: float) -> List[str]:
+    result = [str(cmd.ffmpeg_exe),
+              '-f', 'concat', '-safe', '0', '-i', str(concat_list)]
+
+    with_audio = not isinstance(cmd.dst_codec_audio, NoAudio)
+    if with_audio:
+        # the audio is taken from the source once for the whole timeline,
+        # so segment boundaries never produce gaps in it
+        if begin:
+            result += ['-ss', str(begin)]
+        result += ['-t', str(duration), '-i', str(cmd.src_file)]
+
+    result += ['-map', '0:v:0']
+    if with_audio:
+        result += ['-map', '1:a?']
+
+    result += ['-codec:v', 'copy']
+    if with_audio:
+        if cmd.dst_codec_audio is not None:
+            for k, v in cmd.dst_codec_audio.args():
+                result.append(desynonimize(k))
+                if v is not None:
+                    result.append(v)
+        result += cmd.custom.audio.list
+    else:
+        result.append('-an')
+
+    result += ['-movflags', '+write_colr']
+    if cmd.dst_file is None:
+        raise ValueError("Output file not specified")
+    result.append(str(cmd.dst_file))
+    return result
+
+
+def plan_segments(cmd: FfmpegCommand,
+                  count: int,
+                  work_dir: Union[str, Path],
+                  src_duration: Optional[float] = None,
+                  split_points: Optional[SplitPointIndex] = None,
+                  src_fps: Optional[float] = None) \
+        -> SegmentPlan:
+    """Splits the encoding of `cmd` into `count` commands that encode
+    adjacent time segments of the source.
+
+    If `cmd.dst_time_range` has no duration, `src_duration` (the duration
+    of the whole source, seconds) must be specified.
+
+    The segment boundaries are placed between the frames, so each frame
+    is encoded exactly once. This requires the frame rate: `src_fps`,
+    or `cmd.src_fps` if it is not specified.
+
+    If `split_points` is specified, the segment boundaries are moved
+    to the nearby scene changes and keyframes.
+
+    The segments seek on the input side, so each of them decodes only
+    from the keyframe before its start (`Seek.FAST`), or from its start
+    if it is on a keyframe (`Seek.KEYFRAME`)."""
+
+    work_dir = Path(work_dir)
+    fps = src_fps or cmd.src_fps
+    if not fps:
+        raise ValueError("The frame rate of the source must be specified")
+    begin = cmd.dst_time_range.begin or 0
+    duration = cmd.dst_time_range.duration
+    if duration is None:
+        if src_duration is None:
+            raise ValueError("Either dst_time_range.duration or "
+                             "src_duration must be specified")
+        duration = src_duration - begin
+    if cmd.dst_file is None:
+        raise ValueError("Output file not specified")
+
+    suffix = Path(cmd.dst_file).suffix or '.mov'
+
+    ranges = split_time_range(begin, duration, count)
+    if split_points is not None:
+        ranges = split_points.snap_ranges(
+            ranges, tolerance=duration / count / 4)
+
+    frame_ranges = _frame_ranges(ranges, fps)
+    if not frame_ranges:
+        raise ValueError("The time range is shorter than a frame")
+
+    segments: List[FfmpegCommand] = []
+    for idx, (first, frames) in enumerate(frame_ranges):
+        seg = copy.deepcopy(cmd)
+        keyframe = split_points.keyframe_near(first / fps, 0.5 / fps) \
+            if split_points is not None else None
+        if keyframe is not None:
+            # the seek lands right on the first frame
+            seg_begin = keyframe
+            seg.dst_time_range.seek = Seek.KEYFRAME
+        else:
+            seg_begin = _frame_time(first, fps)
+            seg.dst_time_range.seek = Seek.FAST
+        seg.dst_time_range.begin = seg_begin
+        seg.dst_time_range.duration = round(
+            _frame_time(first + frames, fps) - seg_begin, 6)
+        seg.dst_file = work_dir / f"segment_{idx:04d}{suffix}"
+        seg.dst_codec_audio = NoAudio()
+        seg.custom.audio.list = []
+        segments.append(seg)
+
+    first, _ = frame_ranges[0]
+    frames_total = sum(frames for _, frames in frame_ranges)
+    concat_list = work_dir / "segments.txt"
+    return SegmentPlan(
+        segments=segments,
+        concat_list=concat_list,
+        join_args=_join_args(cmd, concat_list, round(first / fps, 6),
+                             round(frames_total / fps, 6)))
+
+
+async def encode_segmented_async(cmd: FfmpegCommand,
+                                 count: int,
+                                 src_duration: Optional[float] = None,
+                                 cores: Optional[int] = None,
+                                 work_dir: Union[str, Path, None] = None,
+                                 split_points: Optional[SplitPointIndex]
+                                 = None,
+                                 src_fps: Optional[float] = None) \
+        -> BatchReport:
+    """Encodes the segments in parallel as independent ffmpeg processes,
+    then joins them with the concat demuxer using stream copy.
+
+    Temporary segment files are placed into `work_dir`. By default, it is
+    a temporary directory next to `cmd.dst_file`, which is removed
+    afterwards."""
+
+    if work_dir is None:
+        assert cmd.dst_file is not None
+        with tempfile.TemporaryDirectory(
+                dir=os.path.dirname(os.path.abspath(cmd.dst_file))) as td:
+            return await encode_segmented_async(
+                cmd, count, src_duration=src_duration, cores=cores,
+                work_dir=td, split_points=split_points, src_fps=src_fps)
+
+    plan = plan_segments(cmd, count, work_dir, src_duration=src_duration,
+                         split_points=split_points, src_fps=src_fps)
+    report = await run_batch_async(plan.segments, cores=cores,
+                                   # keep the timeline order: all segments
+                                   # cost the same
+                                   cost=lambda _: 0.0)
+    if report.failed:
+        raise report.failed[0].error  # type: ignore
+
+    lines = []
+    for seg in plan.segments:
+        assert seg.dst_file is not None
+        lines.append(_concat_list_line(Path(seg.dst_file)))
+    plan.concat_list.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    async for _ in iter_progress(with_progress_args(plan.join_args)):
+        pass
+    return report
+
+
+def encode_segmented(cmd: FfmpegCommand,
+                     count: int,
+                     src_duration: Optional[float] = None,
+                     cores: Optional[int] = None,
+                     work_dir: Union[str, Path, None] = None,
+                     split_points: Optional[SplitPointIndex] = None,
+                     src_fps: Optional[float] = None) \
+        -> BatchReport:
+    """Blocking version of `encode_segmented_async`."""
+    return asyncio.run(encode_segmented_async(
+        cmd, count, src_duration=src_duration, cores=cores,
+        work_dir=work_dir, split_points=split_points, src_fps=src_fps))
@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+import bisect
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Sequence, Optional, Tuple, Union, Iterable
+
+from ._disk_cache import file_key, read_cached, write_cached
+
+# timestamps closer than this are considered the same frame
+_SAME_FRAME = 0.001
+
+# changes when the cached values get another meaning
+_CACHE_VERSION = 2
+
+# the number of source files with the split points on disk
+_MAX_DISK_ENTRIES = 1000
+
+
+def _parse_keyframe_packets(txt: str) -> List[float]:
+    # lines are like "packet,12.345000,K_" or "packet,12.387000,__",
+    # and "stream,1.400000" for the start time of the stream.
+    #
+    # The packet times include the start time, but the times of -ss
+    # and of the decoded frames do not
+    start_time = 0.0
+    result = []
+    for line in txt.splitlines():
+        section, _, values = line.strip().partition(',')
+        try:
+            if section == 'stream':
+                start_time = float(values)
+            elif section == 'packet':
+                pts_time, _, flags = values.partition(',')
+                if 'K' in flags:
+                    result.append(float(pts_time))
+        except ValueError:
+            continue  # "N/A"
+    return sorted(round(t - start_time, 6) for t in result)
+
+
+def _parse_scene_metadata(txt: str) -> List[float]:
+    # lines are like "frame:57   pts:58368   pts_time:2.432"
+    return sorted(float(m.group(1)) for m in
+                  re.finditer(r'pts_time:(\d+(?:\.\d+)?)', txt))
+
+
+def _run(args: List[str]) -> str:
+    return subprocess.run(args, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL,
+                          encoding=sys.stdout.encoding or "utf-8",
+                          check=True).stdout
+
+
+def _probe_keyframes(src_file: str, ffprobe_exe: str) -> List[float]:
+    # reading packet flags does not require decoding, so this is fast
+    return _parse_keyframe_packets(_run([
+        ffprobe_exe, '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=start_time:packet=pts_time,flags',
+        '-of', 'csv',
+        src_file]))
+
+
+def _probe_scene_changes(src_file: str, ffmpeg_exe: str,
+                         threshold: float) -> List[float]:
+    # this decodes the whole video, so it is slow
+    return _parse_scene_metadata(_run([
+        ffmpeg_exe, '-hide_banner', '-nostats', '-v', 'error',
+        '-i', src_file, '-an',
+        '-filter:v', f"select='gt(scene,{threshold})',metadata=print:file=-",
+        '-f', 'null', '-']))
+
+
+class SplitPointIndex:
+    """Positions of keyframes and scene changes in the source, in seconds
+    from the start of the source (like the values of -ss).
+
+    Segments starting at a keyframe are cheap to seek to: with -ss before
+    -i, ffmpeg starts decoding right at the keyframe. Segments starting
+    at a scene change hide the quality bump at the cut point."""
+
+    def __init__(self, keyframes: Sequence[float],
+                 scene_changes: Sequence[float] = ()):
+        self.keyframes: List[float] = sorted(keyframes)
+        self.scene_changes: List[float] = sorted(scene_changes)
+
+    @classmethod
+    def probe(cls, src_file: Union[str, Path],
+              ffprobe_exe: str = "ffprobe",
+              ffmpeg_exe: str = "ffmpeg",
+              scenes: bool = True,
+              scene_threshold: float = 0.3) -> 'SplitPointIndex':
+        """Finds keyframes (and optionally scene changes) in the source.
+
+        The results are cached on disk per source file, so repeated calls
+        for the same unchanged file do not run ffprobe/ffmpeg."""
+        src_file = str(src_file)
+        key = file_key(src_file, _CACHE_VERSION, scenes, scene_threshold)
+        cached = read_cached('split_points', key)
+        if cached is not None:
+            return cls(cached['keyframes'], cached['scene_changes'])
+
+        keyframes = _probe_keyframes(src_file, ffprobe_exe)
+        scene_changes = _probe_scene_changes(
+            src_file, ffmpeg_exe, scene_threshold) if scenes else []
+        write_cached('split_points', key,
+                     {'keyframes': keyframes, 'scene_changes': scene_changes},
+                     max_entries=_MAX_DISK_ENTRIES)
+        return cls(keyframes, scene_changes)
+
+    @staticmethod
+    def _within(items: List[float], lo: float, hi: float) -> List[float]:
+        return items[bisect.bisect_left(items, lo):
+                     bisect.bisect_right(items, hi)]
+
+    def _is_keyframe(self, t: float) -> bool:
+        return bool(self._within(self.keyframes,
+                                 t - _SAME_FRAME, t + _SAME_FRAME))
+
+    def keyframe_near(self, t: float, tolerance: float) -> Optional[float]:
+        """Returns the keyframe nearest to `t` within `t ± tolerance`,
+        or None."""
+        return min(self._within(self.keyframes, t - tolerance, t + tolerance),
+                   key=lambda x: abs(x - t), default=None)
+
+    def keyframe_at_or_before(self, t: float) -> Optional[float]:
+        idx = bisect.bisect_right(self.keyframes, t + _SAME_FRAME)
+        return self.keyframes[idx - 1] if idx > 0 else None
+
+    def split_point_near(self, t: float, tolerance: float) -> float:
+        """Returns the best split point within `t ± tolerance`.
+
+        In the order of preference: a scene change on a keyframe,
+        a keyframe, a scene change. If there is nothing in the window,
+        returns `t` itself."""
+
+        def nearest(items: Iterable[float]) -> Optional[float]:
+            return min(items, key=lambda x: abs(x - t), default=None)
+
+        lo, hi = t - tolerance, t + tolerance
+        scenes = self._within(self.scene_changes, lo, hi)
+        for candidates in ([s for s in scenes if self._is_keyframe(s)],
+                           self._within(self.keyframes, lo, hi),
+                           scenes):
+            found = nearest(candidates)
+            if found is not None:
+                return found
+        return t
+
+    def snap_ranges(self, ranges: Sequence[Tuple[float, float]],
+                    tolerance: float) -> List[Tuple[float, float]]:
+        """Moves the inner boundaries of adjacent (begin, duration) ranges
+        to the best split points. The outer boundaries are kept.
+
+        Boundaries snapped to the same point are merged, so the result
+        may contain fewer ranges."""
+        if not ranges:
+            return []
+        begin = ranges[0][0]
+        end = ranges[-1][0] + ranges[-1][1]
+        bounds = [begin]
+        for (seg_begin, _) in ranges[1:]:
+            point = self.split_point_near(seg_begin, tolerance)
+            if bounds[-1] < point < end:
+                bounds.append(point)
+        bounds.append(end)
+        return [(bounds[i], bounds[i + 1] - bounds[i])
+                for i in range(len(bounds) - 1)]
@@ -0,0 +1,56 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+from enum import Enum, unique
+from typing import NamedTuple, Optional
+
+from ._codec_avc_preset import VcPreset
+from ._filter_zscale import Dither
+
+
+@unique
+class Tier(Enum):
+    """How much speed a command trades for quality."""
+
+    MASTER = 'master'
+    """The best quality the settings of the command give."""
+
+    REVIEW = 'review'
+    """Dailies and review copies: faster kernels and encoding, ordered
+    dithering."""
+
+    PROXY = 'proxy'
+    """Proxies for editing: the fastest kernels and encoding,
+    no dithering."""
+
+
+class TierSettings(NamedTuple):
+    zscale_kernel: str
+    """The `filter` argument of zscale."""
+    sws_flags: str
+    """The flags of the conversions made with swscale, including the ones
+    ffmpeg inserts itself."""
+    reducing_dither: Dither
+    """The dithering of zscale when the bits per channel are reduced."""
+    preset: Optional[VcPreset]
+    """The preset of x264 and x265 when the codec does not set one.
+    None keeps the defaults of the codec."""
+
+
+TIER_SETTINGS = {
+    Tier.MASTER: TierSettings(
+        zscale_kernel='spline36',
+        sws_flags='spline+accurate_rnd+full_chroma_int+full_chroma_inp',
+        reducing_dither=Dither.ERROR_DIFFUSION,
+        preset=None),
+    Tier.REVIEW: TierSettings(
+        zscale_kernel='bicubic',
+        sws_flags='bicubic+accurate_rnd+full_chroma_int',
+        reducing_dither=Dither.ORDERED,
+        preset=VcPreset.N5_FAST),
+    Tier.PROXY: TierSettings(
+        zscale_kernel='bilinear',
+        sws_flags='fast_bilinear',
+        reducing_dither=Dither.NONE,
+        preset=VcPreset.N1_ULTRAFAST),
+}
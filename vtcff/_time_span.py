@@ -1,13 +1,47 @@
 # SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
 # SPDX-License-Identifier: MIT
 
-from typing import Optional
+from enum import Enum, unique
+from typing import Optional, Tuple
 
+from ._compiled_command import Tracked
 
-class BeginEndDuration:
+
+@unique
+class Seek(Enum):
+    ACCURATE = "accurate"
+    """-ss after -i. ffmpeg decodes the whole source up to the begin."""
+
+    FAST = "fast"
+    """-ss before -i. ffmpeg jumps to the keyframe before the point, so the
+    time of the excerpt does not depend on its position in the source.
+    A short residual -ss after -i keeps the cut exact even if the demuxer
+    seeks imprecisely."""
+
+    KEYFRAME = "keyframe"
+    """-ss before -i only. For a begin that is exactly on a keyframe: ffmpeg
+    seeks to it and starts decoding there."""
+
+
+# the part of the begin that is left to the output-side -ss in FAST mode
+FAST_SEEK_RESIDUAL = 1.0
+
+
+class BeginEndDuration(Tracked):
     def __init__(self):
         self.begin: float = 0
         self.duration: Optional[float] = None
+        self.seek: Seek = Seek.ACCURATE
+
+    def split_begin(self) -> Tuple[float, float]:
+        """Returns the seek before -i and the seek after -i.
+        They sum up to `begin`."""
+        if self.seek == Seek.KEYFRAME:
+            return self.begin, 0
+        if self.seek == Seek.FAST and self.begin:
+            coarse = max(0, round(self.begin - FAST_SEEK_RESIDUAL, 6))
+            return coarse, round(self.begin - coarse, 6)
+        return 0, self.begin
 
     @property
     def end(self):